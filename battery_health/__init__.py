@@ -0,0 +1 @@
+"""Battery cell telemetry, health and status logic shared by the dashboard."""
@@ -0,0 +1,89 @@
+"""Headless command line entry point: python -m battery_health analyze <logfile> | export <store>"""
+import argparse
+import sys
+from pathlib import Path
+
+from battery_health.analysis import DEFAULT_CHUNK_BYTES, analyze_log, format_summary, write_report
+from battery_health.telemetry import STATUSES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m battery_health",
+                                     description="Battery health analysis without the dashboard")
+    commands = parser.add_subparsers(dest="command", required=True)
+    analyze = commands.add_parser("analyze", help="score a recorded CSV or Parquet bench log")
+    analyze.add_argument("log", type=Path, help="log in the replay format (one row per cell per tick)")
+    analyze.add_argument("-o", "--output", type=Path,
+                         help="report directory (default: <log name>_report next to the log)")
+    analyze.add_argument("-w", "--workers", type=int, help="worker processes (default: one per core)")
+    analyze.add_argument("--chunk-mb", type=float, default=DEFAULT_CHUNK_BYTES / 2**20,
+                         help="approximate size of the log parts given to workers")
+    analyze.add_argument("--fail-on", choices=STATUSES[2:],
+                         help="exit with status 1 if any cell reached this status or worse")
+    export = commands.add_parser("export", help="stream a time range of persisted telemetry to a file")
+    export.add_argument("store", type=Path, help="telemetry store root (the dashboard's storage directory)")
+    export.add_argument("output", type=Path, help="file to write; the format defaults to its suffix")
+    export.add_argument("--bench", required=True)
+    export.add_argument("--group", required=True)
+    export.add_argument("--start", help="first tick time (ISO 8601), default: the first stored")
+    export.add_argument("--end", help="last tick time (ISO 8601), default: the last stored")
+    export.add_argument("--format", help="parquet, csv or ndjson (default: from the output suffix)")
+    export.add_argument("--compression",
+                        help="none, zstd or gzip (default: from the suffix (.gz, .zst) for text formats, "
+                             "zstd for Parquet)")
+    export.add_argument("--columns", help="comma separated columns (default: all)")
+    export.add_argument("--cells", help="comma separated cell ids (default: all)")
+    export.add_argument("--cell-types", help="comma separated cell types (default: all)")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        return run_export(args)
+
+    try:
+        summary, cells = analyze_log(args.log, args.workers, int(args.chunk_mb * 2**20))
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 2
+    output = args.output or args.log.with_name(f"{args.log.stem}_report")
+    summary_path, cells_path = write_report(summary, cells, output)
+    print(format_summary(summary))
+    print(f"  report: {summary_path}, {cells_path}")
+
+    if args.fail_on:
+        failing = STATUSES[STATUSES.index(args.fail_on):]
+        if any(summary["cells_by_worst_status"][status] for status in failing):
+            return 1
+    return 0
+
+
+def _split(value):
+    return value.split(",") if value else None
+
+
+def run_export(args):
+    """Stream a stored time range of one bench/group to args.output"""
+    # Imported here so analyze runs on CSV logs without loading pyarrow
+    from battery_health.export import EXPORT_COMPRESSIONS, EXPORT_FORMATS, export_stored
+    from battery_health.storage import store_directory
+
+    fmt = args.format or next((name for name, (suffix, _) in EXPORT_FORMATS.items()
+                               if suffix in args.output.suffixes), "parquet")
+    compression = args.compression or next(
+        (name for name, suffix in EXPORT_COMPRESSIONS.items() if suffix and args.output.suffix == suffix),
+        "zstd" if fmt == "parquet" else "none")
+    directory = store_directory(args.store, args.bench, args.group)
+    if not directory.is_dir():
+        print(f"error: no telemetry stored for {args.bench} group {args.group} in {args.store}", file=sys.stderr)
+        return 2
+    try:
+        rows = export_stored(directory, args.output, args.start, args.end, fmt, compression,
+                             _split(args.columns), _split(args.cells), _split(args.cell_types))
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 2
+    print(f"{rows} rows written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+import logging
+import threading
+import time
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from battery_health.alerts import AlertTracker
+from battery_health.anomaly import AnomalyDetector
+from battery_health.history import DEFAULT_CAPACITY, HistoryBuffer
+from battery_health.profiling import profiler
+from battery_health.selection import CellIndex
+from battery_health.soh import SohEstimator
+from battery_health.summary import summarize
+from battery_health.telemetry import MAX_VOLTAGE, METRICS, MIN_VOLTAGE, STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Fastest supported sampling interval in seconds
+MIN_INTERVAL = 0.01
+
+
+class Snapshot:
+    """Immutable view of one published tick, shared by every dashboard session.
+
+    The pack summary, the cell index and the cell DataFrame are computed
+    lazily on first use and cached, so each tick builds them at most once per
+    process no matter how many views or viewers read it. Callers must treat
+    them as read-only. The index is built from the previous snapshot's when
+    that one was indexed; publishers drop the link with release_previous().
+    """
+
+    def __init__(self, version, timestamp, cell_ids, cell_types, type_codes, batch,
+                 anomalies=None, alert_levels=None, soh=None, previous=None):
+        self.version = version
+        self.timestamp = timestamp
+        self.cell_ids = cell_ids
+        self.cell_types = cell_types
+        self.type_codes = type_codes
+        self.batch = batch
+        self.anomalies = anomalies
+        self.alert_levels = alert_levels
+        self.soh = soh
+        self._previous = previous
+
+    def release_previous(self):
+        """Forget the previous snapshot, so published snapshots do not form a chain"""
+        self._previous = None
+
+    @cached_property
+    def summary(self):
+        with profiler.phase("aggregation"):
+            return summarize(self.batch, self.type_codes)
+
+    @cached_property
+    def index(self):
+        """CellIndex of this tick for filtering, drill-down and top-k lookups"""
+        with profiler.phase("cell_index"):
+            previous = self._previous
+            self._previous = None
+            previous_index = None if previous is None else previous.__dict__.get("index")
+            return CellIndex(self.type_codes, self.batch["status"], self.batch["health"], previous_index)
+
+    @cached_property
+    def frame(self):
+        """Per-cell DataFrame with the same columns as the dict records"""
+        with profiler.phase("snapshot_frame"):
+            return self._build_frame()
+
+    def _build_frame(self):
+        frame = pd.DataFrame({"cell_id": self.cell_ids, "cell_type": self.cell_types})
+        for metric in METRICS:
+            frame[metric] = self.batch[metric]
+        frame["status"] = np.asarray(STATUSES)[self.batch["status"]]
+        frame["timestamp"] = self.timestamp
+        frame["min_voltage"] = MIN_VOLTAGE[self.type_codes]
+        frame["max_voltage"] = MAX_VOLTAGE[self.type_codes]
+        return frame
+
+
+class AcquisitionEngine:
+    """Samples cell telemetry on a background thread into a shared store.
+
+    One engine runs per process; dashboard sessions only read snapshots and
+    history windows from it, so sampling rate is independent of rendering and
+    of the number of connected viewers. Readings come from a pluggable
+    DataSource (simulator, replayed log, ...), scored by a streaming
+    AnomalyDetector, tracked by an AlertTracker whose alerts go to the
+    optional AlertDispatcher, and optionally persisted to a TelemetryStore,
+    flushed in batches outside the engine lock. Recorded ticks are folded from
+    the history into a SohEstimator for state of health and remaining life.
+    With set_bus(), every published tick is also written to a shared memory
+    SnapshotBus that other processes read without sampling themselves.
+    A tick that fails to sample or flush is logged and kept in last_error
+    until a tick succeeds again; the thread carries on with the next one.
+    """
+
+    def __init__(self, interval=1.0, capacity=DEFAULT_CAPACITY, history_dtype=np.float64, dispatcher=None):
+        self.lock = threading.Lock()
+        self.interval = max(MIN_INTERVAL, interval)
+        self.capacity = capacity
+        self.history_dtype = history_dtype
+        self.source = None
+        self.history = None
+        self.store = None
+        self.anomalies = None
+        self.alerts = None
+        self.soh = None
+        self.dispatcher = dispatcher
+        self.bus = None
+        self.bus_name = None
+        self.label = ""
+        self.last_error = None
+        self._snapshot = None
+        self._version = 0
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def cell_ids(self):
+        return [] if self.source is None else self.source.cell_ids
+
+    @property
+    def cell_types(self):
+        return [] if self.source is None else self.source.cell_types
+
+    def configure(self, source, capacity=None, store=None, label=None):
+        """Switch to a new data source, resetting history, and take a first sample.
+
+        The first sample is recorded unless the source is simulated, since
+        replayed, gateway and bus ticks cannot be polled again.
+        """
+        with self.lock:
+            if self.source is not None:
+                self.source.close()
+            if capacity is not None:
+                self.capacity = capacity
+            self.source = source
+            self.history = HistoryBuffer(source.cell_ids, capacity=self.capacity, dtype=self.history_dtype)
+            self.anomalies = AnomalyDetector(source.type_codes)
+            self.label = source.name if label is None else label
+            self.alerts = AlertTracker(source.cell_ids, self.label)
+            self.soh = SohEstimator(len(source.cell_ids))
+            previous_store, self.store = self.store, store
+            self._snapshot = None
+            self.last_error = None
+            self._open_bus(self.bus_name)
+        if previous_store is not None:
+            previous_store.close()
+        self.sample(record=not source.simulated)
+
+    def seek(self, timestamp):
+        """Continue from timestamp in a seekable source (such as ReplaySource).
+
+        Seeking back to or before the last recorded tick rewinds the engine:
+        history, anomaly baselines and SOH restart, and the store drops its
+        ticks from timestamp on, so no tick is recorded twice or out of order.
+        """
+        with self.lock:
+            self.source.seek(timestamp)
+            latest = self.history.latest()
+            if latest is None or latest[0] < np.datetime64(pd.Timestamp(timestamp), "us"):
+                return
+            self.history = HistoryBuffer(self.source.cell_ids, capacity=self.capacity, dtype=self.history_dtype)
+            self.anomalies = AnomalyDetector(self.source.type_codes)
+            self.soh = SohEstimator(len(self.source.cell_ids))
+            if self.store is not None:
+                self.store.truncate(timestamp)
+
+    def set_bus(self, name):
+        """Publish ticks to the SnapshotBus of this name (None stops publishing)"""
+        if name == self.bus_name:
+            return
+        with self.lock:
+            self._open_bus(name)
+            if self.bus is not None and self._snapshot is not None:
+                self.bus.publish(self._snapshot)
+
+    def _open_bus(self, name):
+        # A bus is tied to a cell layout, so every (re)configuration opens a new one
+        if self.bus is not None:
+            self.bus.close()
+            self.bus = None
+        self.bus_name = name
+        if name is not None and self.source is not None:
+            # Imported here so engines that never publish do not import the bus
+            from battery_health.bus import SnapshotBus
+            self.bus = SnapshotBus(name, self.source.cell_ids, self.source.cell_types)
+
+    def set_interval(self, seconds):
+        """Change the sampling interval; takes effect from the next tick"""
+        self.interval = max(MIN_INTERVAL, float(seconds))
+
+    def sample(self, record=True):
+        """Poll the source and publish its latest tick as the snapshot"""
+        with self.lock:
+            if self.source is None:
+                return None
+            with profiler.phase("data_update"):
+                ticks = self.source.poll()
+            if not ticks:
+                return self._snapshot
+            alerts = []
+            with profiler.phase("detection"):
+                for timestamp, batch in ticks:
+                    self.anomalies.update(timestamp, batch)
+                    alerts += self.alerts.update(timestamp, batch["status"])
+            if record:
+                with profiler.phase("history_append"):
+                    for timestamp, batch in ticks:
+                        self.history.append(timestamp, batch)
+                        if self.store is not None:
+                            self.store.append(timestamp, batch)
+                with profiler.phase("soh"):
+                    recorded = min(len(ticks), self.history.capacity)
+                    timestamps = self.history.window(recorded)[0]
+                    self.soh.update(timestamps, self.history.metric("current", recorded),
+                                    self.history.metric("capacity", recorded))
+            timestamp, batch = ticks[-1]
+            self._version += 1
+            previous = self._snapshot
+            self._snapshot = Snapshot(self._version, timestamp, self.source.cell_ids, self.source.cell_types,
+                                      self.source.type_codes, batch, self.anomalies.latest,
+                                      self.alerts.active.copy(), self.soh.latest, previous)
+            if previous is not None:
+                previous.release_previous()
+            if self.bus is not None:
+                with profiler.phase("bus_publish"):
+                    self.bus.publish(self._snapshot)
+            if alerts and self.dispatcher is not None:
+                self.dispatcher.submit(alerts)
+            return self._snapshot
+
+    def snapshot(self):
+        """Return the latest published snapshot, or None before the first sample"""
+        return self._snapshot
+
+    def start(self):
+        """Start the sampling thread if it is not already running"""
+        if self.is_running:
+            return
+        if self.source is not None:
+            self.source.resume()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="battery-acquisition", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the sampling thread and wait for it to exit"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(1.0, 2 * self.interval))
+            self._thread = None
+        if self.store is not None:
+            self.store.flush()
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+                store = self.store
+                if store is not None:
+                    store.flush_if_due()
+            except Exception as error:
+                message = f"{type(error).__name__}: {error}"
+                if message != self.last_error:
+                    # A failure repeating tick after tick is logged once
+                    logger.exception("Sampling %s failed", self.label)
+                self.last_error = message
+            else:
+                self.last_error = None
+            # Schedule against the monotonic clock so slow ticks do not cause drift
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                next_tick = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
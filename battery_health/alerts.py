@@ -0,0 +1,274 @@
+import json
+import logging
+import queue
+import threading
+import urllib.request
+from collections import deque, namedtuple
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Alert level raised by each status code (indexed like STATUSES)
+STATUS_ALERT_LEVELS = np.array([0, 0, 1, 2], dtype=np.int8)
+ALERT_LEVELS = ("Clear", "Warning", "Critical")
+
+Alert = namedtuple("Alert", [
+    "timestamp",
+    "source",      # bench/group label of the engine that raised it
+    "cell_id",     # None for pack-level summaries
+    "level",       # index into ALERT_LEVELS
+    "previous",
+    "message",
+])
+
+
+def alert_to_dict(alert):
+    record = alert._asdict()
+    record["timestamp"] = str(alert.timestamp)
+    record["level"] = ALERT_LEVELS[alert.level]
+    record["previous"] = ALERT_LEVELS[alert.previous]
+    return record
+
+
+class AlertTracker:
+    """Per-cell alert state machine fed with status codes, vectorized over cells.
+
+    A cell's alert level only rises after raise_ticks consecutive ticks above
+    it and only falls after clear_ticks consecutive ticks below it, so a
+    reading hovering on a threshold does not toggle the alert (hysteresis).
+    Only level changes produce alerts, so repeated Critical samples are
+    deduplicated. Each cell spends a token per alert from a bucket holding
+    burst tokens and refilling one per refill_seconds; changes of a flapping
+    cell beyond that are suppressed and counted. When more than max_alerts
+    cells change in one tick, one summary alert per level replaces them.
+    """
+
+    def __init__(self, cell_ids, source="", raise_ticks=3, clear_ticks=10,
+                 burst=3, refill_seconds=300.0, max_alerts=20):
+        self.cell_ids = np.asarray(cell_ids, dtype=object)
+        self.source = source
+        self.raise_ticks = raise_ticks
+        self.clear_ticks = clear_ticks
+        self.burst = burst
+        self.refill_seconds = refill_seconds
+        self.max_alerts = max_alerts
+        num_cells = len(self.cell_ids)
+        self.active = np.zeros(num_cells, dtype=np.int8)
+        self._up = np.zeros(num_cells, dtype=np.int32)
+        self._down = np.zeros(num_cells, dtype=np.int32)
+        self._tokens = np.full(num_cells, float(burst))
+        self.suppressed = np.zeros(num_cells, dtype=np.int64)
+        self._last_time = None
+
+    def update(self, timestamp, status):
+        """Advance the state machine by one tick; return the alerts it raises"""
+        level = STATUS_ALERT_LEVELS[status]
+        up = level > self.active
+        down = level < self.active
+        self._up = np.where(up, self._up + 1, 0)
+        self._down = np.where(down, self._down + 1, 0)
+        changed = (up & (self._up >= self.raise_ticks)) | (down & (self._down >= self.clear_ticks))
+
+        timestamp = np.datetime64(timestamp, "us")
+        if self._last_time is not None:
+            seconds = max(0.0, (timestamp - self._last_time) / np.timedelta64(1, "s"))
+            self._tokens = np.minimum(self.burst, self._tokens + seconds / self.refill_seconds)
+        self._last_time = timestamp
+        if not changed.any():
+            return []
+
+        cells = np.flatnonzero(changed)
+        previous = self.active[cells]
+        self.active[cells] = level[cells]
+        self._up[cells] = 0
+        self._down[cells] = 0
+        allowed = self._tokens[cells] >= 1
+        self.suppressed[cells[~allowed]] += 1
+        cells, previous = cells[allowed], previous[allowed]
+        self._tokens[cells] -= 1
+
+        when = timestamp.astype(datetime)
+        if len(cells) > self.max_alerts:
+            return self._summaries(when, cells, previous)
+        alerts = []
+        for cell, old in zip(cells, previous):
+            new = self.active[cell]
+            note = f" ({self.suppressed[cell]} changes suppressed)" if self.suppressed[cell] else ""
+            verb = "raised to" if new > old else "cleared to"
+            alerts.append(Alert(when, self.source, self.cell_ids[cell], int(new), int(old),
+                                f"{self.cell_ids[cell]} {verb} {ALERT_LEVELS[new]}{note}"))
+            self.suppressed[cell] = 0
+        return alerts
+
+    def _summaries(self, when, cells, previous):
+        self.suppressed[cells] = 0
+        alerts = []
+        new = self.active[cells]
+        for level in range(len(ALERT_LEVELS)):
+            for rising in (True, False):
+                mask = (new == level) & ((new > previous) if rising else (new < previous))
+                count = int(np.count_nonzero(mask))
+                if count:
+                    verb = "raised to" if rising else "cleared to"
+                    alerts.append(Alert(when, self.source, None, level, int(previous[mask].max()),
+                                        f"{count} cells {verb} {ALERT_LEVELS[level]}"))
+        return alerts
+
+
+class AlertSink:
+    """Destination for dispatched alerts; emit() receives a list per batch"""
+
+    name = "sink"
+
+    def emit(self, alerts):
+        raise NotImplementedError
+
+    def close(self):
+        """Release any files or connections held by the sink"""
+
+
+class FeedSink(AlertSink):
+    """Keeps the most recent alerts in memory for the dashboard"""
+
+    name = "In-app feed"
+
+    def __init__(self, maxlen=500):
+        self._alerts = deque(maxlen=maxlen)
+
+    def emit(self, alerts):
+        self._alerts.extend(alerts)
+
+    def recent(self, limit=20, source=None):
+        """Return up to limit alerts, newest first, optionally for one source"""
+        alerts = [alert for alert in reversed(self._alerts) if source is None or alert.source == source]
+        return alerts[:limit]
+
+
+class LogFileSink(AlertSink):
+    """Appends alerts to a file as JSON lines"""
+
+    name = "Log file"
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def emit(self, alerts):
+        with open(self.path, "a") as handle:
+            handle.writelines(json.dumps(alert_to_dict(alert)) + "\n" for alert in alerts)
+
+
+class WebhookSink(AlertSink):
+    """POSTs each batch of alerts as JSON to a webhook URL"""
+
+    name = "Webhook"
+
+    def __init__(self, url, timeout=2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def emit(self, alerts):
+        body = json.dumps({"alerts": [alert_to_dict(alert) for alert in alerts]}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class WebhookStub:
+    """Local HTTP endpoint that accepts webhook posts, for development and demos"""
+
+    def __init__(self, host="127.0.0.1", port=0, maxlen=500):
+        self.received = deque(maxlen=maxlen)
+        received = self.received
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                received.extend(json.loads(self.rfile.read(length) or b"{}").get("alerts", []))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self._server.server_port}/alerts"
+        threading.Thread(target=self._server.serve_forever, name="alert-webhook-stub", daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class AlertDispatcher:
+    """Delivers alerts to sinks from a background thread through a bounded queue.
+
+    submit() never blocks: when the queue is full the alert is dropped and
+    counted, and the next batch delivered carries a summary of the drops. A
+    slow or failing sink therefore cannot stall sampling or the UI, and it
+    sees at most one call per batch_size alerts.
+    """
+
+    def __init__(self, maxsize=1000, batch_size=100):
+        self.feed = FeedSink()
+        self.sinks = [self.feed]
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.delivered = 0
+        self._queue = queue.Queue(maxsize)
+        self._reported_drops = 0
+        self._sink_config = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+
+    def configure_sinks(self, log_path=None, webhook_url=None):
+        """Replace the optional sinks; the in-app feed is always kept"""
+        config = (log_path or None, webhook_url or None)
+        if config == self._sink_config:
+            return
+        sinks = [self.feed]
+        if config[0]:
+            sinks.append(LogFileSink(config[0]))
+        if config[1]:
+            sinks.append(WebhookSink(config[1]))
+        with self._lock:
+            previous, self.sinks = self.sinks, sinks
+            self._sink_config = config
+        for sink in previous:
+            if sink is not self.feed:
+                sink.close()
+
+    def submit(self, alerts):
+        """Queue alerts for delivery without blocking"""
+        for alert in alerts:
+            try:
+                self._queue.put_nowait(alert)
+            except queue.Full:
+                self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if self.dropped > self._reported_drops:
+                last = batch[-1]
+                batch.append(Alert(last.timestamp, "Alert dispatcher", None, 0, 0,
+                                   f"{self.dropped - self._reported_drops} alerts dropped (queue full)"))
+                self._reported_drops = self.dropped
+            with self._lock:
+                sinks = list(self.sinks)
+            for sink in sinks:
+                try:
+                    sink.emit(batch)
+                except Exception:
+                    logger.exception("Alert sink %s failed", sink.name)
+            self.delivered += len(batch)
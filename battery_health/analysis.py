@@ -0,0 +1,234 @@
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from battery_health.sources import PARQUET_SUFFIXES, REPLAY_REQUIRED_COLUMNS
+from battery_health.summary import HEALTH_PERCENTILES
+from battery_health.telemetry import (
+    CELL_TYPES, MAX_VOLTAGE, MIN_VOLTAGE, NOMINAL_VOLTAGE, STATUSES, TYPE_CODES, classify_status,
+    compute_health
+)
+
+# Approximate bytes of log each worker task reads
+DEFAULT_CHUNK_BYTES = 64 * 2**20
+
+# Health histogram used for mergeable percentiles (0.1% resolution)
+HEALTH_BINS = np.linspace(0, 100, 1001)
+
+STATUS_COLUMNS = tuple(f"status_{status}" for status in STATUSES)
+CELL_AGGREGATIONS = {
+    "samples": "sum",
+    "health_sum": "sum",
+    "min_health": "min",
+    "min_voltage": "min",
+    "max_voltage": "max",
+    "max_temperature": "max",
+    **{column: "sum" for column in STATUS_COLUMNS},
+}
+
+
+def plan_chunks(path, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Split a CSV or Parquet bench log into independently readable parts.
+
+    Parquet parts are lists of row groups; CSV parts are (start, end) byte
+    ranges aligned to line starts, read together with the header names.
+    Returns (header, parts), header being None for Parquet.
+    """
+    path = Path(path)
+    if path.suffix.lower() in PARQUET_SUFFIXES:
+        import pyarrow.parquet as pq
+        metadata = pq.ParquetFile(path).metadata
+        parts, current, size = [], [], 0
+        for row_group in range(metadata.num_row_groups):
+            current.append(row_group)
+            size += metadata.row_group(row_group).total_byte_size
+            if size >= chunk_bytes:
+                parts.append(current)
+                current, size = [], 0
+        if current:
+            parts.append(current)
+        return None, parts
+
+    file_size = path.stat().st_size
+    with open(path, "rb") as handle:
+        header = pd.read_csv(io.BytesIO(handle.readline()), nrows=0).columns.tolist()
+        offsets = [handle.tell()]
+        while offsets[-1] + chunk_bytes < file_size:
+            handle.seek(offsets[-1] + chunk_bytes)
+            handle.readline()
+            if handle.tell() >= file_size:
+                break
+            offsets.append(handle.tell())
+    offsets.append(file_size)
+    return header, [(start, end) for start, end in zip(offsets[:-1], offsets[1:]) if end > start]
+
+
+def _read_part(path, header, part):
+    if header is None:
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).read_row_groups(part, columns=list(REPLAY_REQUIRED_COLUMNS)).to_pandas()
+    start, end = part
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+    return pd.read_csv(io.BytesIO(data), header=None, names=header, usecols=list(REPLAY_REQUIRED_COLUMNS))
+
+
+def analyze_part(path, header, part):
+    """Score one part of a log with the dashboard's health and status logic.
+
+    Returns mergeable partial results: per-cell aggregates, a health
+    histogram and the timestamps needed to count ticks across parts.
+    """
+    frame = _read_part(path, header, part)
+    codes = frame["cell_type"].astype(str).map(TYPE_CODES)
+    known = codes.notna().to_numpy()
+    frame = frame[known]
+    codes = codes[known].to_numpy(dtype=np.int8)
+    timestamps = pd.to_datetime(frame["timestamp"]).to_numpy()
+
+    voltage = frame["voltage"].to_numpy(dtype=float)
+    temperature = frame["temperature"].to_numpy(dtype=float)
+    health = compute_health(voltage, temperature, NOMINAL_VOLTAGE[codes])
+    status = classify_status(voltage, temperature, health, MIN_VOLTAGE[codes], MAX_VOLTAGE[codes])
+
+    scored = pd.DataFrame({
+        "cell_id": frame["cell_id"].astype(str).to_numpy(),
+        "cell_type": frame["cell_type"].astype(str).to_numpy(),
+        "samples": 1,
+        "health_sum": health,
+        "min_health": health,
+        "min_voltage": voltage,
+        "max_voltage": voltage,
+        "max_temperature": temperature,
+    })
+    for code, column in enumerate(STATUS_COLUMNS):
+        scored[column] = (status == code).astype(np.int64)
+    cells = scored.groupby(["cell_id", "cell_type"], sort=False).agg(CELL_AGGREGATIONS)
+
+    unique_times = np.unique(timestamps)
+    return {
+        "rows": len(known),
+        "skipped_rows": int(np.count_nonzero(~known)),
+        "first": unique_times[0] if len(unique_times) else None,
+        "last": unique_times[-1] if len(unique_times) else None,
+        "ticks": len(unique_times),
+        "cells": cells,
+        "health_histogram": np.histogram(np.clip(health, 0, 100), HEALTH_BINS)[0],
+    }
+
+
+def _histogram_percentiles(histogram, percentiles):
+    cumulative = np.cumsum(histogram)
+    if not cumulative[-1]:
+        return [float("nan")] * len(percentiles)
+    ranks = np.asarray(percentiles) / 100 * cumulative[-1]
+    return HEALTH_BINS[1:][np.searchsorted(cumulative, ranks)].tolist()
+
+
+def analyze_log(path, workers=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Analyze a recorded bench log in parallel parts and return (summary, cells).
+
+    The log uses the replay format (one row per cell per tick, sorted by
+    timestamp). Parts are scored on up to workers processes and merged; cells
+    is a per-cell DataFrame and summary a JSON-serializable dict.
+    """
+    path = Path(path)
+    if not path.is_file():
+        raise FileNotFoundError(f"Log not found: {path}")
+    header, parts = plan_chunks(path, chunk_bytes)
+    if header is not None:
+        missing = [column for column in REPLAY_REQUIRED_COLUMNS if column not in header]
+        if missing:
+            raise ValueError(f"Log {path.name} is missing columns: {', '.join(missing)}")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(parts)))
+    if workers == 1:
+        results = [analyze_part(path, header, part) for part in parts]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(analyze_part, [path] * len(parts), [header] * len(parts), parts))
+    total_rows = sum(result["rows"] for result in results)
+    skipped_rows = sum(result["skipped_rows"] for result in results)
+    # Parts holding only unknown cell types still count towards rows and skipped_rows
+    results = [result for result in results if result["ticks"]]
+    if not results:
+        raise ValueError(f"Log {path.name} contains no rows for known cell types")
+
+    cells = pd.concat([result["cells"] for result in results]).groupby(
+        level=["cell_id", "cell_type"], sort=False).agg(CELL_AGGREGATIONS)
+    cells["mean_health"] = cells["health_sum"] / cells["samples"]
+    status_counts = cells[list(STATUS_COLUMNS)].to_numpy()
+    worst = len(STATUSES) - 1 - np.argmax(status_counts[:, ::-1] > 0, axis=1)
+    cells["worst_status"] = np.asarray(STATUSES)[worst]
+    cells = cells.drop(columns="health_sum").reset_index()
+
+    # A tick split across two parts is counted in both
+    ticks = sum(result["ticks"] for result in results)
+    ticks -= sum(previous["last"] == current["first"] for previous, current in zip(results, results[1:]))
+    histogram = np.sum([result["health_histogram"] for result in results], axis=0)
+    samples = int(cells["samples"].sum())
+
+    types = {}
+    for cell_type, rows in cells.groupby("cell_type", sort=False):
+        types[cell_type] = {
+            "cells": len(rows),
+            "samples": int(rows["samples"].sum()),
+            "mean_health": float((rows["mean_health"] * rows["samples"]).sum() / rows["samples"].sum()),
+            "status_counts": {status: int(rows[column].sum()) for status, column in zip(STATUSES, STATUS_COLUMNS)},
+        }
+    summary = {
+        "log": str(path),
+        "parts": len(parts),
+        "workers": workers,
+        "rows": total_rows,
+        "skipped_rows": skipped_rows,
+        "ticks": int(ticks),
+        "start": str(pd.Timestamp(results[0]["first"])),
+        "end": str(pd.Timestamp(results[-1]["last"])),
+        "cells": len(cells),
+        "status_counts": {status: int(cells[column].sum()) for status, column in zip(STATUSES, STATUS_COLUMNS)},
+        "cells_by_worst_status": {status: int((cells["worst_status"] == status).sum()) for status in STATUSES},
+        "health": {
+            "mean": float((cells["mean_health"] * cells["samples"]).sum() / samples),
+            "min": float(cells["min_health"].min()),
+            **{f"p{p}": value for p, value in zip(HEALTH_PERCENTILES,
+                                                  _histogram_percentiles(histogram, HEALTH_PERCENTILES))},
+        },
+        "types": {cell_type: types[cell_type] for cell_type in CELL_TYPES if cell_type in types},
+        "worst_cells": cells.nsmallest(10, "min_health")["cell_id"].tolist(),
+    }
+    return summary, cells
+
+
+def write_report(summary, cells, output_dir):
+    """Write summary.json and cells.csv into output_dir; return their paths"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary_path = output_dir / "summary.json"
+    cells_path = output_dir / "cells.csv"
+    summary_path.write_text(json.dumps(summary, indent=2))
+    cells.to_csv(cells_path, index=False, float_format="%.3f")
+    return summary_path, cells_path
+
+
+def format_summary(summary):
+    """Return a short plain-text version of the summary for terminals and logs"""
+    health = summary["health"]
+    lines = [
+        f"{summary['log']}: {summary['rows']:,} rows, {summary['ticks']:,} ticks, {summary['cells']} cells",
+        f"  {summary['start']} → {summary['end']} ({summary['parts']} parts on {summary['workers']} workers)",
+        f"  health mean {health['mean']:.1f}% · min {health['min']:.1f}% · p5 {health['p5']:.1f}% · "
+        f"median {health['p50']:.1f}%",
+        "  cells by worst status: " + ", ".join(f"{status} {count}" for status, count
+                                                 in summary["cells_by_worst_status"].items()),
+    ]
+    for cell_type, stats in summary["types"].items():
+        lines.append(f"  {cell_type}: {stats['cells']} cells, mean health {stats['mean_health']:.1f}%")
+    if summary["skipped_rows"]:
+        lines.append(f"  skipped {summary['skipped_rows']:,} rows with unknown cell types")
+    return "\n".join(lines)
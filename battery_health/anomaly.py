@@ -0,0 +1,137 @@
+from collections import namedtuple
+
+import numpy as np
+
+from battery_health.telemetry import NOMINAL_VOLTAGE
+
+# Channels tracked with EWMA mean/variance, in score column order
+ANOMALY_METRICS = ("voltage", "current", "temperature")
+
+# Anomaly kinds, one bit each in the per-cell flags
+ANOMALY_KINDS = (
+    "voltage_z",             # voltage far from the cell's own recent behaviour
+    "current_z",
+    "temperature_z",
+    "temperature_rate",      # smoothed dT/dt above the rate limit
+    "temperature_forecast",  # critical temperature reached within the horizon at the current rate
+    "voltage_deviation",     # cell voltage drifting away from the rest of the pack
+)
+ANOMALY_LABELS = {
+    "voltage_z": "Voltage outlier",
+    "current_z": "Current outlier",
+    "temperature_z": "Temperature outlier",
+    "temperature_rate": "Fast heating",
+    "temperature_forecast": "Heading for critical temperature",
+    "voltage_deviation": "Voltage off pack",
+}
+
+# Temperature the status logic treats as critical (°C)
+CRITICAL_TEMPERATURE = 45.0
+
+AnomalyResult = namedtuple("AnomalyResult", [
+    "z_scores",             # (cells, len(ANOMALY_METRICS))
+    "temperature_rate",     # smoothed dT/dt in °C per minute
+    "voltage_deviation",    # fraction of nominal voltage away from the pack median
+    "flags",                # uint8 bitmask indexed by ANOMALY_KINDS
+])
+
+
+def kind_mask(flags, kind):
+    """Return a boolean mask of the cells flagged with one anomaly kind"""
+    return (flags & (1 << ANOMALY_KINDS.index(kind))) != 0
+
+
+def describe_flags(flags):
+    """Return the labels of the anomaly kinds set in one cell's flags"""
+    return [ANOMALY_LABELS[kind] for bit, kind in enumerate(ANOMALY_KINDS) if flags & (1 << bit)]
+
+
+class AnomalyDetector:
+    """Streaming per-cell anomaly detection, updated in O(1) per tick.
+
+    Every statistic is an exponentially weighted recurrence over the latest
+    sample, so the per-tick cost is a fixed number of vectorized operations
+    across all cells whatever the history length. Smoothing uses time
+    constants rather than per-tick weights, so results do not depend on the
+    sampling interval. Scores are computed against the statistics before the
+    sample is folded in, so an outlier does not mask itself, and flags stay
+    off until warmup ticks have been seen.
+    """
+
+    def __init__(self, type_codes, mean_seconds=60.0, rate_seconds=120.0, z_threshold=4.0,
+                 rate_threshold=2.0, forecast_seconds=300.0, deviation_threshold=0.03, warmup=30):
+        self.nominal = NOMINAL_VOLTAGE[np.asarray(type_codes, dtype=np.int8)]
+        self.mean_seconds = mean_seconds
+        self.rate_seconds = rate_seconds
+        self.z_threshold = z_threshold
+        self.rate_threshold = rate_threshold  # °C per minute
+        self.forecast_seconds = forecast_seconds
+        self.deviation_threshold = deviation_threshold
+        self.warmup = warmup
+        num_cells = len(self.nominal)
+        self.mean = np.full((num_cells, len(ANOMALY_METRICS)), np.nan)
+        self.var = np.zeros((num_cells, len(ANOMALY_METRICS)))
+        self.rate = np.zeros(num_cells)
+        self.ticks = 0
+        self._last_time = None
+        self.latest = None
+
+    def update(self, timestamp, batch):
+        """Fold one tick into the statistics and return its AnomalyResult"""
+        timestamp = np.datetime64(timestamp, "us")
+        seconds = 0.0
+        if self._last_time is not None:
+            seconds = max(0.0, (timestamp - self._last_time) / np.timedelta64(1, "s"))
+        self._last_time = timestamp
+        alpha = 1 - np.exp(-seconds / self.mean_seconds)
+        rate_alpha = 1 - np.exp(-seconds / self.rate_seconds)
+
+        x = np.stack([batch[metric] for metric in ANOMALY_METRICS], axis=1)
+        seen = ~np.isnan(x)
+        first = np.isnan(self.mean) & seen
+        self.mean[first] = x[first]
+
+        # Score against the statistics before this sample
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z_scores = np.where(self.var > 0, (x - self.mean) / np.sqrt(self.var), 0.0)
+        z_scores[~seen] = 0.0
+
+        # Incremental EWMA mean/variance (West's update)
+        temperature_column = ANOMALY_METRICS.index("temperature")
+        previous_level = self.mean[:, temperature_column].copy()
+        diff = np.where(seen, x - self.mean, 0.0)
+        increment = alpha * diff
+        self.mean += increment
+        self.var = (1 - alpha) * (self.var + diff * increment)
+
+        # Rate of change of the smoothed temperature, itself smoothed
+        level = self.mean[:, temperature_column]
+        if seconds > 0:
+            step = np.nan_to_num((level - previous_level) / seconds * 60)
+            self.rate += rate_alpha * (step - self.rate)
+
+        # Cell-to-pack deviation of the smoothed voltage, normalised by nominal
+        # voltage so packs mixing chemistries compare like with like
+        relative = self.mean[:, ANOMALY_METRICS.index("voltage")] / self.nominal
+        if np.isnan(relative).all():
+            deviation = np.zeros_like(relative)
+        else:
+            deviation = np.nan_to_num(relative - np.nanmedian(relative))
+
+        self.ticks += 1
+        flags = np.zeros(len(self.nominal), dtype=np.uint8)
+        if self.ticks > self.warmup:
+            heating = self.rate > 0
+            with np.errstate(invalid="ignore", divide="ignore"):
+                seconds_to_critical = np.where(heating, (CRITICAL_TEMPERATURE - level) / self.rate * 60, np.inf)
+            conditions = [np.abs(z_scores[:, i]) > self.z_threshold for i in range(len(ANOMALY_METRICS))]
+            conditions += [
+                self.rate > self.rate_threshold,
+                heating & (level < CRITICAL_TEMPERATURE) & (seconds_to_critical < self.forecast_seconds),
+                np.abs(deviation) > self.deviation_threshold,
+            ]
+            for bit, condition in enumerate(conditions):
+                flags |= condition.astype(np.uint8) << bit
+
+        self.latest = AnomalyResult(z_scores, self.rate.copy(), deviation, flags)
+        return self.latest
@@ -0,0 +1,360 @@
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from battery_health.acquisition import Snapshot
+from battery_health.sources import DataSource
+from battery_health.telemetry import METRICS, encode_cell_types
+
+# Shared block layout: header, cell layout as JSON, then a ring of tick slots
+BUS_MAGIC = int.from_bytes(b"BATTBUS1", "little")
+BUS_HEADER = np.dtype({
+    "names": ["magic", "version", "closed", "cells", "slots", "layout_bytes", "slot_bytes", "writer_pid"],
+    "formats": ["<u8"] * 8,
+    "itemsize": 64,
+})
+
+# Published ticks kept in the ring; BusSource misses none when polled at least
+# once per this many ticks (readers copy each tick out, so renders may be slower)
+DEFAULT_SLOTS = 8
+
+
+def bus_block_name(name):
+    """Return the shared memory name used for a bus name"""
+    return "battery_bus_" + re.sub(r"[^\w-]", "_", name)
+
+
+def _slot_dtype(cells):
+    fields = [("version", "<u8"), ("timestamp", "<i8"), ("values", "<f8", (len(METRICS), cells)),
+              ("status", "i1", (cells,)), ("alert_levels", "i1", (cells,))]
+    packed = np.dtype(fields)
+    # Cache-line aligned slots, so publishing one tick never touches its neighbours
+    return np.dtype({"names": packed.names, "formats": [packed.fields[name][0] for name in packed.names],
+                     "offsets": [packed.fields[name][1] for name in packed.names],
+                     "itemsize": -(-packed.itemsize // 64) * 64})
+
+
+def _layout_offset(layout_bytes):
+    return BUS_HEADER.itemsize + -(-layout_bytes // 64) * 64
+
+
+# Blocks created by this process, which its resource tracker must keep tracking
+_created_blocks = set()
+
+
+def _attach(block_name):
+    """Attach to an existing block without handing it to this process's resource tracker"""
+    try:
+        try:
+            return shared_memory.SharedMemory(name=block_name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching registers the block for unlinking at exit
+            from multiprocessing import resource_tracker
+            block = shared_memory.SharedMemory(name=block_name)
+            if block_name not in _created_blocks:
+                resource_tracker.unregister(block._name, "shared_memory")
+            return block
+    except ValueError:
+        # Created but not sized yet: nothing to map until its writer finishes
+        raise FileNotFoundError(f"Shared memory block {block_name} is still being created") from None
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # alive, owned by another user
+    return True
+
+
+class SnapshotBus:
+    """Publishes the ticks of one engine to a named shared memory block.
+
+    Any process can map the block with BusReader: the latest tick is copied
+    out once per version and shared by the process's sessions, so viewers
+    cost one tick of memory each and all see the same versioned tick. Ticks
+    go round a ring of slots, each stamped with its version once fully
+    written, so readers can tell a complete slot from one being overwritten
+    without taking a lock. The cell layout is fixed per
+    block; a new layout closes the block and publishes a fresh one under the
+    same name, which readers pick up on their next read.
+    """
+
+    def __init__(self, name, cell_ids, cell_types, slots=DEFAULT_SLOTS):
+        self.name = name
+        layout = json.dumps({"cell_ids": list(cell_ids), "cell_types": list(cell_types),
+                             "metrics": list(METRICS)}).encode()
+        slot_dtype = _slot_dtype(len(cell_ids))
+        data_offset = _layout_offset(len(layout))
+        size = data_offset + slots * slot_dtype.itemsize
+        block_name = bus_block_name(name)
+        # Registered first, so a reader of this process attaching meanwhile keeps it tracked
+        _created_blocks.add(block_name)
+        try:
+            self._block = shared_memory.SharedMemory(name=block_name, create=True, size=size)
+        except FileExistsError:
+            stale = _attach(block_name)
+            stale_header = np.ndarray((), BUS_HEADER, buffer=stale.buf)
+            if not stale_header["closed"] and _process_alive(int(stale_header["writer_pid"])):
+                pid = int(stale_header["writer_pid"])
+                del stale_header
+                stale.close()
+                raise FileExistsError(f"Bus {name!r} is already published by process {pid}")
+            # Left behind by a writer that exited without closing; readers see it closed
+            stale_header["closed"] = 1
+            del stale_header
+            stale.close()
+            # Reopened tracked, so unlinking it leaves the resource tracker consistent
+            stale = shared_memory.SharedMemory(name=block_name)
+            stale.close()
+            stale.unlink()
+            self._block = shared_memory.SharedMemory(name=block_name, create=True, size=size)
+        self._header = np.ndarray((), BUS_HEADER, buffer=self._block.buf)
+        self._block.buf[BUS_HEADER.itemsize:BUS_HEADER.itemsize + len(layout)] = layout
+        self._slots = np.ndarray((slots,), slot_dtype, buffer=self._block.buf, offset=data_offset)
+        self._slots["version"] = 0
+        self._header[()] = (0, 0, 0, len(cell_ids), slots, len(layout), slot_dtype.itemsize, os.getpid())
+        # Stamped last: readers treat a block without it as not yet published
+        self._header["magic"] = BUS_MAGIC
+
+    @property
+    def version(self):
+        return int(self._header["version"])
+
+    def publish(self, snapshot):
+        """Write a snapshot's tick into the next slot and make it the latest"""
+        version = self.version + 1
+        slot = version % len(self._slots)
+        self._slots["version"][slot] = 0  # incomplete until stamped below
+        self._slots["timestamp"][slot] = np.datetime64(snapshot.timestamp, "us").astype(np.int64)
+        values = self._slots["values"][slot]
+        for i, metric in enumerate(METRICS):
+            values[i] = snapshot.batch[metric]
+        self._slots["status"][slot] = snapshot.batch["status"]
+        self._slots["alert_levels"][slot] = 0 if snapshot.alert_levels is None else snapshot.alert_levels
+        self._slots["version"][slot] = version
+        self._header["version"] = version
+
+    def close(self):
+        """Mark the block closed for readers and remove it"""
+        self._header["closed"] = 1
+        del self._header, self._slots
+        self._block.close()
+        self._block.unlink()
+        _created_blocks.discard(self._block.name)
+
+
+class BusReader:
+    """Read-only mapping of a SnapshotBus, usable from any process.
+
+    snapshot() copies the latest tick out of its slot and checks the slot's
+    version stamp afterwards, so a tick the writer laps mid-copy is never
+    returned torn; the Snapshot is cached per version, so every session of
+    the process shares it (and its summary and frame) however long they
+    take to render it. After the writer closes the block the reader
+    reattaches to its replacement, if any, on the next read.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.generation = 0
+        self._block = None
+        self._snapshot = None
+        self._attach()
+
+    def _attach(self):
+        block = _attach(bus_block_name(self.name))
+        header = np.ndarray((), BUS_HEADER, buffer=block.buf)
+        magic = int(header["magic"])
+        if magic != BUS_MAGIC:
+            del header
+            block.close()
+            if not magic:
+                raise FileNotFoundError(f"Bus {self.name!r} is still being created")
+            raise ValueError(f"Shared memory block for bus {self.name!r} is not a snapshot bus")
+        layout_bytes = int(header["layout_bytes"])
+        layout = json.loads(bytes(block.buf[BUS_HEADER.itemsize:BUS_HEADER.itemsize + layout_bytes]))
+        slots = np.ndarray((int(header["slots"]),), _slot_dtype(int(header["cells"])),
+                           buffer=block.buf, offset=_layout_offset(layout_bytes))
+        slots.flags.writeable = False
+        self.close()
+        self._block, self._header, self._slots = block, header, slots
+        self.cell_ids = layout["cell_ids"]
+        self.cell_types = layout["cell_types"]
+        self.type_codes = encode_cell_types(self.cell_types)
+        self._snapshot = None
+        self.generation += 1
+
+    @property
+    def closed(self):
+        """Whether the writer has closed the block this reader maps"""
+        return self._block is None or bool(self._header["closed"])
+
+    @property
+    def version(self):
+        return int(self._header["version"])
+
+    def _refresh(self):
+        if self.closed:
+            try:
+                self._attach()
+            except FileNotFoundError:
+                pass  # no replacement published yet
+
+    def valid(self, version):
+        """Whether the slot of a version still holds that version"""
+        return int(self._slots["version"][version % len(self._slots)]) == version
+
+    def _copy_tick(self, version):
+        """Return copies of (timestamp, batch, alert levels) of a version, or None if its slot moved on"""
+        if not version or not self.valid(version):
+            return None
+        slot = self._slots[version % len(self._slots)]
+        timestamp = np.datetime64(int(slot["timestamp"]), "us").astype(datetime)
+        values = slot["values"].copy()
+        batch = {metric: values[i] for i, metric in enumerate(METRICS)}
+        batch["status"] = slot["status"].copy()
+        alert_levels = slot["alert_levels"].copy()
+        # Keep the copy only if the slot was not rewritten while copying
+        if not self.valid(version):
+            return None
+        return timestamp, batch, alert_levels
+
+    def snapshot(self):
+        """Return the latest published tick as a Snapshot shared by the process, or None"""
+        self._refresh()
+        if self._block is None:
+            return None
+        version = self.version
+        if self._snapshot is None or self._snapshot.version != version:
+            tick = self._copy_tick(version)
+            if tick is None:
+                return self._snapshot
+            timestamp, batch, alert_levels = tick
+            previous = self._snapshot
+            self._snapshot = Snapshot(version, timestamp, self.cell_ids, self.cell_types, self.type_codes,
+                                      batch, alert_levels=alert_levels, previous=previous)
+            if previous is not None:
+                previous.release_previous()
+        return self._snapshot
+
+    def ticks_since(self, version):
+        """Return copies of (version, timestamp, batch) for the ticks after version still in the ring"""
+        self._refresh()
+        if self._block is None:
+            return []
+        latest = self.version
+        ticks = []
+        for tick_version in range(max(version + 1, latest - len(self._slots) + 1), latest + 1):
+            tick = self._copy_tick(tick_version)
+            if tick is not None:
+                ticks.append((tick_version, *tick[:2]))
+        return ticks
+
+    def close(self):
+        if self._block is not None:
+            self._snapshot = None
+            del self._header, self._slots
+            try:
+                self._block.close()
+            except BufferError:
+                pass  # sessions still hold views; unmapped once they drop them
+            self._block = None
+
+
+class BusViewer:
+    """Follows another process's SnapshotBus for the per-group dashboard views.
+
+    Offers what the views read from an AcquisitionEngine, straight from
+    BusReader.snapshot(): no history, detection, alert tracking, SOH or
+    store of its own, so viewers add no work to the publisher's tick and
+    never dispatch its alerts or persist its telemetry a second time. Alert
+    levels are the publisher's, read from the bus. One viewer is shared by
+    every session, so its reader is only used under the viewer's lock: a
+    session reattaching to a republished bus unmaps the old block, which
+    others must not be reading meanwhile.
+    """
+
+    history = None
+    store = None
+
+    def __init__(self, bus_name):
+        self.reader = BusReader(bus_name)
+        self.label = bus_name
+        self.lock = threading.Lock()
+
+    @property
+    def cell_ids(self):
+        return self.reader.cell_ids
+
+    @property
+    def cell_types(self):
+        return self.reader.cell_types
+
+    @property
+    def is_running(self):
+        """Whether the publisher's bus is open"""
+        with self.lock:
+            return not self.reader.closed
+
+    @property
+    def version(self):
+        """Latest version published on the bus, or None while it is closed"""
+        with self.lock:
+            return None if self.reader.closed else self.reader.version
+
+    def snapshot(self):
+        with self.lock:
+            return self.reader.snapshot()
+
+    def close(self):
+        with self.lock:
+            self.reader.close()
+
+
+class BusSource(DataSource):
+    """Feeds an engine from another process's SnapshotBus instead of sampling itself.
+
+    Every tick published since the last poll that is still in the ring is
+    returned, so the local history misses none unless polled less often than
+    once per DEFAULT_SLOTS ticks. If the publisher switches to a different
+    cell layout the source stops returning ticks (see layout_changed). Meant
+    for processes recording or reprocessing a bus; dashboards that only view
+    one use BusViewer, which keeps no engine state.
+    """
+
+    name = "Snapshot Bus"
+
+    def __init__(self, bus_name):
+        self.reader = BusReader(bus_name)
+        self.cell_ids = list(self.reader.cell_ids)
+        self.cell_types = list(self.reader.cell_types)
+        self.type_codes = encode_cell_types(self.cell_types)
+        self._generation = self.reader.generation
+        self._seen = max(0, self.reader.version - 1)
+
+    @property
+    def layout_changed(self):
+        return self.reader.cell_ids != self.cell_ids
+
+    def poll(self):
+        ticks = self.reader.ticks_since(self._seen)
+        if self.layout_changed:
+            return []
+        if self.reader.generation != self._generation:
+            # Republished with the same layout: versions restart from one
+            self._generation = self.reader.generation
+            ticks = self.reader.ticks_since(0)
+        if ticks:
+            self._seen = ticks[-1][0]
+        return [(timestamp, batch) for _, timestamp, batch in ticks]
+
+    def close(self):
+        self.reader.close()
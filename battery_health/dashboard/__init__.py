@@ -0,0 +1,6 @@
+"""Streamlit views of the battery health dashboard.
+
+Chart modules (plotly.express and the figure builders) are imported by the
+tabs that draw them rather than with the package. plotly.graph_objects and
+pyarrow still load at first paint, because streamlit imports them itself.
+"""
@@ -0,0 +1,102 @@
+"""Plotly Express figures for the real-time, health, temperature and fleet views"""
+import plotly.express as px
+
+from battery_health.telemetry import CELL_CONFIGS, STATUSES
+
+# Status colors matching the overview cards
+STATUS_COLORS = {"Excellent": "#11998e", "Good": "#667eea", "Warning": "#f5576c", "Critical": "#ff416c"}
+
+def build_voltage_chart(df):
+    """Build the cell voltage comparison bar chart"""
+    fig_voltage = px.bar(
+        df, 
+        x="cell_id", 
+        y="voltage", 
+        color="cell_type",
+        title="🔋 Cell Voltage Comparison",
+        color_discrete_map={cell_type: config["color"] for cell_type, config in CELL_CONFIGS.items()}
+    )
+    fig_voltage.update_traces(marker_line_width=2, marker_line_color='white')
+    fig_voltage.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='#333',
+        title_font_size=20
+    )
+    return fig_voltage
+
+def build_health_histogram(df):
+    """Build the health distribution histogram colored by status"""
+    fig_health = px.histogram(
+        df, 
+        x="health", 
+        nbins=15, 
+        title="🎯 Health Distribution Analysis",
+        color="status",
+        color_discrete_map={
+            "Excellent": "#00ff88", 
+            "Good": "#667eea", 
+            "Warning": "#f093fb", 
+            "Critical": "#ff416c"
+        }
+    )
+    fig_health.update_traces(marker_line_width=2, marker_line_color='white')
+    fig_health.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='#333',
+        title_font_size=18
+    )
+    return fig_health
+
+def build_temperature_heatmap(df):
+    """Build the temperature heatmap of cell types by cells"""
+    temp_data = df.pivot_table(values='temperature', index='cell_type', columns='cell_id', fill_value=0)
+    fig_temp = px.imshow(
+        temp_data, 
+        title="🌡️ Temperature Heatmap",
+        color_continuous_scale="plasma",
+        aspect="auto"
+    )
+    fig_temp.update_layout(
+        title_font_size=18,
+        font_color='#333'
+    )
+    return fig_temp
+
+def build_temperature_scatter(df):
+    """Build the temperature vs power scatter, sized by health"""
+    fig_scatter = px.scatter(
+        df, 
+        x="temperature", 
+        y="power", 
+        color="cell_type",
+        size="health",
+        title="🔥 Temperature vs Power Analysis",
+        hover_data=["cell_id", "voltage", "current"],
+        color_discrete_map={cell_type: config["color"] for cell_type, config in CELL_CONFIGS.items()}
+    )
+    fig_scatter.update_traces(marker_line_width=2, marker_line_color='white')
+    fig_scatter.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='#333',
+        title_font_size=18
+    )
+    return fig_scatter
+
+def build_fleet_status_chart(bench_table):
+    """Build the stacked bar of cell status counts per bench"""
+    fig_fleet = px.bar(
+        bench_table, x="Bench", y=list(STATUSES), title="🛰️ Cell Status by Bench",
+        color_discrete_map=STATUS_COLORS
+    )
+    fig_fleet.update_layout(
+        barmode="stack",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='#333',
+        yaxis_title="Cells",
+        legend_title_text="Status"
+    )
+    return fig_fleet
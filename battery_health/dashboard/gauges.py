@@ -0,0 +1,117 @@
+"""Health gauge and heat-tile figures for the Enhanced Health tab"""
+import numpy as np
+import plotly.graph_objects as go
+
+def get_gauge_colors(health):
+    """Return (gauge color, bar color) based on health percentage"""
+    if health >= 90:
+        return "#00ff88", "#11998e"
+    elif health >= 75:
+        return "#667eea", "#764ba2"
+    elif health >= 50:
+        return "#f093fb", "#f5576c"
+    else:
+        return "#ff416c", "#ff4b2b"
+
+def build_gauge_indicator(cell_id, health_value, domain=None):
+    """Create an enhanced health gauge for one cell"""
+    gauge_color, bar_color = get_gauge_colors(health_value)
+    return go.Indicator(
+        mode = "gauge+number+delta",
+        value = health_value,
+        domain = domain or {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': f"🔋 {cell_id}", 'font': {'size': 14, 'color': '#333'}},
+        delta = {'reference': 100, 'increasing': {'color': gauge_color}},
+        gauge = {
+            'axis': {'range': [None, 100], 'tickcolor': '#666'},
+            'bar': {'color': bar_color, 'thickness': 0.8},
+            'bgcolor': "rgba(255,255,255,0.1)",
+            'borderwidth': 3,
+            'bordercolor': gauge_color,
+            'steps': [
+                {'range': [0, 25], 'color': "rgba(255, 65, 108, 0.2)"},
+                {'range': [25, 50], 'color': "rgba(240, 147, 251, 0.2)"},
+                {'range': [50, 75], 'color': "rgba(102, 126, 234, 0.2)"},
+                {'range': [75, 90], 'color': "rgba(17, 153, 142, 0.2)"},
+                {'range': [90, 100], 'color': "rgba(0, 255, 136, 0.3)"}
+            ],
+            'threshold': {
+                'line': {'color': gauge_color, 'width': 4},
+                'thickness': 0.75,
+                'value': 90
+            }
+        }
+    )
+
+def build_gauge_grid(cell_ids, health_values, columns=4):
+    """Pack every cell's gauge into one figure laid out on a domain grid"""
+    rows = -(-len(cell_ids) // columns)
+    fig_gauges = go.Figure([
+        build_gauge_indicator(cell_id, health_values[i], {'row': i // columns, 'column': i % columns})
+        for i, cell_id in enumerate(cell_ids)
+    ])
+    fig_gauges.update_layout(
+        grid={'rows': rows, 'columns': columns, 'pattern': "independent", 'ygap': 0.35},
+        height=280 * rows,
+        font={'color': "#333", 'size': 12},
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_gauges
+
+def update_gauge_grid(fig_gauges, health_values):
+    """Update gauge values and colors in place"""
+    with fig_gauges.batch_update():
+        for indicator, health_value in zip(fig_gauges.data, health_values):
+            gauge_color, bar_color = get_gauge_colors(health_value)
+            indicator.value = health_value
+            indicator.delta.increasing.color = gauge_color
+            indicator.gauge.bar.color = bar_color
+            indicator.gauge.bordercolor = gauge_color
+            indicator.gauge.threshold.line.color = gauge_color
+
+# Health color scale matching the gauge thresholds (0-100%)
+HEALTH_TILE_COLORSCALE = [
+    [0.0, "#ff416c"], [0.5, "#ff416c"],
+    [0.5, "#f093fb"], [0.75, "#f093fb"],
+    [0.75, "#667eea"], [0.9, "#667eea"],
+    [0.9, "#00ff88"], [1.0, "#00ff88"]
+]
+
+def health_tile_grid(values, columns):
+    """Reshape per-cell values into a row-major tile matrix padded with NaN"""
+    rows = -(-len(values) // columns)
+    if values.dtype == object:
+        grid = np.full(rows * columns, "", dtype=object)
+    else:
+        grid = np.full(rows * columns, np.nan)
+    grid[:len(values)] = values
+    return grid.reshape(rows, columns)
+
+def build_health_tiles(cell_ids, health_values):
+    """Render pack health as one compact heat-tile matrix"""
+    columns = max(1, int(np.ceil(np.sqrt(len(cell_ids) * 2))))
+    fig_tiles = go.Figure(go.Heatmap(
+        z=health_tile_grid(np.asarray(health_values, dtype=float), columns),
+        customdata=health_tile_grid(np.asarray(cell_ids, dtype=object), columns),
+        hovertemplate="%{customdata}<br>Health: %{z:.1f}%<extra></extra>",
+        colorscale=HEALTH_TILE_COLORSCALE,
+        zmin=0, zmax=100,
+        xgap=2, ygap=2,
+        colorbar={'title': "Health (%)"}
+    ))
+    fig_tiles.update_layout(
+        title="🎯 Pack Health Tiles",
+        height=max(300, 18 * -(-len(cell_ids) // columns) + 120),
+        font={'color': "#333", 'size': 12},
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis={'visible': False},
+        yaxis={'visible': False, 'autorange': "reversed"}
+    )
+    return fig_tiles
+
+def update_health_tiles(fig_tiles, health_values):
+    """Update the tile matrix values in place"""
+    columns = len(fig_tiles.data[0].z[0])
+    fig_tiles.data[0].z = health_tile_grid(np.asarray(health_values, dtype=float), columns)
@@ -0,0 +1,47 @@
+"""Rack layout temperature heatmap for the Temperature Monitor tab"""
+import plotly.graph_objects as go
+
+# Fixed color range (°C) so a color means the same temperature on every tick
+TEMPERATURE_RANGE = (20, 50)
+
+def build_rack_heatmap(image, labels, title, block_shape=None):
+    """Render a rack temperature image as one heatmap.
+
+    block_shape (rows, columns) outlines each module when the image shows
+    individual cells.
+    """
+    rows, columns = image.shape
+    fig_rack = go.Figure(go.Heatmap(
+        z=image,
+        customdata=labels,
+        hovertemplate="%{customdata}<br>Temperature: %{z:.1f}°C<extra></extra>",
+        colorscale="plasma",
+        zmin=TEMPERATURE_RANGE[0], zmax=TEMPERATURE_RANGE[1],
+        xgap=1, ygap=1,
+        colorbar={'title': "°C"}
+    ))
+    # Module outlines, set in one layout update (add_shape per line is slow on big racks)
+    shapes = []
+    if block_shape is not None:
+        block_rows, block_columns = block_shape
+        line = {'color': "#333", 'width': 2}
+        shapes += [{'type': "line", 'x0': -0.5, 'x1': columns - 0.5, 'y0': row - 0.5, 'y1': row - 0.5, 'line': line}
+                   for row in range(0, rows + 1, block_rows)]
+        shapes += [{'type': "line", 'x0': column - 0.5, 'x1': column - 0.5, 'y0': -0.5, 'y1': rows - 0.5, 'line': line}
+                   for column in range(0, columns + 1, block_columns)]
+    fig_rack.update_layout(
+        shapes=shapes,
+        title=title,
+        title_font_size=18,
+        height=min(1200, max(300, 14 * rows + 120)),
+        font_color='#333',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis={'visible': False},
+        yaxis={'visible': False, 'autorange': "reversed"}
+    )
+    return fig_rack
+
+def update_rack_heatmap(fig_rack, image):
+    """Replace the heatmap values in place"""
+    fig_rack.data[0].z = image
@@ -0,0 +1,50 @@
+"""Process-wide engines shared by every dashboard session"""
+import streamlit as st
+
+from battery_health.acquisition import AcquisitionEngine
+from battery_health.alerts import AlertDispatcher, WebhookStub
+from battery_health.fleet import FleetEngine
+from battery_health.profiling import MetricsServer, profiler
+
+@st.cache_resource
+def get_alert_dispatcher():
+    """Return the process-wide alert dispatcher shared by every engine"""
+    return AlertDispatcher()
+
+@st.cache_resource
+def get_webhook_stub():
+    """Return a local webhook receiver for trying the webhook sink"""
+    return WebhookStub()
+
+@st.cache_resource
+def get_acquisition_engine():
+    """Return the process-wide acquisition engine shared by every session"""
+    return AcquisitionEngine(dispatcher=get_alert_dispatcher())
+
+@st.cache_resource
+def get_fleet_engine():
+    """Return the process-wide fleet engine shared by every session"""
+    return FleetEngine(dispatcher=get_alert_dispatcher())
+
+@st.cache_resource
+def get_bus_viewer(name):
+    """Return the process-wide viewer of a snapshot bus another process publishes"""
+    from battery_health.bus import BusViewer
+    return BusViewer(name)
+
+@st.cache_resource
+def get_metrics_server(port):
+    """Return the Prometheus endpoint for the process-wide profiler on a local port"""
+    return MetricsServer(profiler, port=port)
+
+@st.cache_resource
+def get_export_server(port):
+    """Return the HTTP export endpoint for the process-wide acquisition engine on a local port"""
+    from battery_health.export import ExportServer
+    return ExportServer(get_acquisition_engine(), port=port)
+
+@st.cache_resource
+def get_protocol_simulator():
+    """Return the local BMS protocol simulator used by the gateway without hardware"""
+    from battery_health.gateway import ProtocolSimulator
+    return ProtocolSimulator([])
@@ -0,0 +1,225 @@
+"""Dashboard CSS and the HTML snippets that use it"""
+
+# Enhanced Custom CSS for better styling and animations
+DASHBOARD_CSS = """
+<style>
+    .main-header {
+        text-align: center;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        font-size: 3rem;
+        font-weight: bold;
+        margin-bottom: 2rem;
+        text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
+    }
+    
+    .metric-card {
+        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+        padding: 1.5rem;
+        border-radius: 15px;
+        border-left: 5px solid #1f77b4;
+        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+        transition: transform 0.3s ease;
+    }
+    
+    .metric-card:hover {
+        transform: translateY(-5px);
+    }
+    
+    .health-card {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        padding: 20px;
+        border-radius: 20px;
+        color: white;
+        text-align: center;
+        margin: 10px 0;
+        box-shadow: 0 8px 25px rgba(0,0,0,0.15);
+        transition: all 0.3s ease;
+        position: relative;
+        overflow: hidden;
+    }
+    
+    .health-card::before {
+        content: '';
+        position: absolute;
+        top: -50%;
+        left: -50%;
+        width: 200%;
+        height: 200%;
+        background: linear-gradient(45deg, transparent, rgba(255,255,255,0.1), transparent);
+        transform: rotate(45deg);
+        transition: all 0.6s ease;
+    }
+    
+    .health-card:hover::before {
+        animation: shine 0.6s ease-in-out;
+    }
+    
+    @keyframes shine {
+        0% { transform: translateX(-100%) translateY(-100%) rotate(45deg); }
+        100% { transform: translateX(100%) translateY(100%) rotate(45deg); }
+    }
+    
+    .health-excellent {
+        background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
+        animation: pulse-green 2s infinite;
+    }
+    
+    .health-good {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    }
+    
+    .health-warning {
+        background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+        animation: pulse-orange 2s infinite;
+    }
+    
+    .health-critical {
+        background: linear-gradient(135deg, #ff416c 0%, #ff4b2b 100%);
+        animation: pulse-red 1s infinite;
+    }
+    
+    @keyframes pulse-green {
+        0%, 100% { box-shadow: 0 8px 25px rgba(17, 153, 142, 0.3); }
+        50% { box-shadow: 0 8px 35px rgba(17, 153, 142, 0.6); }
+    }
+    
+    @keyframes pulse-orange {
+        0%, 100% { box-shadow: 0 8px 25px rgba(240, 147, 251, 0.3); }
+        50% { box-shadow: 0 8px 35px rgba(240, 147, 251, 0.6); }
+    }
+    
+    @keyframes pulse-red {
+        0%, 100% { box-shadow: 0 8px 25px rgba(255, 65, 108, 0.4); }
+        50% { box-shadow: 0 8px 35px rgba(255, 65, 108, 0.8); }
+    }
+    
+    .status-excellent {
+        color: #00ff88;
+        font-weight: bold;
+        text-shadow: 0 0 10px rgba(0, 255, 136, 0.5);
+    }
+    
+    .status-good {
+        color: #28a745;
+        font-weight: bold;
+        text-shadow: 0 0 10px rgba(40, 167, 69, 0.5);
+    }
+    
+    .status-warning {
+        color: #ff6b35;
+        font-weight: bold;
+        text-shadow: 0 0 10px rgba(255, 107, 53, 0.5);
+        animation: blink 1.5s infinite;
+    }
+    
+    .status-critical {
+        color: #ff3838;
+        font-weight: bold;
+        text-shadow: 0 0 15px rgba(255, 56, 56, 0.8);
+        animation: blink 0.8s infinite;
+    }
+    
+    @keyframes blink {
+        0%, 50% { opacity: 1; }
+        51%, 100% { opacity: 0.6; }
+    }
+    
+    .battery-icon {
+        font-size: 2.5rem;
+        margin-bottom: 10px;
+        display: block;
+    }
+    
+    .health-percentage {
+        font-size: 2.5rem;
+        font-weight: bold;
+        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
+    }
+    
+    .cell-name {
+        font-size: 1.1rem;
+        font-weight: 600;
+        margin-bottom: 5px;
+        opacity: 0.9;
+    }
+    
+    .health-card-grid {
+        display: grid;
+        grid-template-columns: repeat(4, minmax(0, 1fr));
+        column-gap: 1rem;
+    }
+    
+    .overview-card {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        padding: 20px;
+        border-radius: 15px;
+        text-align: center;
+        box-shadow: 0 8px 25px rgba(0,0,0,0.15);
+        margin: 10px 0;
+    }
+    
+    .overview-number {
+        font-size: 2rem;
+        font-weight: bold;
+        display: block;
+        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
+    }
+    
+    .overview-label {
+        font-size: 0.9rem;
+        opacity: 0.8;
+        text-transform: uppercase;
+        letter-spacing: 1px;
+    }
+</style>
+"""
+
+def get_battery_icon(health):
+    """Return battery icon based on health percentage"""
+    if health >= 90:
+        return "🔋"  # Full battery
+    elif health >= 75:
+        return "🔋"  # Good battery
+    elif health >= 50:
+        return "🪫"  # Medium battery
+    elif health >= 25:
+        return "🪫"  # Low battery
+    else:
+        return "🪫"  # Critical battery
+
+def get_health_class(health):
+    """Return CSS class based on health percentage"""
+    if health >= 90:
+        return "health-excellent"
+    elif health >= 75:
+        return "health-good"
+    elif health >= 50:
+        return "health-warning"
+    else:
+        return "health-critical"
+
+def get_status_class(status):
+    """Return CSS class based on status"""
+    if status == "Excellent":
+        return "status-excellent"
+    elif status == "Good":
+        return "status-good"
+    elif status == "Warning":
+        return "status-warning"
+    else:
+        return "status-critical"
+
+def render_health_card(cell_id, cell_type, health, status, voltage):
+    """Return the HTML of one animated health card"""
+    return (
+        f'<div class="health-card {get_health_class(health)}">'
+        f'<div class="battery-icon">{get_battery_icon(health)}</div>'
+        f'<div class="cell-name">{cell_id}</div>'
+        f'<div class="health-percentage">{health:.1f}%</div>'
+        f'<div class="{get_status_class(status)}" style="margin-top: 10px; font-size: 1.1rem;">{status}</div>'
+        f'<div style="margin-top: 8px; font-size: 0.9rem; opacity: 0.8;">{cell_type} • {voltage}V</div>'
+        f'</div>'
+    )
@@ -0,0 +1,62 @@
+"""Historical trend figure for the Historical Trends tab"""
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# Color palette for different cells on the trend charts
+TREND_COLORS = ['#00ff88', '#ff416c', '#f093fb', '#667eea', '#ffa726', '#ab47bc', '#26c6da', '#66bb6a']
+TREND_SUBPLOTS = [
+    ("voltage", "_V", 1, 1),
+    ("current", "_I", 1, 2),
+    ("temperature", "_T", 2, 1),
+    ("health", "_H", 2, 2)
+]
+
+def build_trends_figure(trends, cells=None):
+    """Build the historical trends figure with one trace per cell and metric.
+
+    cells limits the figure to those cell indices (all cells when None).
+    """
+    cells = range(len(trends.cell_ids)) if cells is None else cells
+    fig_trends = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=("⚡ Voltage Trends", "🔄 Current Trends", "🌡️ Temperature Trends", "💚 Health Trends"),
+        vertical_spacing=0.08
+    )
+    
+    for metric, suffix, row, col in TREND_SUBPLOTS:
+        for i, cell in enumerate(cells):
+            cell_id = trends.cell_ids[cell]
+            x, y = trends.trace(metric, cell)
+            fig_trends.add_trace(
+                go.Scatter(
+                    x=x,
+                    y=y,
+                    name=f"{cell_id}{suffix}",
+                    showlegend=metric == "voltage",
+                    line=dict(width=3, color=TREND_COLORS[i % len(TREND_COLORS)])
+                ),
+                row=row, col=col
+            )
+    
+    fig_trends.update_layout(
+        height=600, 
+        title_text="📈 Historical Data Trends",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='#333'
+    )
+    fig_trends.update_xaxes(title_text="Time")
+    fig_trends.update_yaxes(title_text="Voltage (V)", row=1, col=1)
+    fig_trends.update_yaxes(title_text="Current (A)", row=1, col=2)
+    fig_trends.update_yaxes(title_text="Temperature (°C)", row=2, col=1)
+    fig_trends.update_yaxes(title_text="Health (%)", row=2, col=2)
+    return fig_trends
+
+def update_trends_figure(fig_trends, trends, cells=None):
+    """Replace trace data in place with the current trend window"""
+    cells = range(len(trends.cell_ids)) if cells is None else cells
+    num_cells = len(cells)
+    with fig_trends.batch_update():
+        for k, trace in enumerate(fig_trends.data):
+            metric = TREND_SUBPLOTS[k // num_cells][0]
+            trace.x, trace.y = trends.trace(metric, cells[k % num_cells])
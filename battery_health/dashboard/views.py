@@ -0,0 +1,744 @@
+"""Per-group and fleet views; each tab imports its chart modules on first use"""
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from battery_health.alerts import ALERT_LEVELS
+from battery_health.anomaly import describe_flags
+from battery_health.dashboard.resources import get_acquisition_engine, get_alert_dispatcher, get_export_server
+from battery_health.dashboard.styles import render_health_card
+from battery_health.downsample import DOWNSAMPLE_METHODS
+from battery_health.profiling import profiler
+from battery_health.rack import RACK_CELL_LIMIT, RackLayout
+from battery_health.selection import SORT_ORDERS, paginate
+from battery_health.soh import END_OF_LIFE
+from battery_health.summary import rollup
+from battery_health.telemetry import CELL_TYPES, STATUSES
+from battery_health.trends import TREND_WINDOWS, DecimatedTrends, StoredTrends, TrendWindow
+
+def init_session_state():
+    """Create the per-session figure and trend caches on a session's first run"""
+    if 'trend_window' not in st.session_state:
+        st.session_state.trend_window = TrendWindow(size=50)
+        st.session_state.trend_figure = None
+        st.session_state.trend_figure_key = (None, 0)
+        st.session_state.trend_figure_cells = None
+    if 'decimated_trends' not in st.session_state:
+        st.session_state.decimated_trends = {}
+        st.session_state.stored_trends = None
+    if 'gauge_figure' not in st.session_state:
+        st.session_state.gauge_figure = None
+        st.session_state.gauge_figure_key = None
+        st.session_state.gauge_figure_version = 0
+    if 'rack_figure' not in st.session_state:
+        st.session_state.rack_layout = None
+        st.session_state.rack_figure = None
+        st.session_state.rack_figure_key = None
+        st.session_state.rack_figure_version = None
+
+def plot_chart(fig, name):
+    """Draw a figure with st.plotly_chart, timed and sized when profiling is enabled"""
+    if not profiler.enabled:
+        st.plotly_chart(fig, use_container_width=True)
+        return
+    profiler.record_size(name, len(fig.to_json()))
+    with profiler.phase(f"chart/{name}"):
+        st.plotly_chart(fig, use_container_width=True)
+
+# Health cards rendered per page of the card grid
+CARDS_PER_PAGE = 48
+
+# Live views: each runs as a fragment that refreshes on its own interval
+
+@profiler.timed("tab/overview")
+def render_overview(engine, bench_name, group_num):
+    """Render the system overview cards"""
+    snapshot = engine.snapshot()
+    summary = snapshot.summary
+    
+    # System overview with enhanced styling
+    st.header(f"📊 System Overview - {bench_name} (Group {group_num})")
+    if engine is get_acquisition_engine() and engine.last_error:
+        st.warning(f"Sampling is failing, so this tick may be stale: {engine.last_error}")
+
+    # Summary metrics with enhanced cards (aggregated once per tick and shared)
+    total_cells = summary.total_cells
+    excellent_cells, good_cells, warning_cells, critical_cells = summary.status_counts
+    avg_health = summary.mean_health
+    total_power = summary.total_power
+    
+    col1, col2, col3, col4, col5, col6, col7 = st.columns(7)
+    
+    with col1:
+        st.markdown(f"""
+        <div class="overview-card">
+            <span class="overview-number">{total_cells}</span>
+            <span class="overview-label">Total Cells</span>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div class="overview-card" style="background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);">
+            <span class="overview-number">{excellent_cells}</span>
+            <span class="overview-label">Excellent</span>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+        <div class="overview-card" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);">
+            <span class="overview-number">{good_cells}</span>
+            <span class="overview-label">Good</span>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        st.markdown(f"""
+        <div class="overview-card" style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);">
+            <span class="overview-number">{warning_cells}</span>
+            <span class="overview-label">Warning</span>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col5:
+        st.markdown(f"""
+        <div class="overview-card" style="background: linear-gradient(135deg, #ff416c 0%, #ff4b2b 100%);">
+            <span class="overview-number">{critical_cells}</span>
+            <span class="overview-label">Critical</span>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col6:
+        st.markdown(f"""
+        <div class="overview-card">
+            <span class="overview-number">{avg_health:.1f}%</span>
+            <span class="overview-label">Avg Health</span>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col7:
+        st.markdown(f"""
+        <div class="overview-card">
+            <span class="overview-number">{total_power:.1f}W</span>
+            <span class="overview-label">Total Power</span>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    p5, _, median, _, p95 = summary.health_percentiles
+    st.caption(
+        f"Health min {summary.min_health:.1f}% · p5 {p5:.1f}% · median {median:.1f}% · "
+        f"p95 {p95:.1f}% · max {summary.max_health:.1f}% | "
+        + " · ".join(
+            f"{cell_type}: {count} cells, {health:.1f}%, {power:.1f}W"
+            for cell_type, count, health, power in zip(
+                CELL_TYPES, summary.type_counts, summary.type_mean_health, summary.type_total_power
+            )
+            if count
+        )
+    )
+    
+    render_early_warnings(snapshot)
+    render_alert_feed(snapshot.alert_levels, engine.label)
+
+# Alerts listed in the overview feeds, newest first
+ALERT_FEED_ROWS = 20
+
+def render_alert_feed(alert_levels=None, source=None):
+    """Show active alert counts and the latest dispatched alerts"""
+    dispatcher = get_alert_dispatcher()
+    alerts = dispatcher.feed.recent(ALERT_FEED_ROWS, source)
+    active = "" if alert_levels is None else " · ".join(
+        f"{np.count_nonzero(alert_levels == level)} {name}" for level, name in enumerate(ALERT_LEVELS) if level
+    )
+    with st.expander(f"🔔 Alerts ({active or 'fleet'})", expanded=bool(alerts)):
+        if alerts:
+            st.dataframe(pd.DataFrame({
+                "Time": [alert.timestamp for alert in alerts],
+                "Source": [alert.source for alert in alerts],
+                "Level": [ALERT_LEVELS[alert.level] for alert in alerts],
+                "Message": [alert.message for alert in alerts],
+            }), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No alerts yet.")
+        if dispatcher.dropped:
+            st.caption(f"{dispatcher.dropped} alerts dropped while the dispatch queue was full")
+
+# Early-warning rows listed in the overview, most anomalous first
+MAX_WARNING_ROWS = 100
+
+def render_early_warnings(snapshot):
+    """List the cells the streaming anomaly detector currently flags"""
+    anomalies = snapshot.anomalies
+    if anomalies is None:
+        return
+    flagged = np.flatnonzero(anomalies.flags)
+    if not len(flagged):
+        return
+    severity = np.abs(anomalies.z_scores[flagged]).max(axis=1)
+    flagged = flagged[np.argsort(-severity, kind="stable")][:MAX_WARNING_ROWS]
+    with st.expander(f"🚨 Early Warnings ({np.count_nonzero(anomalies.flags)} cells)", expanded=True):
+        st.dataframe(pd.DataFrame({
+            "Cell": np.asarray(snapshot.cell_ids, dtype=object)[flagged],
+            "Warnings": [", ".join(describe_flags(flags)) for flags in anomalies.flags[flagged]],
+            "dT/dt (°C/min)": anomalies.temperature_rate[flagged].round(2),
+            "Voltage vs Pack (%)": (anomalies.voltage_deviation[flagged] * 100).round(2),
+            "Max |z|": np.abs(anomalies.z_scores[flagged]).max(axis=1).round(1),
+        }), use_container_width=True, hide_index=True)
+
+@profiler.timed("tab/realtime")
+def render_realtime_tab(engine):
+    """Render the real-time data table and voltage chart"""
+    from battery_health.dashboard import charts
+    
+    st.subheader("Real-time Cell Data")
+    
+    # Shared per-tick DataFrame
+    df = engine.snapshot().frame
+    
+    # Display data table with colored status
+    df_display = df[["cell_id", "cell_type", "voltage", "current", "temperature", "power", "capacity", "health", "status"]].copy()
+    st.dataframe(df_display, use_container_width=True)
+    
+    # Enhanced voltage comparison chart with better colors
+    with profiler.phase("figure/voltage"):
+        fig_voltage = charts.build_voltage_chart(df)
+    plot_chart(fig_voltage, "voltage")
+
+@profiler.timed("tab/health")
+def render_health_tab(engine, gauge_tile_threshold):
+    """Render health cards, gauges and the health distribution"""
+    import plotly.graph_objects as go
+    from battery_health.dashboard import charts
+    from battery_health.dashboard.gauges import (
+        build_gauge_grid, build_gauge_indicator, build_health_tiles, update_gauge_grid, update_health_tiles
+    )
+    
+    snapshot = engine.snapshot()
+    
+    st.subheader("🔋 Enhanced Battery Health Indicators")
+    
+    # Enhanced health cards: filtered, sorted and paginated server-side so each
+    # page is a single HTML payload regardless of pack size; filters and
+    # orderings are lookups in the tick's shared cell index
+    batch = snapshot.batch
+    index = snapshot.index
+    counts_by_status = index.status_counts
+    counts_by_type = index.type_counts
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        status_filter = st.multiselect(
+            "Status", STATUSES, default=list(STATUSES), key="card_status_filter",
+            format_func=lambda label: f"{label} ({counts_by_status[STATUSES.index(label)]})"
+        )
+    with col2:
+        type_filter = st.multiselect(
+            "Cell Type", CELL_TYPES, default=list(CELL_TYPES), key="card_type_filter",
+            format_func=lambda label: f"{label} ({counts_by_type[CELL_TYPES.index(label)]})"
+        )
+    with col3:
+        card_order = st.selectbox("Sort By", list(SORT_ORDERS), key="card_order")
+    with col4:
+        card_limit = st.number_input("Show Only First N (0 = all)", min_value=0, value=0, step=10, key="card_limit")
+    
+    card_indices = index.select(
+        statuses=status_filter, cell_types=type_filter,
+        order=SORT_ORDERS[card_order], limit=card_limit or None
+    )
+    page_count = max(1, -(-len(card_indices) // CARDS_PER_PAGE))
+    card_page = st.number_input(
+        f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, key="card_page"
+    ) if page_count > 1 else 1
+    page_indices, _ = paginate(card_indices, card_page - 1, CARDS_PER_PAGE)
+    
+    st.caption(f"Showing {len(page_indices)} of {len(card_indices)} matching cells ({len(snapshot.cell_ids)} total)")
+    st.markdown(
+        '<div class="health-card-grid">'
+        + "".join(
+            render_health_card(
+                snapshot.cell_ids[i], snapshot.cell_types[i], batch["health"][i],
+                STATUSES[batch["status"][i]], batch["voltage"][i]
+            )
+            for i in page_indices
+        )
+        + '</div>',
+        unsafe_allow_html=True
+    )
+    
+    # Enhanced circular health indicators
+    st.subheader("🎯 Health Overview Gauges")
+    gauge_mode = st.radio(
+        "Gauge Layout", ["Single Figure", "Per Cell"],
+        horizontal=True, key="gauge_mode"
+    )
+    health_values = snapshot.batch["health"]
+    
+    if gauge_mode == "Per Cell":
+        gauge_cols = st.columns(4)
+        for i, cell_id in enumerate(snapshot.cell_ids):
+            with gauge_cols[i % 4]:
+                fig_gauge = go.Figure(build_gauge_indicator(cell_id, health_values[i]))
+                fig_gauge.update_layout(
+                    height=280,
+                    font={'color': "#333", 'size': 12},
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    plot_bgcolor='rgba(0,0,0,0)'
+                )
+                plot_chart(fig_gauge, "gauge")
+    else:
+        # One figure for the whole pack, swapped to heat tiles for large packs;
+        # it is rebuilt only when the cell layout changes and updated in place otherwise
+        use_tiles = len(snapshot.cell_ids) > gauge_tile_threshold
+        gauge_key = (use_tiles, tuple(snapshot.cell_ids))
+        with profiler.phase("figure/health_gauges"):
+            if st.session_state.gauge_figure_key != gauge_key:
+                if use_tiles:
+                    st.session_state.gauge_figure = build_health_tiles(snapshot.cell_ids, health_values)
+                else:
+                    st.session_state.gauge_figure = build_gauge_grid(snapshot.cell_ids, health_values)
+                st.session_state.gauge_figure_key = gauge_key
+            elif st.session_state.gauge_figure_version != (id(engine), snapshot.version):
+                if use_tiles:
+                    update_health_tiles(st.session_state.gauge_figure, health_values)
+                else:
+                    update_gauge_grid(st.session_state.gauge_figure, health_values)
+        # Versions are per engine, so fleet partitions are told apart by engine
+        st.session_state.gauge_figure_version = (id(engine), snapshot.version)
+        plot_chart(st.session_state.gauge_figure, "health_gauges")
+    
+    # Enhanced health distribution with better colors
+    df = snapshot.frame
+    with profiler.phase("figure/health_histogram"):
+        fig_health = charts.build_health_histogram(df)
+    plot_chart(fig_health, "health_histogram")
+    
+    render_soh(snapshot)
+
+# Cells listed in the state of health table, lowest state of health first
+MAX_SOH_ROWS = 100
+
+def render_soh(snapshot):
+    """Render state of health and remaining useful life from the SOH estimator"""
+    soh = snapshot.soh
+    st.subheader("🧮 State of Health & Remaining Useful Life")
+    if soh is None or np.isnan(soh.soh).all():
+        st.info("State of health estimates appear once enough ticks have been recorded.")
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Mean SOH", f"{np.nanmean(soh.soh):.1f}%")
+    with col2:
+        st.metric("Lowest SOH", f"{np.nanmin(soh.soh):.1f}%")
+    with col3:
+        st.metric("Equivalent Cycles", f"{np.nanmean(soh.cycles):.2f}")
+    with col4:
+        shortest = np.nanmin(soh.rul_hours)
+        st.metric("Shortest RUL", "—" if np.isinf(shortest) else f"{shortest:,.0f} h")
+    st.caption(f"Capacity fade fitted against coulomb-counted throughput; end of life at "
+               f"{END_OF_LIFE:.0%} of the fitted initial capacity.")
+    
+    worst = np.argsort(soh.soh, kind="stable")[:MAX_SOH_ROWS]
+    st.dataframe(pd.DataFrame({
+        "Cell": np.asarray(snapshot.cell_ids, dtype=object)[worst],
+        "SOH (%)": soh.soh[worst].round(2),
+        "Capacity (Ah)": soh.capacity[worst].round(3),
+        "Fade / Cycle (mAh)": (soh.fade_per_cycle[worst] * 1000).round(2),
+        "Net Charge (Ah)": soh.charge_ah[worst].round(3),
+        "Throughput (Ah)": soh.throughput_ah[worst].round(3),
+        "RUL (cycles)": soh.rul_cycles[worst].round(0),
+        "RUL (hours)": soh.rul_hours[worst].round(0),
+    }), use_container_width=True, hide_index=True)
+
+@profiler.timed("tab/temperature")
+def render_temperature_tab(engine):
+    """Render the temperature heatmap and temperature vs power scatter"""
+    from battery_health.dashboard import charts
+    
+    df = engine.snapshot().frame
+    
+    st.subheader("🔥 Temperature Monitoring")
+    
+    heatmap_mode = st.radio("Heatmap Layout", ["Rack", "By Cell Type"], horizontal=True, key="heatmap_mode")
+    if heatmap_mode == "Rack":
+        render_rack_heatmap(engine)
+    else:
+        # Enhanced temperature heatmap
+        with profiler.phase("figure/temperature_heatmap"):
+            fig_temp = charts.build_temperature_heatmap(df)
+        plot_chart(fig_temp, "temperature_heatmap")
+    
+    # Enhanced temperature vs power scatter with better styling
+    with profiler.phase("figure/temperature_scatter"):
+        fig_scatter = charts.build_temperature_scatter(df)
+    plot_chart(fig_scatter, "temperature_scatter")
+
+# Rack heatmap tiles: label -> module aggregation (None draws every cell)
+RACK_TILES = {"Cells": None, "Module Max": "max", "Module Mean": "mean"}
+
+def render_rack_heatmap(engine):
+    """Draw cell temperatures on the physical module/series/parallel grid"""
+    from battery_health.dashboard.rack_heatmap import build_rack_heatmap, update_rack_heatmap
+    
+    snapshot = engine.snapshot()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        series = st.number_input("Series per Module", min_value=1, max_value=1024, value=16, key="rack_series")
+    with col2:
+        parallel = st.number_input("Parallel per Series", min_value=1, max_value=64, value=1, key="rack_parallel")
+    with col3:
+        module_columns = st.number_input("Modules per Row (0 = auto)", min_value=0, max_value=1024, value=0,
+                                         key="rack_module_columns")
+    with col4:
+        tiles = st.selectbox("Tiles", ["Auto"] + list(RACK_TILES), key="rack_tiles")
+    
+    # The layout (cell-to-pixel map and image buffers) is rebuilt only when it changes
+    layout_key = (len(snapshot.cell_ids), series, parallel, module_columns or None)
+    if st.session_state.rack_layout is None or st.session_state.rack_layout[0] != layout_key:
+        st.session_state.rack_layout = (layout_key, RackLayout(*layout_key))
+    layout = st.session_state.rack_layout[1]
+    if tiles == "Auto":
+        tiles = "Module Max" if len(snapshot.cell_ids) > RACK_CELL_LIMIT else "Cells"
+    aggregation = RACK_TILES[tiles]
+    
+    temperature = snapshot.batch["temperature"]
+    with profiler.phase("figure/rack_heatmap"):
+        image = layout.fill(temperature) if aggregation is None else layout.aggregate(temperature, aggregation)
+        figure_key = (layout.key, aggregation, tuple(snapshot.cell_ids))
+        if st.session_state.rack_figure_key != figure_key:
+            if aggregation is None:
+                st.session_state.rack_figure = build_rack_heatmap(
+                    image, layout.cell_labels(snapshot.cell_ids), "🌡️ Rack Temperature",
+                    (layout.series, layout.parallel)
+                )
+            else:
+                st.session_state.rack_figure = build_rack_heatmap(
+                    image, layout.module_labels(), f"🌡️ Rack Temperature (module {aggregation})"
+                )
+            st.session_state.rack_figure_key = figure_key
+        elif st.session_state.rack_figure_version != (id(engine), snapshot.version):
+            update_rack_heatmap(st.session_state.rack_figure, image)
+    st.session_state.rack_figure_version = (id(engine), snapshot.version)
+    st.caption(f"{layout.modules} modules of {layout.series}S{layout.parallel}P in "
+               f"{layout.module_rows} x {layout.module_columns}")
+    plot_chart(st.session_state.rack_figure, "rack_heatmap")
+
+# Time range option reading persisted telemetry instead of the in-memory history
+STORED_RANGE = "Stored range"
+
+def pick_stored_range(store, key_prefix="stored"):
+    """Pick a persisted time range with date and time inputs; return (start, end) or None"""
+    stored = store.time_range()
+    if stored is None:
+        st.info(f"No telemetry persisted yet; ticks are written to disk every {store.flush_seconds:.0f} s.")
+        return None
+    # The pickers have minute resolution; widen the default to whole minutes
+    first = pd.Timestamp(stored[0]).floor("min").to_pydatetime()
+    last = (pd.Timestamp(stored[1]).floor("min") + pd.Timedelta(minutes=1)).to_pydatetime()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        start_date = st.date_input("From", value=first.date(), min_value=first.date(),
+                                   max_value=last.date(), key=f"{key_prefix}_start_date")
+    with col2:
+        start_time = st.time_input("From Time", value=first.time(), step=60, key=f"{key_prefix}_start_time")
+    with col3:
+        end_date = st.date_input("To", value=last.date(), min_value=first.date(),
+                                 max_value=last.date(), key=f"{key_prefix}_end_date")
+    with col4:
+        end_time = st.time_input("To Time", value=last.time(), step=60, key=f"{key_prefix}_end_time")
+    start = np.datetime64(datetime.combine(start_date, start_time), "us")
+    end = np.datetime64(datetime.combine(end_date, end_time), "us")
+    if end <= start:
+        st.warning("The end of the range must be after its start.")
+        return None
+    return start, end
+
+def get_stored_trends(store):
+    """Pick a persisted time range and return its cached StoredTrends"""
+    picked = pick_stored_range(store)
+    if picked is None:
+        return None
+    start, end = picked
+    
+    trends = st.session_state.stored_trends
+    if trends is None or trends.store is not store or trends.start != start or trends.end != end:
+        trends = StoredTrends(store, start, end)
+        st.session_state.stored_trends = trends
+    return trends
+
+@profiler.timed("tab/trends")
+def render_trends_tab(engine):
+    """Render the historical trend charts"""
+    from battery_health.dashboard.trend_charts import build_trends_figure, update_trends_figure
+    
+    st.subheader("⚡ Historical Trends")
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        trend_range = st.radio(
+            "Time Range", ["Last 50 ticks"] + list(TREND_WINDOWS) + ([STORED_RANGE] if engine.store else []),
+            horizontal=True, key="trend_range"
+        )
+    with col2:
+        trend_method = st.selectbox(
+            "Downsampling", DOWNSAMPLE_METHODS,
+            format_func={"lttb": "LTTB", "minmax": "Min/Max"}.get,
+            key="trend_method", disabled=trend_range == "Last 50 ticks"
+        )
+    
+    # Plotted cells come from the tick's cell index; worst N follows the live health order
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        trend_types = st.multiselect("Cell Type", CELL_TYPES, default=list(CELL_TYPES), key="trend_type_filter")
+    with col2:
+        trend_limit = st.number_input("Worst N Cells (0 = all)", min_value=0, value=0, step=4, key="trend_limit")
+    trend_cells = np.sort(engine.snapshot().index.select(
+        cell_types=trend_types, order="worst" if trend_limit else "index", limit=trend_limit or None
+    ))
+    if not len(trend_cells):
+        st.info("No cells match the trend filters.")
+        return
+    
+    if trend_range == "Last 50 ticks":
+        # Only ticks recorded since the previous rerun are merged into the window
+        trends = st.session_state.trend_window
+        trends.update(engine)
+    elif trend_range == STORED_RANGE:
+        # Any persisted range, streamed from disk and decimated to a fixed budget
+        trends = get_stored_trends(engine.store)
+        if trends is None:
+            return
+        trends.update(trend_method)
+    else:
+        # Long ranges are decimated server-side to a fixed point budget per trace
+        if trend_range not in st.session_state.decimated_trends:
+            st.session_state.decimated_trends[trend_range] = DecimatedTrends(trend_range)
+        trends = st.session_state.decimated_trends[trend_range]
+        trends.update(engine, trend_method)
+    
+    if len(trends) > 1:
+        cells_key = tuple(trend_cells.tolist())
+        with profiler.phase("figure/trends"):
+            if (st.session_state.trend_figure_key[0] != trends.key[0]
+                    or st.session_state.trend_figure_cells != cells_key):
+                st.session_state.trend_figure = build_trends_figure(trends, trend_cells)
+            elif st.session_state.trend_figure_key != trends.key:
+                update_trends_figure(st.session_state.trend_figure, trends, trend_cells)
+        st.session_state.trend_figure_key = trends.key
+        st.session_state.trend_figure_cells = cells_key
+    
+        plot_chart(st.session_state.trend_figure, "trends")
+    else:
+        st.info("Start monitoring to see historical trends...")
+
+# Export scopes offered by the export panel
+EXPORT_SCOPES = ["Current Snapshot", "In-Memory History", STORED_RANGE]
+EXPORT_SERVER_SCOPES = dict(zip(EXPORT_SCOPES, ("snapshot", "history", "stored")))
+
+def render_export_panel(engine, bench_name, group_num):
+    """Offer downloads of the snapshot or any history range, built on click or streamed by the endpoint"""
+    from battery_health.export import (
+        EXPORT_COLUMNS, EXPORT_COMPRESSIONS, EXPORT_FORMATS, export_file_name, history_rows, snapshot_rows,
+        stored_rows, write_rows
+    )
+    
+    if engine.snapshot() is None:
+        st.info("Initialize cells to export their telemetry.")
+        return
+    # Bus viewers keep neither history nor a store; fleet partitions mirror history only when drilled into
+    available = (True, engine.history is not None, engine.store is not None)
+    scope = st.radio("Export", [scope for scope, ok in zip(EXPORT_SCOPES, available) if ok], horizontal=True,
+                     key="export_scope")
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        columns = st.multiselect("Columns", EXPORT_COLUMNS, default=list(EXPORT_COLUMNS), key="export_columns")
+    with col2:
+        fmt = st.selectbox("Format", list(EXPORT_FORMATS), format_func={"parquet": "Parquet", "csv": "CSV",
+                                                                        "ndjson": "NDJSON"}.get, key="export_format")
+    with col3:
+        compression = st.selectbox("Compression", list(EXPORT_COMPRESSIONS), index=1, key="export_compression")
+    col1, col2 = st.columns(2)
+    with col1:
+        cell_types = st.multiselect("Cell Types", CELL_TYPES, default=list(CELL_TYPES), key="export_cell_types")
+    with col2:
+        cells = st.text_input("Cell IDs (comma separated, empty = all)", key="export_cells")
+    filters = {"columns": columns, "cells": [cell.strip() for cell in cells.split(",")] if cells.strip() else None,
+               "cell_types": cell_types}
+    if not columns:
+        st.warning("Select at least one column to export.")
+        return
+    
+    start = end = None
+    if scope == "In-Memory History":
+        minutes = st.number_input("Last Minutes (0 = all)", min_value=0, value=0, key="export_minutes")
+        if minutes:
+            # Counted back from the latest tick, so replayed logs export their own last minutes
+            with engine.lock:
+                latest = engine.history.latest()
+            latest = np.datetime64(engine.snapshot().timestamp, "us") if latest is None else latest[0]
+            start = latest - np.timedelta64(minutes, "m")
+    elif scope == STORED_RANGE:
+        picked = pick_stored_range(engine.store, key_prefix="export")
+        if picked is None:
+            return
+        start, end = picked
+    
+    # Streamlit holds a download button's whole file in memory; the endpoint streams it in chunks
+    server = None
+    if engine is get_acquisition_engine() and st.checkbox(
+            "Serve Export Endpoint", key="serve_export",
+            help="Download through a local HTTP endpoint that streams ranges of any size"):
+        export_port = st.number_input("Export Port", min_value=1024, max_value=65535, value=9465,
+                                      key="export_port")
+        try:
+            server = get_export_server(int(export_port))
+        except OSError as exc:
+            st.error(f"Could not serve exports on port {export_port}: {exc}")
+    
+    if server is not None:
+        st.link_button("⬇️ Download", server.link(EXPORT_SERVER_SCOPES[scope], fmt, compression, start=start,
+                                                  end=end, **filters))
+        st.caption(f"GET {server.url}/snapshot, /history or /stored "
+                   "with format, compression, columns, cells, cell_types, start and end parameters")
+    else:
+        def build():
+            if scope == "Current Snapshot":
+                tables = snapshot_rows(engine.snapshot(), **filters)
+            elif scope == "In-Memory History":
+                tables = history_rows(engine, start, end, **filters)
+            else:
+                # Ticks still buffered for the next flush belong to the range too
+                engine.store.flush()
+                tables = stored_rows(engine.store.directory, start, end, **filters)
+            # Spooled to disk as it streams, so only Streamlit's copy of the file is held in memory
+            with tempfile.TemporaryFile() as handle:
+                with profiler.phase("export"):
+                    write_rows(tables, handle, fmt, compression, columns)
+                handle.seek(0)
+                return handle.read()
+        
+        slug = scope.lower().replace(" ", "_").replace("-", "_")
+        st.download_button(
+            "⬇️ Download", data=build, mime=EXPORT_FORMATS[fmt][1], on_click="ignore", key="export_download",
+            file_name=export_file_name(f"{bench_name}_group{group_num}_{slug}", fmt, compression)
+        )
+    if engine.store is not None:
+        st.caption(f"From a shell: python -m battery_health export {engine.store.root} out.parquet "
+                   f"--bench {bench_name} --group {group_num} --start ... --end ...")
+
+def render_group_views(engine, bench_name, group_num, run_every, gauge_tile_threshold):
+    """Render the overview and tabs of one bench group (single mode or fleet drill-down)"""
+    st.fragment(render_overview, run_every=run_every["overview"])(engine, bench_name, group_num)
+    
+    # Tabs for different views; only the open tab's fragment runs
+    tab1, tab2, tab3, tab4 = st.tabs(
+        ["📈 Real-time Data", "🔋 Enhanced Health", "🔥 Temperature Monitor", "⚡ Historical Trends"],
+        key="active_tab", on_change="rerun"
+    )
+    
+    with tab1:
+        if tab1.open:
+            st.fragment(render_realtime_tab, run_every=run_every["realtime"])(engine)
+    
+    with tab2:
+        if tab2.open:
+            st.fragment(render_health_tab, run_every=run_every["health"])(engine, gauge_tile_threshold)
+    
+    with tab3:
+        if tab3.open:
+            st.fragment(render_temperature_tab, run_every=run_every["temperature"])(engine)
+    
+    with tab4:
+        if tab4.open:
+            st.fragment(render_trends_tab, run_every=run_every["trends"])(engine)
+    
+    with st.expander("📤 Export Data"):
+        render_export_panel(engine, bench_name, group_num)
+
+@profiler.timed("tab/fleet_overview")
+def render_fleet_overview(fleet):
+    """Render fleet-wide cards and per-bench roll-ups of every partition"""
+    from battery_health.dashboard import charts
+    
+    snapshots = fleet.snapshots()
+    if not snapshots:
+        st.info("Waiting for the first fleet sample...")
+        return
+    keys = list(snapshots)
+    summaries = [snapshot.summary for snapshot in snapshots.values()]
+    with profiler.phase("fleet_rollup"):
+        benches, totals = rollup(summaries, [bench for bench, _ in keys])
+        groups, group_totals = rollup(summaries, [f"{bench} / Group {group}" for bench, group in keys])
+    
+    st.header(f"🛰️ Fleet Overview - {len(benches)} Benches, {len(keys)} Groups")
+    if fleet.last_error:
+        st.warning(f"{fleet.last_error}: showing their last sample. Initialize the fleet again to restart them.")
+    
+    total_cells = totals["cells"].sum()
+    fleet_health = np.nansum(totals["mean_health"] * totals["cells"]) / max(1, total_cells)
+    cards = [
+        (f"{total_cells}", "Total Cells"),
+        (f"{totals['status_2'].sum()}", "Warning"),
+        (f"{totals['status_3'].sum()}", "Critical"),
+        (f"{fleet_health:.1f}%", "Avg Health"),
+        (f"{totals['total_power'].sum() / 1000:.1f}kW", "Total Power"),
+    ]
+    for column, (value, label) in zip(st.columns(len(cards)), cards):
+        with column:
+            st.markdown(f"""
+            <div class="overview-card">
+                <span class="overview-number">{value}</span>
+                <span class="overview-label">{label}</span>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    bench_table = pd.DataFrame({
+        "Bench": benches,
+        "Groups": totals["partitions"],
+        "Cells": totals["cells"],
+        **{status: totals[f"status_{i}"] for i, status in enumerate(STATUSES)},
+        "Avg Health (%)": totals["mean_health"].round(1),
+        "Min Health (%)": totals["min_health"].round(1),
+        "Total Power (W)": totals["total_power"].round(1),
+    })
+    with profiler.phase("figure/fleet_status"):
+        fig_fleet = charts.build_fleet_status_chart(bench_table)
+    plot_chart(fig_fleet, "fleet_status")
+    st.dataframe(bench_table, use_container_width=True, hide_index=True)
+    
+    render_alert_feed()
+    
+    # Groups needing attention first: most critical cells, then lowest health
+    order = np.lexsort((group_totals["mean_health"], -group_totals["status_3"]))[:10]
+    st.subheader("⚠️ Groups Needing Attention")
+    st.dataframe(pd.DataFrame({
+        "Group": groups[order],
+        "Critical": group_totals["status_3"][order],
+        "Warning": group_totals["status_2"][order],
+        "Avg Health (%)": group_totals["mean_health"][order].round(1),
+        "Min Health (%)": group_totals["min_health"][order].round(1),
+    }), use_container_width=True, hide_index=True)
+
+def render_diagnostics():
+    """Show rolling phase latencies and chart payload sizes from the profiler"""
+    stats = profiler.stats()
+    if not stats:
+        st.caption("No phases timed yet.")
+        return
+    st.dataframe(pd.DataFrame({
+        "Phase": list(stats),
+        "Count": [count for count, _, _, _ in stats.values()],
+        "p50 (ms)": [quantiles[0] * 1000 for _, _, quantiles, _ in stats.values()],
+        "p99 (ms)": [quantiles[1] * 1000 for _, _, quantiles, _ in stats.values()],
+        "Last (ms)": [last * 1000 for _, _, _, last in stats.values()],
+    }).round(2), use_container_width=True, hide_index=True)
+    sizes = profiler.sizes()
+    if sizes:
+        st.dataframe(pd.DataFrame({
+            "Chart": list(sizes),
+            "Payload (KB)": [nbytes / 1024 for nbytes in sizes.values()],
+        }).round(1), use_container_width=True, hide_index=True)
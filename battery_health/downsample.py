@@ -0,0 +1,161 @@
+from collections import deque
+
+import numpy as np
+
+# Downsampling methods selectable on the trend charts
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+def _all_indices(n, cells):
+    return np.broadcast_to(np.arange(n)[:, None], (n, cells))
+
+
+def minmax_indices(y, n_out):
+    """Return (points, cells) indices keeping the min and max of each bucket.
+
+    y has time on axis 0 and one column per cell. Buckets are fixed width, so
+    the bulk of the work is a reshaped view plus two argmin/argmax reductions.
+    """
+    n, cells = y.shape
+    if n_out >= n or n_out < 2:
+        return _all_indices(n, cells)
+    width = -(-n // (n_out // 2))
+    full = n // width
+    blocks = y[:full * width].reshape(full, width, cells)
+    base = (np.arange(full) * width)[:, None]
+    parts = [base + blocks.argmin(axis=1), base + blocks.argmax(axis=1)]
+    if full * width < n:
+        tail = y[full * width:]
+        parts += [full * width + tail.argmin(axis=0)[None], full * width + tail.argmax(axis=0)[None]]
+    return np.sort(np.concatenate(parts), axis=0)
+
+
+def lttb_indices(x, y, n_out):
+    """Return (n_out, cells) indices chosen by Largest-Triangle-Three-Buckets.
+
+    x is the time axis as floats, either shared (n,) or per cell (n, cells),
+    and y has one column per cell. The bucket loop is sequential by nature,
+    but every step is vectorized across all cells.
+    """
+    n, cells = y.shape
+    if n_out >= n or n_out < 3:
+        return _all_indices(n, cells)
+    x = np.broadcast_to(x[:, None], y.shape) if x.ndim == 1 else x
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    counts = np.diff(edges)[:, None]
+    avg_x = np.add.reduceat(x[:-1], edges[:-1], axis=0) / counts
+    avg_y = np.add.reduceat(y[:-1], edges[:-1], axis=0) / counts
+
+    selected = np.empty((n_out, cells), dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    columns = np.arange(cells)
+    previous = np.zeros(cells, dtype=np.intp)
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 1 < len(counts):
+            next_x, next_y = avg_x[b + 1], avg_y[b + 1]
+        else:
+            next_x, next_y = x[-1], y[-1]
+        prev_x, prev_y = x[previous, columns], y[previous, columns]
+        area = np.abs((prev_x - next_x) * (y[lo:hi] - prev_y)
+                      - (prev_x - x[lo:hi]) * (next_y - prev_y))
+        previous = lo + np.argmax(np.nan_to_num(area, nan=-1.0), axis=0)
+        selected[b + 1] = previous
+    return selected
+
+
+def downsample(timestamps, y, n_out, method="lttb"):
+    """Decimate per-cell series to at most n_out points each.
+
+    timestamps is either a shared (n,) time axis or per cell (n, cells), and
+    y is (n, cells). Returns (x, values) arrays of shape (cells, points).
+    """
+    if method == "minmax":
+        indices = minmax_indices(y, n_out)
+    elif method == "lttb":
+        x = (timestamps - timestamps.min()).astype("timedelta64[us]").astype(np.float64)
+        indices = lttb_indices(x, y, n_out)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    columns = np.arange(y.shape[1])
+    x = timestamps[indices] if timestamps.ndim == 1 else timestamps[indices, columns]
+    return x.T, y[indices, columns].T
+
+
+class MinMaxAggregator:
+    """Running min/max per fixed time bucket for many series sharing a clock.
+
+    Buckets are aligned to absolute time, so completed buckets never change
+    and add() only reduces the newly appended samples. At most max_buckets
+    buckets are kept, which bounds memory for any history length while
+    preserving every extreme value in the window.
+    """
+
+    def __init__(self, bucket_seconds, max_buckets):
+        self.bucket_us = max(1, int(bucket_seconds * 1_000_000))
+        self.max_buckets = max_buckets
+        self.reset()
+
+    def reset(self):
+        self._buckets = deque()  # (bucket_id, (min_t, min_v, max_t, max_v))
+        self._open_id = None
+        self._open = None
+
+    def __len__(self):
+        return len(self._buckets) + (self._open is not None)
+
+    @property
+    def open_bucket(self):
+        """Absolute id of the bucket currently receiving samples"""
+        return self._open_id
+
+    def add(self, timestamps, y):
+        """Fold (k,) timestamps and (k, cells) samples into the buckets.
+
+        Returns False, without changing state, if the samples are older than
+        the open bucket (e.g. after a replay seek); the caller should reset.
+        """
+        if not len(timestamps):
+            return True
+        timestamps = timestamps.astype("datetime64[us]")
+        ids = timestamps.astype(np.int64) // self.bucket_us
+        steps = np.diff(ids)
+        if (self._open_id is not None and ids[0] < self._open_id) or (steps < 0).any():
+            return False
+        columns = np.arange(y.shape[1])
+        boundaries = np.flatnonzero(steps) + 1
+        for start, end in zip(np.concatenate(([0], boundaries)), np.concatenate((boundaries, [len(ids)]))):
+            segment = y[start:end]
+            imin, imax = segment.argmin(axis=0), segment.argmax(axis=0)
+            entry = (timestamps[start + imin], segment[imin, columns],
+                     timestamps[start + imax], segment[imax, columns])
+            if ids[start] == self._open_id:
+                entry = self._merge(self._open, entry)
+            elif self._open is not None:
+                self._buckets.append((self._open_id, self._open))
+            self._open_id, self._open = ids[start], entry
+        while self._buckets and self._buckets[0][0] <= self._open_id - self.max_buckets:
+            self._buckets.popleft()
+        return True
+
+    @staticmethod
+    def _merge(current, new):
+        min_t, min_v, max_t, max_v = current
+        lower = new[1] < min_v
+        higher = new[3] > max_v
+        return (np.where(lower, new[0], min_t), np.where(lower, new[1], min_v),
+                np.where(higher, new[2], max_t), np.where(higher, new[3], max_v))
+
+    def series(self):
+        """Return (timestamps, values) of shape (points, cells) in time order"""
+        entries = [entry for _, entry in self._buckets] + [self._open]
+        min_t, min_v, max_t, max_v = (np.stack(column) for column in zip(*entries))
+        min_first = min_t <= max_t
+        timestamps = np.empty((2 * len(entries),) + min_t.shape[1:], dtype=min_t.dtype)
+        values = np.empty(timestamps.shape, dtype=min_v.dtype)
+        timestamps[0::2] = np.where(min_first, min_t, max_t)
+        timestamps[1::2] = np.where(min_first, max_t, min_t)
+        values[0::2] = np.where(min_first, min_v, max_v)
+        values[1::2] = np.where(min_first, max_v, min_v)
+        return timestamps, values
@@ -0,0 +1,405 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from battery_health.storage import STORE_SCHEMA, read_rows
+from battery_health.telemetry import METRICS, STATUSES
+
+# Export formats: name -> (file suffix, MIME type)
+EXPORT_FORMATS = {
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "csv": (".csv", "text/csv"),
+    "ndjson": (".ndjson", "application/x-ndjson"),
+}
+
+# Parquet compresses its pages with the codec; CSV and NDJSON compress the whole stream
+EXPORT_COMPRESSIONS = {"none": "", "zstd": ".zst", "gzip": ".gz"}
+
+# Long format like the telemetry store (and replay logs), with status as its label
+EXPORT_SCHEMA = pa.schema(
+    [field for field in STORE_SCHEMA if field.name != "status"]
+    + [("status", pa.dictionary(pa.int8(), pa.string()))]
+)
+EXPORT_COLUMNS = tuple(EXPORT_SCHEMA.names)
+
+# zlib level for gzip-compressed CSV and NDJSON streams
+GZIP_LEVEL = 6
+
+# Rows per chunk read from in-memory history (rounded down to whole ticks)
+CHUNK_ROWS = 1_000_000
+
+# Rows rendered to NDJSON at a time, bounding the intermediate string arrays
+NDJSON_BATCH_ROWS = 65_536
+
+# Bytes buffered per chunk sent by the HTTP endpoint
+HTTP_CHUNK_BYTES = 1 << 20
+
+_STATUS_LABELS = pa.array(STATUSES, pa.string())
+
+
+def export_columns(columns=None):
+    """Return the exported column names in schema order; raise ValueError for unknown ones"""
+    if columns is None:
+        return list(EXPORT_COLUMNS)
+    unknown = sorted(set(columns) - set(EXPORT_COLUMNS))
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+    if not columns:
+        raise ValueError("Select at least one column to export")
+    return [name for name in EXPORT_COLUMNS if name in columns]
+
+
+def export_schema(columns=None):
+    """Return EXPORT_SCHEMA restricted to the given columns"""
+    return pa.schema([EXPORT_SCHEMA.field(name) for name in export_columns(columns)])
+
+
+def export_file_name(stem, fmt="parquet", compression="zstd"):
+    """Return a file name for an export, with the stream compression suffix for text formats"""
+    suffix = EXPORT_FORMATS[fmt][0]
+    if fmt != "parquet":
+        suffix += EXPORT_COMPRESSIONS[compression]
+    return stem + suffix
+
+
+def _check_options(fmt, compression):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if compression not in EXPORT_COMPRESSIONS:
+        raise ValueError(f"Unknown export compression: {compression}")
+
+
+def _cell_positions(cell_ids, cell_types, cells=None, types=None):
+    """Return the positions of the cells passing the cell id and cell type filters"""
+    keep = np.ones(len(cell_ids), dtype=bool)
+    if cells is not None:
+        keep &= pd.Index(cell_ids).isin(list(cells))
+    if types is not None:
+        keep &= pd.Index(cell_types).isin(list(types))
+    return np.flatnonzero(keep)
+
+
+def _tick_table(timestamps, values, metrics, status, cell_ids, cell_types, columns):
+    """Build the long-format table of ticks from (ticks, cells, metrics) values and (ticks, cells) status"""
+    num_ticks, num_cells = status.shape
+    cell_index = pa.array(np.tile(np.arange(num_cells, dtype=np.int32), num_ticks))
+    metric_index = {metric: i for i, metric in enumerate(metrics)}
+    data = {}
+    for name in columns:
+        if name == "timestamp":
+            data[name] = pa.array(np.repeat(np.asarray(timestamps, dtype="datetime64[us]"), num_cells))
+        elif name == "cell_id":
+            data[name] = pa.DictionaryArray.from_arrays(cell_index, pa.array(cell_ids, pa.string()))
+        elif name == "cell_type":
+            data[name] = pa.DictionaryArray.from_arrays(cell_index, pa.array(cell_types, pa.string()))
+        elif name == "status":
+            data[name] = pa.DictionaryArray.from_arrays(pa.array(status.ravel().astype(np.int8)), _STATUS_LABELS)
+        elif name in metric_index:
+            data[name] = pa.array(values[:, :, metric_index[name]].ravel().astype(np.float32))
+        else:
+            data[name] = pa.nulls(num_ticks * num_cells, pa.float32())
+    return pa.Table.from_pydict(data, schema=export_schema(columns))
+
+
+def snapshot_rows(snapshot, columns=None, cells=None, cell_types=None):
+    """Yield the cells of one snapshot as a long-format table"""
+    columns = export_columns(columns)
+    if snapshot is None:
+        return
+    positions = _cell_positions(snapshot.cell_ids, snapshot.cell_types, cells, cell_types)
+    values = np.stack([snapshot.batch[metric][positions] for metric in METRICS], axis=-1)[None]
+    yield _tick_table(
+        [np.datetime64(snapshot.timestamp, "us")], values, METRICS, snapshot.batch["status"][positions][None],
+        [snapshot.cell_ids[i] for i in positions], [snapshot.cell_types[i] for i in positions], columns
+    )
+
+
+def history_rows(engine, start=None, end=None, columns=None, cells=None, cell_types=None, chunk_rows=CHUNK_ROWS):
+    """Yield the engine's in-memory history in [start, end] as long-format tables.
+
+    The history is copied one chunk of about chunk_rows rows at a time under
+    the engine lock, so sampling continues while a long range streams out.
+    Ticks evicted from the ring before their chunk is reached are skipped, and
+    the export stops if the engine is reconfigured meanwhile.
+    """
+    columns = export_columns(columns)
+    with engine.lock:
+        history = engine.history
+        if history is None:
+            return
+        timestamps = history.window()[0]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, np.datetime64(pd.Timestamp(start), "us")))
+        hi = len(timestamps) if end is None else int(np.searchsorted(
+            timestamps, np.datetime64(pd.Timestamp(end), "us"), side="right"))
+        # Absolute tick numbers, which stay valid while new ticks are appended
+        first_tick = history.total_ticks - len(timestamps) + lo
+        last_tick = history.total_ticks - len(timestamps) + hi
+        cell_ids, all_types = engine.cell_ids, engine.cell_types
+    positions = _cell_positions(cell_ids, all_types, cells, cell_types)
+    cell_ids = [cell_ids[i] for i in positions]
+    all_types = [all_types[i] for i in positions]
+    ticks_per_chunk = max(1, chunk_rows // max(1, len(positions)))
+
+    for chunk_start in range(first_tick, last_tick, ticks_per_chunk):
+        chunk_end = min(last_tick, chunk_start + ticks_per_chunk)
+        with engine.lock:
+            if engine.history is not history:
+                return
+            oldest = history.total_ticks - len(history)
+            chunk_start = max(chunk_start, oldest)
+            if chunk_start >= chunk_end:
+                continue
+            timestamps, values, status = history.window(history.total_ticks - chunk_start)
+            count = chunk_end - chunk_start
+            timestamps = timestamps[:count].copy()
+            values = values[:count, positions]
+            status = status[:count, positions]
+        yield _tick_table(timestamps, values, history.metrics, status, cell_ids, all_types, columns)
+
+
+def stored_rows(directory, start=None, end=None, columns=None, cells=None, cell_types=None):
+    """Yield persisted telemetry of a store directory in [start, end] as long-format tables.
+
+    Reads one Parquet row group at a time (see storage.read_rows), so ranges
+    of any length stream with a bounded footprint.
+    """
+    columns = export_columns(columns)
+    for table in read_rows(directory, start, end, columns, cells, cell_types):
+        if "status" in columns:
+            status = table.column("status").combine_chunks()
+            table = table.set_column(table.schema.get_field_index("status"), "status",
+                                     pa.DictionaryArray.from_arrays(status, _STATUS_LABELS))
+        yield table
+
+
+def _ndjson_lines(batch):
+    """Render a record batch as NDJSON with Arrow string kernels, one line per row.
+
+    Floats print in their shortest float32 form (32.7, not 32.70000076) and
+    missing or non-finite readings as null.
+    """
+    fields = []
+    for name, column in zip(batch.schema.names, batch.columns):
+        if pa.types.is_dictionary(column.type):
+            # Quote the few distinct values once, then pick them per row
+            quoted = pa.array([json.dumps(value) for value in column.dictionary.to_pylist()], pa.string())
+            text = quoted.take(column.indices)
+        elif pa.types.is_timestamp(column.type):
+            # Every cell of a tick shares its timestamp: format each tick once
+            ticks = column.dictionary_encode()
+            formatted = pc.strftime(ticks.dictionary, "%Y-%m-%dT%H:%M:%S")
+            text = pc.binary_join_element_wise('"', formatted, '"', "").take(ticks.indices)
+        else:
+            text = pc.if_else(pc.is_finite(column), pc.cast(column, pa.string()), "null")
+        fields.append(pc.binary_join_element_wise(f"{json.dumps(name)}:", pc.fill_null(text, "null"), ""))
+    lines = pc.binary_join_element_wise("{", pc.binary_join_element_wise(*fields, ","), "}\n", "")
+    offsets = np.frombuffer(lines.buffers()[1], dtype=np.int32)
+    return lines.buffers()[2][offsets[lines.offset]:offsets[lines.offset + len(lines)]]
+
+
+class _Sink:
+    """Binary file wrapper for pyarrow that tracks its position and never closes the file"""
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.handle.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        self.handle.flush()
+
+    def close(self):
+        self.flush()
+
+
+def _write_stream(tables, handle, fmt, compression, schema):
+    sink = _Sink(handle)
+    rows = 0
+    if fmt == "parquet":
+        with pq.ParquetWriter(sink, schema, compression=compression) as writer:
+            for table in tables:
+                writer.write_table(table)
+                rows += table.num_rows
+        return rows
+
+    if compression == "gzip":
+        # Arrow's gzip stream always uses level 9, several times slower than zlib's default
+        stream = pa.PythonFile(gzip.GzipFile(fileobj=sink, mode="wb", compresslevel=GZIP_LEVEL), mode="w")
+    else:
+        stream = pa.PythonFile(sink, mode="w")
+        if compression != "none":
+            stream = pa.CompressedOutputStream(stream, compression)
+    try:
+        if fmt == "csv":
+            with pa_csv.CSVWriter(stream, schema) as writer:
+                for table in tables:
+                    writer.write_table(table)
+                    rows += table.num_rows
+        else:
+            for table in tables:
+                for batch in table.to_batches(max_chunksize=NDJSON_BATCH_ROWS):
+                    stream.write(_ndjson_lines(batch))
+                rows += table.num_rows
+    finally:
+        stream.close()
+    return rows
+
+
+def write_rows(tables, destination, fmt="parquet", compression="zstd", columns=None):
+    """Stream long-format tables to a path or binary file object; return the rows written.
+
+    Tables are written as they arrive, one chunk at a time, so the whole
+    export is never held in memory. columns must match the columns the
+    tables were produced with.
+    """
+    _check_options(fmt, compression)
+    schema = export_schema(columns)
+    if isinstance(destination, (str, Path)):
+        with open(destination, "wb") as handle:
+            return _write_stream(tables, handle, fmt, compression, schema)
+    return _write_stream(tables, destination, fmt, compression, schema)
+
+
+def export_stored(directory, destination, start=None, end=None, fmt="parquet", compression="zstd",
+                  columns=None, cells=None, cell_types=None):
+    """Export a persisted time range of a store directory to destination; return the rows written.
+
+    The entry point for analytics jobs: e.g. export_stored(store_directory(root,
+    bench, group), "range.parquet", start, end, columns=["timestamp", "cell_id",
+    "voltage"]) pulls millions of rows at a flat memory footprint.
+    """
+    _check_options(fmt, compression)
+    tables = stored_rows(directory, start, end, columns, cells, cell_types)
+    return write_rows(tables, destination, fmt, compression, columns)
+
+
+class _ChunkedWriter:
+    """Writes an HTTP/1.1 chunked response body, buffering small writes"""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer += data
+        if len(self.buffer) >= HTTP_CHUNK_BYTES:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        if self.buffer:
+            self.wfile.write(b"%x\r\n" % len(self.buffer) + bytes(self.buffer) + b"\r\n")
+            self.buffer.clear()
+
+    def finish(self):
+        self.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class ExportServer:
+    """Local HTTP endpoint streaming an engine's telemetry as a download.
+
+    GET /export/snapshot, /export/history (in-memory) or /export/stored
+    (persisted store) with optional query parameters format, compression,
+    columns, cells, cell_types (comma separated), start and end. The body is
+    sent with chunked transfer encoding as the rows are read, e.g.
+
+        curl -o range.parquet "http://127.0.0.1:9465/export/stored?start=2024-05-01T10:00"
+    """
+
+    SCOPES = ("snapshot", "history", "stored")
+
+    def __init__(self, engine, host="127.0.0.1", port=9465):
+        def export(scope, query):
+            def option(name, default=None):
+                return query[name][-1] if name in query else default
+
+            def names(name):
+                return option(name).split(",") if option(name) else None
+
+            fmt, compression = option("format", "parquet"), option("compression", "zstd")
+            _check_options(fmt, compression)
+            columns = export_columns(names("columns"))
+            filters = {"columns": columns, "cells": names("cells"), "cell_types": names("cell_types")}
+            if scope == "snapshot":
+                tables = snapshot_rows(engine.snapshot(), **filters)
+            elif scope == "history":
+                tables = history_rows(engine, option("start"), option("end"), **filters)
+            else:
+                if engine.store is None:
+                    raise ValueError("Telemetry is not being persisted")
+                engine.store.flush()
+                tables = stored_rows(engine.store.directory, option("start"), option("end"), **filters)
+            return fmt, compression, columns, tables
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                scope = url.path.rstrip("/").rpartition("/")[2]
+                if not url.path.startswith("/export/") or scope not in ExportServer.SCOPES:
+                    self.send_error(404)
+                    return
+                try:
+                    fmt, compression, columns, tables = export(scope, parse_qs(url.query))
+                except (OSError, ValueError) as error:
+                    self.send_error(400, str(error))
+                    return
+                name = export_file_name(f"battery_{scope}", fmt, compression)
+                self.send_response(200)
+                self.send_header("Content-Type", EXPORT_FORMATS[fmt][1])
+                self.send_header("Content-Disposition", f'attachment; filename="{name}"')
+                self.send_header("Transfer-Encoding", "chunked")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                body = _ChunkedWriter(self.wfile)
+                try:
+                    write_rows(tables, body, fmt, compression, columns)
+                    body.finish()
+                except (OSError, ValueError):
+                    pass  # client went away or the range could not be read; the connection closes
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self._server.server_port}/export"
+        threading.Thread(target=self._server.serve_forever, name="export-server", daemon=True).start()
+
+    def link(self, scope, fmt="parquet", compression="zstd", columns=None, cells=None, cell_types=None,
+             start=None, end=None):
+        """Return the URL streaming an export of scope with these options"""
+        if scope not in self.SCOPES:
+            raise ValueError(f"Unknown export scope: {scope}")
+        query = {"format": fmt, "compression": compression}
+        for name, values in (("columns", columns), ("cells", cells), ("cell_types", cell_types)):
+            if values is not None:
+                query[name] = ",".join(values)
+        for name, value in (("start", start), ("end", end)):
+            if value is not None:
+                query[name] = pd.Timestamp(value).isoformat()
+        return f"{self.url}/{scope}?{urlencode(query)}"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,432 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+
+from battery_health.acquisition import MIN_INTERVAL, AcquisitionEngine, Snapshot
+from battery_health.history import DEFAULT_CAPACITY, HistoryBuffer
+from battery_health.sources import SimulatorSource
+from battery_health.telemetry import CELL_TYPES, encode_cell_types
+
+logger = logging.getLogger(__name__)
+
+# Raised by a worker's connection once the worker process has died
+WORKER_ERRORS = (BrokenPipeError, EOFError, OSError)
+
+
+def simulator_specs(benches, groups, cells, cell_types=CELL_TYPES, seed=None):
+    """Return partition specs for a simulated fleet of benches x groups x cells.
+
+    Cell types are drawn from cell_types, so a single type gives uniform
+    groups. Specs map (bench, group) to a picklable (factory, args, kwargs).
+    """
+    rng = np.random.default_rng(seed)
+    specs = {}
+    for bench in benches:
+        for group in groups:
+            types = [str(cell_type) for cell_type in rng.choice(list(cell_types), cells)]
+            cell_ids = [f"Cell_{i+1}_{cell_type}" for i, cell_type in enumerate(types)]
+            specs[(bench, group)] = (SimulatorSource, (cell_ids, types), {})
+    return specs
+
+
+class _AlertOutbox:
+    """Collects a worker engine's alerts until the fleet fetches them"""
+
+    def __init__(self):
+        self.alerts = []
+
+    def submit(self, alerts):
+        self.alerts += alerts
+
+    def drain(self):
+        alerts, self.alerts = self.alerts, []
+        return alerts
+
+
+def _history_since(engine, since):
+    """Return (total ticks, timestamps, values, status) copies of the ticks recorded after since"""
+    history = engine.history
+    new_ticks = len(history) if since is None else min(history.total_ticks - since, len(history))
+    timestamps, values, status = history.window(new_ticks)
+    return history.total_ticks, timestamps.copy(), values.copy(), status.copy()
+
+
+def _new_snapshots(engines, published):
+    """Return the snapshot fields of the engines that published since the last call"""
+    snapshots = {}
+    for key, engine in engines.items():
+        snapshot = engine.snapshot()
+        if snapshot is not None and published.get(key) != snapshot.version:
+            published[key] = snapshot.version
+            snapshots[key] = (snapshot.version, snapshot.timestamp, snapshot.batch, snapshot.anomalies,
+                              snapshot.alert_levels, snapshot.soh)
+    return snapshots
+
+
+def _ticks_written(engines):
+    """Return the ticks each engine's store has written so far"""
+    return {key: engine.store.ticks_written for key, engine in engines.items() if engine.store is not None}
+
+
+def _serve_partitions(connection, specs, options):
+    """Worker process loop: run the engines of some partitions and sample them on request.
+
+    Each partition's AcquisitionEngine (history, detection, alerts, SOH and
+    store) lives here, so the fleet process only receives snapshot fields,
+    alerts, and history for the partitions it mirrors.
+    """
+    outbox = _AlertOutbox()
+    engines = {}
+    for (bench, group), (factory, args, kwargs) in specs.items():
+        source = factory(*args, **kwargs)
+        engine = AcquisitionEngine(options["interval"], options["capacity"],
+                                   history_dtype=options["history_dtype"], dispatcher=outbox)
+        store = None
+        if options["store_root"] is not None:
+            # Imported here so sampling without persistence never loads pyarrow
+            from battery_health.storage import TelemetryStore
+            store = TelemetryStore(options["store_root"], bench, group, source.cell_ids, source.cell_types)
+        engine.configure(source, store=store, label=f"{bench} / Group {group}")
+        engines[(bench, group)] = engine
+    published = {}
+    # configure() took each partition's first sample, so it goes out with the layouts
+    connection.send(({key: (engine.cell_ids, engine.cell_types, engine.history.nbytes)
+                      for key, engine in engines.items()}, _new_snapshots(engines, published)))
+    while True:
+        command, *arguments = connection.recv()
+        if command == "sample":
+            record, history_since = arguments
+            for engine in engines.values():
+                engine.sample(record=record)
+                if engine.store is not None:
+                    engine.store.flush_if_due()
+            snapshots = _new_snapshots(engines, published)
+            histories = {key: _history_since(engines[key], since) for key, since in history_since.items()}
+            connection.send((snapshots, outbox.drain(), histories, _ticks_written(engines)))
+        elif command == "history":
+            connection.send({key: _history_since(engines[key], since) for key, since in arguments[0].items()})
+        elif command == "resume":
+            for engine in engines.values():
+                engine.source.resume()
+        elif command == "flush":
+            keys = engines if arguments[0] is None else arguments[0]
+            for key in keys:
+                if engines[key].store is not None:
+                    engines[key].store.flush()
+            connection.send(_ticks_written(engines))
+        elif command == "close":
+            for engine in engines.values():
+                engine.source.close()
+                if engine.store is not None:
+                    engine.store.close()
+            connection.close()
+            return
+
+
+class WorkerStore:
+    """Fleet-process handle on a partition store that a worker writes.
+
+    Reads go to a TelemetryStore opened on the same directory. ticks_written
+    follows the count the worker reports with each sample, so StoredTrends
+    refreshes as ticks are persisted, and flush() has the worker write the
+    ticks it still buffers.
+    """
+
+    def __init__(self, reader, flush):
+        self.reader = reader
+        self.ticks_written = 0
+        self._flush = flush
+
+    def flush(self):
+        self._flush()
+
+    def close(self):
+        """The worker owns the store; there is nothing to write from here"""
+
+    def __getattr__(self, name):
+        return getattr(self.reader, name)
+
+
+class FleetPartition:
+    """Fleet-process view of a partition whose engine runs in a worker.
+
+    Offers what the per-group views read from an AcquisitionEngine: the
+    latest snapshot the worker published, a WorkerStore on the partition's
+    store, and, while the partition is drilled into, a HistoryBuffer
+    mirroring the worker's (history is None otherwise). A partition whose worker died is
+    marked stale and keeps its last snapshot until the fleet is reconfigured.
+    """
+
+    def __init__(self, key, cell_ids, cell_types, store=None):
+        self.key = key
+        self.label = f"{key[0]} / Group {key[1]}"
+        self.cell_ids = list(cell_ids)
+        self.cell_types = list(cell_types)
+        self.type_codes = encode_cell_types(self.cell_types)
+        self.lock = threading.Lock()
+        self.store = store
+        self.history = None
+        self.synced_ticks = None
+        self.stale = False
+        self._snapshot = None
+
+    def snapshot(self):
+        """Return the latest published snapshot, or None before the first sample"""
+        return self._snapshot
+
+    def publish(self, version, timestamp, batch, anomalies, alert_levels, soh):
+        """Publish the snapshot fields a worker sent for this partition"""
+        previous = self._snapshot
+        self._snapshot = Snapshot(version, timestamp, self.cell_ids, self.cell_types, self.type_codes, batch,
+                                  anomalies, alert_levels, soh, previous)
+        if previous is not None:
+            previous.release_previous()
+
+    def mirror(self, capacity, dtype):
+        """Start mirroring the worker's history into a fresh HistoryBuffer"""
+        with self.lock:
+            self.history = HistoryBuffer(self.cell_ids, capacity=capacity, dtype=dtype)
+            self.synced_ticks = None
+
+    def release(self):
+        """Stop mirroring the history"""
+        with self.lock:
+            self.history = None
+            self.synced_ticks = None
+
+    def extend_history(self, total_ticks, timestamps, values, status):
+        """Append ticks a worker recorded since the last sync"""
+        with self.lock:
+            if self.history is None:
+                return
+            metrics = self.history.metrics
+            for tick, timestamp in enumerate(timestamps):
+                batch = {metric: values[tick, :, index] for index, metric in enumerate(metrics)}
+                batch["status"] = status[tick]
+                self.history.append(timestamp, batch)
+            self.synced_ticks = total_ticks
+
+
+class FleetEngine:
+    """Samples many (bench, group) partitions across a pool of worker processes.
+
+    Partitions are spread round-robin over the workers. Each worker runs its
+    partitions' AcquisitionEngines (history, detection, alerts, SOH and
+    optional store under a shared root) in parallel with the others and sends
+    back only snapshot fields and alerts, so the fleet thread stays light
+    however many partitions there are. The per-group views work unchanged on
+    the FleetPartition returned by focus(), whose history is mirrored from
+    its worker while it is drilled into. A worker that dies is dropped, with
+    its partitions marked stale and the reason kept in last_error, while the
+    other workers keep sampling.
+    """
+
+    def __init__(self, interval=1.0, capacity=DEFAULT_CAPACITY, history_dtype=np.float32, dispatcher=None):
+        self.interval = max(MIN_INTERVAL, interval)
+        self.dispatcher = dispatcher
+        self.capacity = capacity
+        self.history_dtype = history_dtype
+        self.partitions = {}
+        self.history_nbytes = 0
+        self.last_error = None
+        self._workers = []  # (process, connection, keys)
+        self._focus = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def configure(self, specs, workers=None, store_root=None, capacity=None):
+        """Start workers for the partition specs and publish the first sample of each"""
+        self.stop()
+        with self._lock:
+            self._close_workers()
+            if capacity is not None:
+                self.capacity = capacity
+            keys = list(specs)
+            workers = max(1, min(workers or os.cpu_count() or 1, len(keys)))
+            options = {"interval": self.interval, "capacity": self.capacity,
+                       "history_dtype": self.history_dtype, "store_root": store_root}
+            # Spawned workers do not inherit the dashboard's threads or locks
+            context = multiprocessing.get_context("spawn")
+            for index in range(workers):
+                worker_keys = keys[index::workers]
+                connection, child = context.Pipe()
+                process = context.Process(
+                    target=_serve_partitions, args=(child, {key: specs[key] for key in worker_keys}, options),
+                    name=f"battery-fleet-{index}", daemon=True
+                )
+                process.start()
+                child.close()
+                self._workers.append((process, connection, worker_keys))
+
+            self.partitions, self.history_nbytes, self._focus, self.last_error = {}, 0, None, None
+            for process, connection, _ in self._workers:
+                try:
+                    layouts, snapshots = connection.recv()
+                except WORKER_ERRORS:
+                    self._close_workers()
+                    self.partitions = {}
+                    raise OSError(f"Fleet worker {process.name} exited while opening its partitions") from None
+                for key, (cell_ids, cell_types, history_nbytes) in layouts.items():
+                    store = None
+                    if store_root is not None:
+                        # Imported here so sampling without persistence never loads pyarrow
+                        from battery_health.storage import TelemetryStore
+                        store = WorkerStore(TelemetryStore(store_root, *key, cell_ids, cell_types),
+                                            lambda key=key: self.flush([key]))
+                    self.partitions[key] = FleetPartition(key, cell_ids, cell_types, store)
+                    self.history_nbytes += history_nbytes
+                for key, fields in snapshots.items():
+                    self.partitions[key].publish(*fields)
+            self.partitions = {key: self.partitions[key] for key in keys}
+
+    def set_interval(self, seconds):
+        """Change the sampling interval; takes effect from the next tick"""
+        self.interval = max(MIN_INTERVAL, float(seconds))
+
+    def focus(self, key):
+        """Return the partition to drill into, mirroring its worker's history"""
+        with self._lock:
+            partition = self.partitions[key]
+            if self._focus != key:
+                if self._focus is not None:
+                    self.partitions[self._focus].release()
+                partition.mirror(self.capacity, self.history_dtype)
+                self._focus = key
+            for worker in self._workers:
+                if key in worker[2]:
+                    try:
+                        worker[1].send(("history", {key: partition.synced_ticks}))
+                        partition.extend_history(*worker[1].recv()[key])
+                    except WORKER_ERRORS as error:
+                        self._drop_worker(worker, error)
+                    break
+        return partition
+
+    def sample(self, record=True):
+        """Have every worker sample its partitions in parallel and publish each one's latest tick"""
+        with self._lock:
+            sampling = []
+            for worker in list(self._workers):
+                history_since = {}
+                if self._focus in worker[2]:
+                    history_since[self._focus] = self.partitions[self._focus].synced_ticks
+                if self._send(worker, ("sample", record, history_since)):
+                    sampling.append(worker)
+            alerts = []
+            for worker in sampling:
+                try:
+                    snapshots, worker_alerts, histories, written = worker[1].recv()
+                except WORKER_ERRORS as error:
+                    self._drop_worker(worker, error)
+                    continue
+                self._record_written(written)
+                for key, fields in snapshots.items():
+                    self.partitions[key].publish(*fields)
+                for key, history in histories.items():
+                    self.partitions[key].extend_history(*history)
+                alerts += worker_alerts
+            if alerts and self.dispatcher is not None:
+                self.dispatcher.submit(alerts)
+
+    def snapshots(self):
+        """Return {(bench, group): snapshot} of the partitions sampled so far"""
+        return {key: partition.snapshot() for key, partition in self.partitions.items()
+                if partition.snapshot() is not None}
+
+    def start(self):
+        """Start the fleet sampling thread if it is not already running"""
+        if self.is_running or not self.partitions:
+            return
+        with self._lock:
+            for worker in list(self._workers):
+                self._send(worker, ("resume",))
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="battery-fleet", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the sampling thread and flush every partition's store"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(1.0, 2 * self.interval))
+            self._thread = None
+        self.flush()
+
+    def flush(self, keys=None):
+        """Have the workers write the ticks their stores buffer (of keys, or of every partition)"""
+        with self._lock:
+            flushing = []
+            for worker in list(self._workers):
+                worker_keys = None if keys is None else [key for key in keys if key in worker[2]]
+                if worker_keys != [] and self._send(worker, ("flush", worker_keys)):
+                    flushing.append(worker)
+            for worker in flushing:
+                try:
+                    self._record_written(worker[1].recv())
+                except WORKER_ERRORS as error:
+                    self._drop_worker(worker, error)
+
+    def _record_written(self, written):
+        for key, ticks in written.items():
+            self.partitions[key].store.ticks_written = ticks
+
+    def close(self):
+        """Stop sampling and shut the worker processes down"""
+        self.stop()
+        with self._lock:
+            self._close_workers()
+
+    def _send(self, worker, message):
+        """Send a command to a worker, dropping the worker if it has died"""
+        try:
+            worker[1].send(message)
+            return True
+        except WORKER_ERRORS as error:
+            self._drop_worker(worker, error)
+            return False
+
+    def _drop_worker(self, worker, error):
+        """Stop using a dead worker and mark its partitions stale"""
+        process, connection, keys = worker
+        self.last_error = f"{process.name} exited ({type(error).__name__}); {len(keys)} groups are stale"
+        logger.error("Fleet worker %s failed: %s", process.name, error)
+        for key in keys:
+            self.partitions[key].stale = True
+        self._workers.remove(worker)
+        connection.close()
+        process.join(timeout=1)
+        if process.is_alive():
+            process.terminate()
+
+    def _close_workers(self):
+        for process, connection, _ in self._workers:
+            try:
+                connection.send(("close",))
+            except WORKER_ERRORS:
+                pass
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+            connection.close()
+        self._workers = []
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            self.sample()
+            # Schedule against the monotonic clock so slow ticks do not cause drift
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                next_tick = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
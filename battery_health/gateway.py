@@ -0,0 +1,676 @@
+import asyncio
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from battery_health.sources import DataSource
+from battery_health.telemetry import (
+    MAX_VOLTAGE, METRICS, MIN_VOLTAGE, NOMINAL_VOLTAGE, classify_status, compute_health, encode_cell_types,
+    generate_batch
+)
+
+logger = logging.getLogger(__name__)
+
+# Channels a BMS reports per cell, sent as scaled integers: voltage in mV
+# (uint16), current in cA (int16), temperature in 0.1 °C (int16) and
+# capacity in cAh (uint16). Power, health and status are derived on ingest.
+WIRE_CHANNELS = ("voltage", "current", "temperature", "capacity")
+WIRE_SCALES = np.array([1000.0, 100.0, 10.0, 100.0])
+WIRE_SIGNED = np.array([False, True, True, False])
+
+# SocketCAN struct can_frame: one cell per frame, the CAN id selects the cell
+CAN_FRAME = np.dtype([
+    ("can_id", "<u4"), ("dlc", "u1"), ("pad", "u1", 3),
+    ("voltage", "<u2"), ("current", "<i2"), ("temperature", "<i2"), ("capacity", "<u2"),
+])
+CAN_EFF_FLAG = 0x80000000
+CAN_EFF_MASK = 0x1FFFFFFF
+DEFAULT_CAN_BASE_ID = 0x18FF0000
+
+# Serial frames: sync word, cell index, channels, then the low byte of the
+# sum of the cell and channel bytes
+SERIAL_SYNC = b"\xa5\x5a"
+SERIAL_FRAME = np.dtype([
+    ("sync", "u1", 2), ("cell", "<u2"),
+    ("voltage", "<u2"), ("current", "<i2"), ("temperature", "<i2"), ("capacity", "<u2"),
+    ("checksum", "u1"),
+])
+# Serial cell indices are uint16
+SERIAL_MAX_CELLS = 0x10000
+
+# Modbus-TCP: four holding registers per cell (one per wire channel);
+# 31 cells (124 registers) per read request, the most one request may return
+MODBUS_READ_HOLDING_REGISTERS = 0x03
+MODBUS_CELLS_PER_REQUEST = 125 // len(WIRE_CHANNELS)
+# Register addresses are uint16, so one unit holds at most 16384 cells from register 0
+MODBUS_REGISTERS = 0x10000
+_MBAP_HEADER = struct.Struct(">HHHB")
+
+# Bytes read from a stream per parse, bounding the size of one parsed chunk
+READ_BYTES = 64 * 1024
+
+
+def encode_wire(batch):
+    """Return (cells, channels) scaled integers of a columnar batch for the wire formats"""
+    values = np.stack([batch[channel] for channel in WIRE_CHANNELS], axis=1) * WIRE_SCALES
+    return np.round(np.nan_to_num(values)).astype(np.int32)
+
+
+def decode_wire(frames):
+    """Return (frames, channels) floats from a structured array of wire fields"""
+    return np.stack([frames[channel] for channel in WIRE_CHANNELS], axis=1) / WIRE_SCALES
+
+
+def encode_can_frames(cells, wire, base_id=DEFAULT_CAN_BASE_ID):
+    """Return SocketCAN frames carrying the wire values of the given cell channels"""
+    frames = np.zeros(len(cells), dtype=CAN_FRAME)
+    frames["can_id"] = (base_id + np.asarray(cells)) | CAN_EFF_FLAG
+    frames["dlc"] = 8
+    for i, channel in enumerate(WIRE_CHANNELS):
+        frames[channel] = wire[:, i]
+    return frames.tobytes()
+
+
+def parse_can_frames(data, base_id=DEFAULT_CAN_BASE_ID, channels=None):
+    """Parse whole SocketCAN frames; return (channel indices, values, frames ignored)"""
+    frames = np.frombuffer(data, dtype=CAN_FRAME, count=len(data) // CAN_FRAME.itemsize)
+    cells = (frames["can_id"] & CAN_EFF_MASK).astype(np.int64) - base_id
+    valid = (frames["dlc"] == 8) & (cells >= 0)
+    if channels is not None:
+        valid &= cells < channels
+    if not valid.all():
+        frames, cells = frames[valid], cells[valid]
+    return cells, decode_wire(frames), int(len(valid) - len(cells))
+
+
+def encode_serial_frames(cells, wire):
+    """Return serial frames carrying the wire values of the given cell channels"""
+    frames = np.zeros(len(cells), dtype=SERIAL_FRAME)
+    frames["sync"] = np.frombuffer(SERIAL_SYNC, dtype=np.uint8)
+    frames["cell"] = cells
+    for i, channel in enumerate(WIRE_CHANNELS):
+        frames[channel] = wire[:, i]
+    raw = frames.view(np.uint8).reshape(len(frames), SERIAL_FRAME.itemsize)
+    frames["checksum"] = raw[:, 2:-1].sum(axis=1, dtype=np.uint32) & 0xFF
+    return frames.tobytes()
+
+
+def parse_serial_frames(buffer):
+    """Parse serial frames from the front of buffer, resynchronizing on corruption.
+
+    Runs of aligned frames are validated in one vectorized pass; a frame with
+    a bad sync word or checksum restarts the search one byte later. Returns
+    (channel indices, values, bytes consumed, resyncs); unconsumed bytes hold
+    an incomplete frame and must be kept for the next call.
+    """
+    size = SERIAL_FRAME.itemsize
+    parsed = []
+    offset = resyncs = 0
+    while True:
+        start = buffer.find(SERIAL_SYNC, offset)
+        if start < 0:
+            # Keep a trailing byte that may be the first half of a sync word
+            consumed = max(offset, len(buffer) - 1)
+            resyncs += consumed > offset
+            break
+        resyncs += start > offset
+        count = (len(buffer) - start) // size
+        if count == 0:
+            consumed = start
+            break
+        frames = np.frombuffer(buffer, dtype=SERIAL_FRAME, count=count, offset=start)
+        raw = np.frombuffer(buffer, dtype=np.uint8, count=count * size, offset=start).reshape(count, size)
+        valid = (raw[:, 0] == SERIAL_SYNC[0]) & (raw[:, 1] == SERIAL_SYNC[1]) & (
+            (raw[:, 2:-1].sum(axis=1, dtype=np.uint32) & 0xFF) == raw[:, -1])
+        good = count if valid.all() else int(np.argmin(valid))
+        parsed.append(frames[:good])
+        offset = start + good * size
+        if good == count:
+            consumed = offset
+            break
+        resyncs += 1
+        offset += 1
+    frames = np.concatenate(parsed) if parsed else np.zeros(0, dtype=SERIAL_FRAME)
+    return frames["cell"].astype(np.int64), decode_wire(frames), consumed, resyncs
+
+
+def parse_endpoint(address, default_port):
+    """Split "host:port" (port optional) into (host, port)"""
+    address = address.strip()
+    if ":" not in address:
+        return address or "127.0.0.1", default_port
+    host, _, port = address.rpartition(":")
+    return host, int(port)
+
+
+def _cancel_all(loop):
+    """Cancel every task of a stopped loop (links, servers' handlers) and close it"""
+    tasks = asyncio.all_tasks(loop)
+    for task in tasks:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+    loop.close()
+
+
+class Transport:
+    """Base class for hardware links read by the ingestion gateway.
+
+    run() connects, then parses frames in batches and awaits publish(cells,
+    values) with channel indices relative to first_cell and (n, channels)
+    values in WIRE_CHANNELS order. publish() blocks while the gateway queue
+    is full, so a slow consumer stops the reads and the link's own flow
+    control (TCP window, socket and tty buffers) pushes back on the sender.
+    run() raises OSError when the link fails; the gateway reconnects.
+    """
+
+    name = "transport"
+
+    def __init__(self, cells, first_cell=0):
+        self.cells = cells
+        self.first_cell = first_cell
+        self.connected = False
+        self.frames = 0
+        self.bad_frames = 0
+        self.last_error = None
+
+    async def run(self, publish):
+        raise NotImplementedError
+
+
+class ModbusTransport(Transport):
+    """Polls a Modbus-TCP BMS for its cell registers.
+
+    Every poll the read requests for all cells are written back to back and
+    their responses read as they arrive (pipelined by transaction id), so a
+    poll costs one round trip regardless of the number of cells.
+    """
+
+    name = "Modbus-TCP"
+
+    def __init__(self, host, port=502, cells=16, first_cell=0, unit=1, register=0,
+                 poll_interval=0.1, timeout=2.0):
+        super().__init__(cells, first_cell)
+        max_cells = (MODBUS_REGISTERS - register) // len(WIRE_CHANNELS)
+        if not 0 < cells <= max_cells:
+            raise ValueError(f"Modbus-TCP addresses 1 to {max_cells} cells from register {register}, not {cells}")
+        self.host = host
+        self.port = port
+        self.unit = unit
+        self.register = register
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._transaction = 0
+
+    def _requests(self):
+        requests, pending = [], {}
+        for first in range(0, self.cells, MODBUS_CELLS_PER_REQUEST):
+            count = min(MODBUS_CELLS_PER_REQUEST, self.cells - first)
+            self._transaction = (self._transaction + 1) & 0xFFFF
+            requests.append(_MBAP_HEADER.pack(self._transaction, 0, 6, self.unit) + struct.pack(
+                ">BHH", MODBUS_READ_HOLDING_REGISTERS, self.register + first * len(WIRE_CHANNELS),
+                count * len(WIRE_CHANNELS)))
+            pending[self._transaction] = first
+        return b"".join(requests), pending
+
+    async def run(self, publish):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        self.connected = True
+        try:
+            while True:
+                started = time.monotonic()
+                requests, pending = self._requests()
+                writer.write(requests)
+                await writer.drain()
+                while pending:
+                    header = await asyncio.wait_for(reader.readexactly(_MBAP_HEADER.size), self.timeout)
+                    transaction, _, length, _ = _MBAP_HEADER.unpack(header)
+                    body = await asyncio.wait_for(reader.readexactly(length - 1), self.timeout)
+                    first = pending.pop(transaction, None)
+                    if first is None:
+                        continue
+                    if body[0] & 0x80:
+                        self.bad_frames += 1
+                        self.last_error = f"Modbus exception {body[1]} for cells {first}+"
+                        continue
+                    registers = np.frombuffer(body, dtype=">u2", count=body[1] // 2, offset=2)
+                    registers = registers.reshape(-1, len(WIRE_CHANNELS))
+                    wire = np.where(WIRE_SIGNED, registers.view(">i2"), registers)
+                    self.frames += len(wire)
+                    await publish(first + np.arange(len(wire)), wire / WIRE_SCALES)
+                await asyncio.sleep(max(0.0, self.poll_interval - (time.monotonic() - started)))
+        finally:
+            self.connected = False
+            writer.close()
+
+
+class CanTransport(Transport):
+    """Reads cell frames from a SocketCAN interface or a raw CAN frame stream.
+
+    channel is an interface name (e.g. "can0") or "tcp://host:port" for a
+    bridge streaming SocketCAN frames over TCP, such as the local simulator.
+    Cell n reports under CAN id base_id + n; other ids are ignored.
+    """
+
+    name = "CAN"
+
+    def __init__(self, channel, cells=16, first_cell=0, base_id=DEFAULT_CAN_BASE_ID, max_batch=4096):
+        super().__init__(cells, first_cell)
+        max_cells = CAN_EFF_MASK - base_id + 1
+        if not 0 < cells <= max_cells:
+            raise ValueError(f"CAN ids from {base_id:#x} address 1 to {max_cells} cells, not {cells}")
+        self.channel = channel
+        self.base_id = base_id
+        self.max_batch = max_batch
+
+    async def _publish_frames(self, data, publish):
+        cells, values, ignored = parse_can_frames(data, self.base_id, self.cells)
+        self.frames += len(cells)
+        self.bad_frames += ignored
+        if len(cells):
+            await publish(cells, values)
+
+    async def run(self, publish):
+        if self.channel.startswith("tcp://"):
+            await self._run_stream(publish)
+        else:
+            await self._run_socketcan(publish)
+
+    async def _run_stream(self, publish):
+        reader, writer = await asyncio.open_connection(*parse_endpoint(self.channel[len("tcp://"):], 29536))
+        self.connected = True
+        buffer = b""
+        try:
+            while True:
+                data = await reader.read(READ_BYTES)
+                if not data:
+                    raise ConnectionResetError(f"CAN stream {self.channel} closed")
+                buffer += data
+                whole = len(buffer) - len(buffer) % CAN_FRAME.itemsize
+                await self._publish_frames(buffer[:whole], publish)
+                buffer = buffer[whole:]
+        finally:
+            self.connected = False
+            writer.close()
+
+    async def _run_socketcan(self, publish):
+        loop = asyncio.get_running_loop()
+        with socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW) as sock:
+            sock.bind((self.channel,))
+            sock.setblocking(False)
+            self.connected = True
+            try:
+                while True:
+                    # Wait for one frame, then drain whatever else is queued
+                    frames = [await loop.sock_recv(sock, CAN_FRAME.itemsize)]
+                    while len(frames) < self.max_batch:
+                        try:
+                            frames.append(sock.recv(CAN_FRAME.itemsize))
+                        except BlockingIOError:
+                            break
+                    await self._publish_frames(b"".join(frames), publish)
+            finally:
+                self.connected = False
+
+
+def _open_serial(path, baudrate):
+    """Open a serial device (or pty) non-blocking in raw mode at baudrate"""
+    import termios
+    import tty
+    fd = os.open(path, os.O_RDONLY | os.O_NOCTTY | os.O_NONBLOCK)
+    try:
+        tty.setraw(fd)
+        attributes = termios.tcgetattr(fd)
+        attributes[4] = attributes[5] = getattr(termios, f"B{baudrate}")
+        termios.tcsetattr(fd, termios.TCSANOW, attributes)
+    except (termios.error, AttributeError):
+        os.close(fd)
+        raise OSError(f"Cannot configure {path} for {baudrate} baud")
+    return os.fdopen(fd, "rb", buffering=0)
+
+
+class SerialTransport(Transport):
+    """Reads checksummed cell frames from a serial port (POSIX tty or pty)"""
+
+    name = "Serial"
+
+    def __init__(self, path, cells=16, first_cell=0, baudrate=921600):
+        super().__init__(cells, first_cell)
+        if not 0 < cells <= SERIAL_MAX_CELLS:
+            raise ValueError(f"Serial frames address 1 to {SERIAL_MAX_CELLS} cells, not {cells}")
+        self.path = path
+        self.baudrate = baudrate
+
+    async def run(self, publish):
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=READ_BYTES)
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), _open_serial(self.path, self.baudrate))
+        self.connected = True
+        buffer = b""
+        try:
+            while True:
+                data = await reader.read(READ_BYTES)
+                if not data:
+                    raise ConnectionResetError(f"Serial port {self.path} closed")
+                buffer += data
+                cells, values, consumed, resyncs = parse_serial_frames(buffer)
+                buffer = buffer[consumed:]
+                self.bad_frames += resyncs
+                keep = cells < self.cells
+                if not keep.all():
+                    self.bad_frames += int(np.count_nonzero(~keep))
+                    cells, values = cells[keep], values[keep]
+                self.frames += len(cells)
+                if len(cells):
+                    await publish(cells, values)
+        finally:
+            self.connected = False
+            transport.close()
+
+
+class GatewaySource(DataSource):
+    """Ingests live telemetry from BMS hardware links on an asyncio thread.
+
+    Each transport feeds parsed frame batches into one bounded queue; a
+    single task scatters them into the latest per-cell readings, and every
+    publish_interval the readings are published as one columnar tick with
+    power, health and status derived like the simulator's. The acquisition
+    engine drains published ticks with poll(). Both the frame queue and the
+    published ticks are bounded: a full queue blocks the readers (backpressure
+    onto the links), and ticks the engine does not collect in time are
+    dropped oldest first and counted. Cells with no reading yet are NaN.
+    """
+
+    name = "Gateway"
+
+    def __init__(self, cell_ids, cell_types, transports, publish_interval=1.0,
+                 max_queued_batches=256, max_pending_ticks=1000, reconnect_seconds=2.0):
+        self.cell_ids = list(cell_ids)
+        self.cell_types = list(cell_types)
+        self.type_codes = encode_cell_types(self.cell_types)
+        self.transports = list(transports)
+        self.publish_interval = publish_interval
+        self.max_queued_batches = max_queued_batches
+        self.reconnect_seconds = reconnect_seconds
+        self.ticks_dropped = 0
+        self.frame_rate = 0.0
+        self._latest = np.full((len(self.cell_ids), len(WIRE_CHANNELS)), np.nan)
+        self._updated = False
+        self._ticks = deque(maxlen=max_pending_ticks)
+        self._ticks_lock = threading.Lock()
+        self._first_tick = threading.Event()
+        self._queue = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="battery-ingest", daemon=True)
+        self._thread.start()
+
+    # Acquisition engine interface
+
+    def poll(self):
+        with self._ticks_lock:
+            ticks = list(self._ticks)
+            self._ticks.clear()
+        return ticks
+
+    def wait_for_tick(self, timeout):
+        """Block until the first tick is published; return whether it was"""
+        return self._first_tick.wait(timeout)
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def stats(self):
+        """Return ingest counters for display: rates, drops and link states"""
+        return {
+            "frames_per_second": self.frame_rate,
+            "frames": sum(transport.frames for transport in self.transports),
+            "bad_frames": sum(transport.bad_frames for transport in self.transports),
+            "queued_batches": 0 if self._queue is None else self._queue.qsize(),
+            "ticks_dropped": self.ticks_dropped,
+            "links": [(transport.name, transport.connected, transport.last_error) for transport in self.transports],
+        }
+
+    # Event loop
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue(self.max_queued_batches)
+        for transport in self.transports:
+            self._loop.create_task(self._supervise(transport))
+        self._loop.create_task(self._aggregate())
+        self._loop.create_task(self._publish_ticks())
+        try:
+            self._loop.run_forever()
+        finally:
+            _cancel_all(self._loop)
+
+    async def _supervise(self, transport):
+        """Run a transport, reconnecting after link failures"""
+        async def publish(cells, values):
+            await self._queue.put((cells + transport.first_cell, values))
+
+        while True:
+            try:
+                await transport.run(publish)
+            except (OSError, EOFError, asyncio.TimeoutError) as error:
+                transport.last_error = f"{type(error).__name__}: {error}"
+                logger.warning("%s link failed: %s", transport.name, transport.last_error)
+            except Exception as error:
+                # Any other failure (a malformed frame, a bug) must not end the link for good
+                transport.last_error = f"{type(error).__name__}: {error}"
+                logger.exception("%s link crashed", transport.name)
+            await asyncio.sleep(self.reconnect_seconds)
+
+    async def _aggregate(self):
+        num_cells = len(self.cell_ids)
+        while True:
+            cells, values = await self._queue.get()
+            keep = (cells >= 0) & (cells < num_cells)
+            self._latest[cells[keep]] = values[keep]
+            self._updated = True
+
+    async def _publish_ticks(self):
+        last_frames, last_time = 0, time.monotonic()
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            frames, now = sum(transport.frames for transport in self.transports), time.monotonic()
+            self.frame_rate = (frames - last_frames) / max(now - last_time, 1e-9)
+            last_frames, last_time = frames, now
+            if not self._updated:
+                continue
+            self._updated = False
+            tick = (datetime.now(), self._batch(self._latest.copy()))
+            with self._ticks_lock:
+                if len(self._ticks) == self._ticks.maxlen:
+                    self.ticks_dropped += 1
+                self._ticks.append(tick)
+            self._first_tick.set()
+
+    def _batch(self, latest):
+        readings = {channel: latest[:, i] for i, channel in enumerate(WIRE_CHANNELS)}
+        voltage, current, temperature = readings["voltage"], readings["current"], readings["temperature"]
+        batch = {
+            **readings,
+            "power": np.round(voltage * np.abs(current), 2),
+            "health": compute_health(voltage, temperature, NOMINAL_VOLTAGE[self.type_codes]),
+        }
+        batch = {metric: batch[metric] for metric in METRICS}
+        batch["status"] = classify_status(voltage, temperature, batch["health"],
+                                          MIN_VOLTAGE[self.type_codes], MAX_VOLTAGE[self.type_codes])
+        return batch
+
+
+class ProtocolSimulator:
+    """Local BMS simulator speaking every gateway protocol, for use without hardware.
+
+    Serves a simulated pack (regenerated every interval with generate_batch)
+    as a Modbus-TCP device, a TCP stream of SocketCAN frames and a serial
+    line on a pseudo-terminal. Frame streams cycle through the cells at
+    frame_rate frames per second per connection and honour backpressure.
+    """
+
+    def __init__(self, cell_types, interval=1.0, frame_rate=5000, host="127.0.0.1",
+                 base_id=DEFAULT_CAN_BASE_ID, rng=None):
+        self.interval = interval
+        self.frame_rate = frame_rate
+        self.host = host
+        self.base_id = base_id
+        self._rng = rng
+        self.set_pack(cell_types)
+        self.modbus_port = None
+        self.can_port = None
+        self.serial_path = None
+        self._started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="battery-protocol-simulator", daemon=True)
+        self._thread.start()
+        self._started.wait(5)
+
+    @property
+    def can_channel(self):
+        return f"tcp://{self.host}:{self.can_port}"
+
+    def set_pack(self, cell_types):
+        """Simulate a pack of the given cell types from the next interval"""
+        self._type_codes = encode_cell_types(list(cell_types))
+        self._wire = encode_wire(generate_batch(self._type_codes, self._rng))
+
+    def close(self):
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        modbus = self._loop.run_until_complete(asyncio.start_server(self._serve_modbus, self.host, 0))
+        can = self._loop.run_until_complete(asyncio.start_server(self._serve_can, self.host, 0))
+        self.modbus_port = modbus.sockets[0].getsockname()[1]
+        self.can_port = can.sockets[0].getsockname()[1]
+        master, slave = os.openpty()
+        self.serial_path = os.ttyname(slave)
+        self._loop.create_task(self._regenerate())
+        self._loop.create_task(self._serve_serial(master))
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            modbus.close()
+            can.close()
+            _cancel_all(self._loop)
+            os.close(master)
+            os.close(slave)
+
+    async def _regenerate(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self._wire = encode_wire(generate_batch(self._type_codes, self._rng))
+
+    async def _stream(self, encode, write):
+        """Send frames cycling through the cells at frame_rate, in 10 ms bursts"""
+        position, started, sent = 0, time.monotonic(), 0
+        while True:
+            await asyncio.sleep(0.01)
+            wire = self._wire
+            due = int((time.monotonic() - started) * self.frame_rate) - sent
+            if due <= 0 or not len(wire):
+                continue
+            cells = (position + np.arange(due)) % len(wire)
+            position = (position + due) % len(wire)
+            sent += due
+            await write(encode(cells, wire[cells]))
+
+    async def _serve_can(self, reader, writer):
+        async def write(data):
+            writer.write(data)
+            await writer.drain()
+        try:
+            await self._stream(lambda cells, wire: encode_can_frames(cells, wire, self.base_id), write)
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_serial(self, master):
+        import tty
+        tty.setraw(master)
+        os.set_blocking(master, False)
+
+        async def write(data):
+            view = memoryview(data)
+            while view:
+                try:
+                    view = view[os.write(master, view):]
+                except BlockingIOError:
+                    await asyncio.sleep(0.001)  # tty buffer full: nobody is reading
+
+        await self._stream(encode_serial_frames, write)
+
+    async def _serve_modbus(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(_MBAP_HEADER.size)
+                transaction, protocol, length, unit = _MBAP_HEADER.unpack(header)
+                body = await reader.readexactly(length - 1)
+                function = body[0]
+                if function != MODBUS_READ_HOLDING_REGISTERS or len(body) < 5:
+                    payload = bytes((function | 0x80, 1))  # illegal function
+                else:
+                    address, count = struct.unpack(">HH", body[1:5])
+                    registers = self._wire.reshape(-1)[address:address + count]
+                    if len(registers) < count or count > 125:
+                        payload = bytes((function | 0x80, 2))  # illegal data address
+                    else:
+                        data = (registers & 0xFFFF).astype(">u2").tobytes()
+                        payload = bytes((function, len(data))) + data
+                writer.write(_MBAP_HEADER.pack(transaction, protocol, len(payload) + 1, unit) + payload)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass  # client gone, or the simulator is shutting down
+        finally:
+            writer.close()
+
+
+# Protocols selectable in the dashboard, with the address format each expects
+GATEWAY_PROTOCOLS = {
+    "Modbus-TCP": "host:port",
+    "CAN": "interface (can0) or tcp://host:port",
+    "Serial": "device path (/dev/ttyUSB0)",
+}
+
+# Most cells one link of each protocol can address with open_transport's defaults
+GATEWAY_MAX_CELLS = {
+    "Modbus-TCP": MODBUS_REGISTERS // len(WIRE_CHANNELS),
+    "CAN": CAN_EFF_MASK - DEFAULT_CAN_BASE_ID + 1,
+    "Serial": SERIAL_MAX_CELLS,
+}
+
+
+def open_transport(protocol, address, cells, first_cell=0):
+    """Create the transport for a GATEWAY_PROTOCOLS entry and its address.
+
+    Raises ValueError when the protocol cannot address that many cells on
+    one link (see GATEWAY_MAX_CELLS).
+    """
+    if protocol == "Modbus-TCP":
+        return ModbusTransport(*parse_endpoint(address, 502), cells=cells, first_cell=first_cell)
+    if protocol == "CAN":
+        return CanTransport(address.strip(), cells=cells, first_cell=first_cell)
+    if protocol == "Serial":
+        return SerialTransport(address.strip(), cells=cells, first_cell=first_cell)
+    raise ValueError(f"Unknown gateway protocol: {protocol}")
+
+
+def simulator_address(simulator, protocol):
+    """Return the address a ProtocolSimulator serves a protocol on"""
+    return {"Modbus-TCP": f"{simulator.host}:{simulator.modbus_port}", "CAN": simulator.can_channel,
+            "Serial": simulator.serial_path}[protocol]
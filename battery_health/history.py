@@ -0,0 +1,82 @@
+import numpy as np
+
+from battery_health.telemetry import METRICS
+
+# Default number of ticks kept per bench (one hour at the 5s refresh rate)
+DEFAULT_CAPACITY = 720
+
+
+class HistoryBuffer:
+    """Fixed-capacity columnar ring buffer indexed by (tick, cell, metric).
+
+    Every tick is written twice, at slot i and slot i + capacity, so the most
+    recent n ticks are always one contiguous slice and windows are zero-copy
+    views. Appending is O(1) in the history length and never allocates.
+    """
+
+    def __init__(self, cell_ids, capacity=DEFAULT_CAPACITY, metrics=METRICS, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.cell_ids = list(cell_ids)
+        self.metrics = tuple(metrics)
+        self.metric_index = {metric: i for i, metric in enumerate(self.metrics)}
+        self.capacity = capacity
+        num_cells = len(self.cell_ids)
+        self._values = np.full((2 * capacity, num_cells, len(self.metrics)), np.nan, dtype=dtype)
+        self._status = np.zeros((2 * capacity, num_cells), dtype=np.int8)
+        self._timestamps = np.zeros(2 * capacity, dtype="datetime64[us]")
+        self._head = 0  # slot the next tick is written to
+        self.total_ticks = 0
+
+    def __len__(self):
+        return min(self.total_ticks, self.capacity)
+
+    @property
+    def nbytes(self):
+        return self._values.nbytes + self._status.nbytes + self._timestamps.nbytes
+
+    def append(self, timestamp, batch):
+        """Store one tick from a columnar batch produced by generate_batch"""
+        row = np.stack([batch[metric] for metric in self.metrics], axis=-1)
+        timestamp = np.datetime64(timestamp, "us")
+        for slot in (self._head, self._head + self.capacity):
+            self._values[slot] = row
+            self._status[slot] = batch["status"]
+            self._timestamps[slot] = timestamp
+        self._head = (self._head + 1) % self.capacity
+        self.total_ticks += 1
+
+    def _window_slice(self, last_n):
+        n = len(self) if last_n is None else max(0, min(last_n, len(self)))
+        end = self._head + self.capacity
+        return slice(end - n, end)
+
+    def window(self, last_n=None):
+        """Return zero-copy (timestamps, values, status) views of the last n ticks.
+
+        values has shape (ticks, cells, metrics) and status (ticks, cells).
+        The views are read-only and only valid until the next append.
+        """
+        window = self._window_slice(last_n)
+        views = (self._timestamps[window], self._values[window], self._status[window])
+        for view in views:
+            view.flags.writeable = False
+        return views
+
+    def metric(self, name, last_n=None):
+        """Return a (ticks, cells) view of one metric over the last n ticks"""
+        values = self._values[self._window_slice(last_n), :, self.metric_index[name]]
+        values.flags.writeable = False
+        return values
+
+    def ticks_since(self, start):
+        """Return how many stored ticks were recorded at or after start"""
+        timestamps = self._timestamps[self._window_slice(None)]
+        return len(timestamps) - int(np.searchsorted(timestamps, np.datetime64(start, "us")))
+
+    def latest(self):
+        """Return (timestamp, values, status) of the most recent tick, or None"""
+        if not self.total_ticks:
+            return None
+        timestamps, values, status = self.window(1)
+        return timestamps[0], values[0], status[0]
@@ -0,0 +1,148 @@
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Quantiles shown in the diagnostics panel and exported to Prometheus
+PROFILE_QUANTILES = (0.5, 0.99)
+
+_DISABLED = nullcontext()
+
+
+class Profiler:
+    """Opt-in timing of named phases with rolling latency quantiles.
+
+    While disabled, phase() returns a shared no-op context manager and
+    timed() wrappers call straight through, so instrumented code pays one
+    attribute check. When enabled, each phase keeps its last window
+    durations for quantiles plus cumulative count and sum, and sizes (e.g.
+    serialized chart bytes) keep their last value. Recording is thread safe,
+    so the acquisition threads and dashboard sessions share one profiler.
+    """
+
+    def __init__(self, window=1000):
+        self.enabled = False
+        self.window = window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._samples = {}
+            self._totals = {}  # phase -> [count, sum]
+            self._sizes = {}
+
+    def record(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+                self._totals[name] = [0, 0.0]
+            samples.append(seconds)
+            totals = self._totals[name]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def record_size(self, name, nbytes):
+        with self._lock:
+            self._sizes[name] = nbytes
+
+    def phase(self, name):
+        """Context manager timing one phase; a shared no-op while disabled"""
+        if not self.enabled:
+            return _DISABLED
+        return self._timed_phase(name)
+
+    @contextmanager
+    def _timed_phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name):
+        """Decorator timing every call of a function as one phase"""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with self._timed_phase(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        """Return {phase: (count, sum, quantiles, last)} with quantiles over the window"""
+        with self._lock:
+            snapshot = {name: (list(samples), tuple(self._totals[name])) for name, samples in self._samples.items()}
+        return {
+            name: (count, total, np.quantile(samples, PROFILE_QUANTILES), samples[-1])
+            for name, (samples, (count, total)) in sorted(snapshot.items())
+        }
+
+    def sizes(self):
+        with self._lock:
+            return dict(sorted(self._sizes.items()))
+
+    def prometheus(self, prefix="battery_dashboard"):
+        """Return the metrics in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {prefix}_phase_seconds Time spent in each instrumented phase",
+            f"# TYPE {prefix}_phase_seconds summary",
+        ]
+        for name, (count, total, quantiles, _) in self.stats().items():
+            label = f'phase="{_escape(name)}"'
+            for quantile, value in zip(PROFILE_QUANTILES, quantiles):
+                lines.append(f'{prefix}_phase_seconds{{{label},quantile="{quantile}"}} {value:.9g}')
+            lines.append(f"{prefix}_phase_seconds_sum{{{label}}} {total:.9g}")
+            lines.append(f"{prefix}_phase_seconds_count{{{label}}} {count}")
+        lines += [
+            f"# HELP {prefix}_payload_bytes Size of the last serialized payload of each chart",
+            f"# TYPE {prefix}_payload_bytes gauge",
+        ]
+        for name, nbytes in self.sizes().items():
+            lines.append(f'{prefix}_payload_bytes{{chart="{_escape(name)}"}} {nbytes}')
+        lines.append(f"{prefix}_profiling_enabled {int(self.enabled)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(label):
+    return label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsServer:
+    """Local HTTP endpoint serving a profiler's metrics at /metrics for Prometheus"""
+
+    def __init__(self, profiler, host="127.0.0.1", port=9464):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = profiler.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self._server.server_port}/metrics"
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# Process-wide profiler shared by the engines and every dashboard session
+profiler = Profiler()
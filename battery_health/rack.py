@@ -0,0 +1,76 @@
+import numpy as np
+
+# Per-module reductions for rack images too large to draw cell by cell
+RACK_AGGREGATIONS = ("max", "mean")
+
+# Cells above which rack heatmaps show one tile per module by default
+RACK_CELL_LIMIT = 4096
+
+
+class RackLayout:
+    """Physical placement of a pack's cells in modules of series x parallel cells.
+
+    Cells are numbered module by module; inside a module cell k sits in
+    series row k // parallel at parallel position k % parallel. Modules are
+    placed left to right in rows of module_columns. The cell-to-pixel map
+    is computed once per layout, so drawing a tick is one scatter of its
+    column into a preallocated image (no pivot), and module aggregates are
+    one reduction over a reshaped buffer. Images are reused and updated in
+    place; slots without a cell stay NaN and render as gaps.
+    """
+
+    def __init__(self, num_cells, series, parallel=1, module_columns=None):
+        if series < 1 or parallel < 1:
+            raise ValueError("series and parallel must be at least 1")
+        self.num_cells = num_cells
+        self.series = series
+        self.parallel = parallel
+        self.cells_per_module = series * parallel
+        self.modules = max(1, -(-num_cells // self.cells_per_module))
+        self.module_columns = min(self.modules, module_columns or int(np.ceil(np.sqrt(self.modules))))
+        self.module_rows = -(-self.modules // self.module_columns)
+        self.shape = (self.module_rows * series, self.module_columns * parallel)
+
+        module, slot = np.divmod(np.arange(num_cells), self.cells_per_module)
+        rows = (module // self.module_columns) * series + slot // parallel
+        columns = (module % self.module_columns) * parallel + slot % parallel
+        self.pixels = rows * self.shape[1] + columns
+        self._image = np.full(self.shape, np.nan)
+        self._slots = np.full(self.modules * self.cells_per_module, np.nan)
+        self._module_image = np.full((self.module_rows, self.module_columns), np.nan)
+
+    @property
+    def key(self):
+        return self.num_cells, self.series, self.parallel, self.module_columns
+
+    def fill(self, values):
+        """Scatter per-cell values into the cell image in place and return it"""
+        self._image.flat[self.pixels] = values
+        return self._image
+
+    def aggregate(self, values, how="max"):
+        """Reduce per-cell values to one tile per module (NaN-safe) in place and return them"""
+        self._slots[:self.num_cells] = values
+        per_module = self._slots.reshape(self.modules, self.cells_per_module)
+        if how == "max":
+            reduced = np.fmax.reduce(per_module, axis=1)
+        elif how == "mean":
+            present = ~np.isnan(per_module)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                reduced = np.where(present, per_module, 0).sum(axis=1) / present.sum(axis=1)
+        else:
+            raise ValueError(f"Unknown rack aggregation: {how}")
+        self._module_image.flat[:self.modules] = reduced
+        return self._module_image
+
+    def cell_labels(self, cell_ids):
+        """Return an image-shaped array of cell ids ("" where there is no cell) for hover text"""
+        labels = np.full(self.shape, "", dtype=object)
+        labels.flat[self.pixels] = np.asarray(cell_ids, dtype=object)
+        return labels
+
+    def module_labels(self):
+        """Return a module-image-shaped array of module names for hover text"""
+        labels = np.full((self.module_rows, self.module_columns), "", dtype=object)
+        labels.flat[:self.modules] = [f"Module {module + 1}" for module in range(self.modules)]
+        return labels
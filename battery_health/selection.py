@@ -0,0 +1,218 @@
+import numpy as np
+
+from battery_health.telemetry import CELL_TYPES, STATUSES
+
+# Card orderings: label -> key understood by select_cells
+SORT_ORDERS = {
+    "Cell order": "index",
+    "Worst health first": "worst",
+    "Best health first": "best",
+    "Most severe status first": "severity",
+}
+
+
+def status_counts(status):
+    """Return the number of cells in each status, indexed like STATUSES"""
+    return np.bincount(status, minlength=len(STATUSES))
+
+
+def type_counts(type_codes):
+    """Return the number of cells of each type, indexed like CELL_TYPES"""
+    return np.bincount(type_codes, minlength=len(CELL_TYPES))
+
+
+def select_cells(health, status, type_codes, statuses=None, cell_types=None, order="index", limit=None):
+    """Return indices of the cells matching the filters, ordered and truncated.
+
+    statuses and cell_types are collections of labels (None keeps all).
+    Health ties are broken by cell order and missing health sorts last. With
+    a limit, the worst/best orderings use a partial sort, so "worst 20" costs
+    O(n) regardless of pack size.
+    """
+    mask = np.ones(len(health), dtype=bool)
+    if statuses is not None:
+        mask &= np.isin(status, [STATUSES.index(label) for label in statuses])
+    if cell_types is not None:
+        mask &= np.isin(type_codes, [CELL_TYPES.index(label) for label in cell_types])
+    indices = np.flatnonzero(mask)
+
+    if order in ("worst", "best"):
+        keys = health[indices] if order == "worst" else -health[indices]
+        if limit is not None and 0 < limit < len(indices):
+            # Keep every cell up to the limit-th key, including all cells tied with it,
+            # so the stable sort below picks the tied ones in cell order
+            cutoff = np.partition(keys, limit - 1)[limit - 1]
+            if not np.isnan(cutoff):
+                candidates = np.flatnonzero(keys <= cutoff)
+                indices, keys = indices[candidates], keys[candidates]
+        indices = indices[np.argsort(keys, kind="stable")]
+    elif order == "severity":
+        indices = indices[np.lexsort((health[indices], -status[indices].astype(np.int16)))]
+    elif order != "index":
+        raise ValueError(f"Unknown sort order: {order}")
+
+    return indices if limit is None else indices[:limit]
+
+
+def paginate(indices, page, page_size):
+    """Return (page indices, page count) for a 0-based page number"""
+    pages = max(1, -(-len(indices) // page_size))
+    page = min(max(page, 0), pages - 1)
+    return indices[page * page_size:(page + 1) * page_size], pages
+
+
+def group_indices(codes, size):
+    """Return a list of index arrays, one per code 0..size-1, each in cell order"""
+    order = np.argsort(codes, kind="stable")
+    bounds = np.cumsum(np.bincount(codes, minlength=size))[:-1]
+    return np.split(order, bounds)
+
+
+def _health_order(health, sign, hint=None):
+    """Cell indices by health times sign, ties in cell order, NaN last.
+
+    Sorting along a previous order (hint) is close to O(n) when health drifts
+    slowly; tied cells keep the hint's relative order, so runs of equal keys
+    are put back in cell order afterwards.
+    """
+    keys = health * sign
+    if hint is None:
+        return np.argsort(keys, kind="stable")
+    order = hint[np.argsort(keys[hint], kind="stable")]
+    ordered_keys = keys[order]
+    missing = np.isnan(ordered_keys)
+    tied = (ordered_keys[1:] == ordered_keys[:-1]) | (missing[1:] & missing[:-1])
+    if tied.any():
+        n = len(order)
+        run = np.cumsum(np.concatenate(([True], ~tied)))
+        in_run = np.zeros(n, dtype=bool)
+        in_run[1:] |= tied
+        in_run[:-1] |= tied
+        tied_at = np.flatnonzero(in_run)
+        # Runs already follow each other, so sorting (run, cell) pairs only reorders within runs
+        order[tied_at] = np.sort(run[tied_at] * n + order[tied_at]) % n
+    return order
+
+
+class CellIndex:
+    """Cell indices of one tick grouped by type and status and ordered by health.
+
+    Groups are cell-ordered index arrays, so filters and counts are lookups
+    of the selected groups rather than scans of the pack, and the worst or
+    best k cells are the first k of a precomputed order. Built once per
+    tick (see Snapshot.index) and incrementally: type groups are reused
+    while the layout is unchanged, and the previous tick's health order
+    seeds the sort, which costs close to O(n) when health drifts slowly.
+    Orders sort on the exact health with ties in cell order, so select()
+    returns the same cells in the same order as select_cells.
+    """
+
+    def __init__(self, type_codes, status, health, previous=None):
+        self.type_codes = type_codes
+        self.status = status
+        self.health = health
+        if previous is not None and previous.type_codes is type_codes:
+            self.type_groups = previous.type_groups
+            hint = previous.worst_order
+        else:
+            self.type_groups = group_indices(type_codes, len(CELL_TYPES))
+            hint = None
+        self.status_groups = group_indices(status, len(STATUSES))
+        self.worst_order = _health_order(health, 1, hint)
+        self._best_order = None
+        self._severity_order = None
+
+    def __len__(self):
+        return len(self.health)
+
+    @property
+    def type_counts(self):
+        """Number of cells of each type, indexed like CELL_TYPES"""
+        return np.array([len(group) for group in self.type_groups])
+
+    @property
+    def status_counts(self):
+        """Number of cells in each status, indexed like STATUSES"""
+        return np.array([len(group) for group in self.status_groups])
+
+    @property
+    def best_order(self):
+        if self._best_order is None:
+            self._best_order = _health_order(self.health, -1)
+        return self._best_order
+
+    @property
+    def severity_order(self):
+        """Most severe status first, then lowest health"""
+        if self._severity_order is None:
+            order = self.worst_order
+            self._severity_order = order[np.argsort(-self.status[order].astype(np.int16), kind="stable")]
+        return self._severity_order
+
+    def by_type(self, cell_types):
+        """Return the cell-ordered indices of the given type labels"""
+        return self._union(self.type_groups, [CELL_TYPES.index(label) for label in cell_types])
+
+    def by_status(self, statuses):
+        """Return the cell-ordered indices of the given status labels"""
+        return self._union(self.status_groups, [STATUSES.index(label) for label in statuses])
+
+    @staticmethod
+    def _union(groups, codes):
+        selected = [groups[code] for code in sorted(set(codes))]
+        if len(selected) == 1:
+            return selected[0]
+        return np.sort(np.concatenate(selected)) if selected else np.zeros(0, dtype=np.intp)
+
+    def worst(self, k):
+        """Return the indices of the k cells with the lowest health"""
+        return self.worst_order[:k]
+
+    def _matching(self, statuses, cell_types):
+        """Return the cell-ordered indices matching both filters, or None when unfiltered"""
+        if statuses is None and cell_types is None:
+            return None
+        if statuses is None:
+            return self.by_type(cell_types)
+        if cell_types is None:
+            return self.by_status(statuses)
+        by_status, by_type = self.by_status(statuses), self.by_type(cell_types)
+        # Check the smaller group against the other filter's codes
+        if len(by_status) <= len(by_type):
+            return by_status[np.isin(self.type_codes[by_status], [CELL_TYPES.index(label) for label in cell_types])]
+        return by_type[np.isin(self.status[by_type], [STATUSES.index(label) for label in statuses])]
+
+    def select(self, statuses=None, cell_types=None, order="index", limit=None):
+        """Return indices of the cells matching the filters, ordered and truncated.
+
+        Takes the same arguments as select_cells. Health ties are broken by
+        cell order. Ordered selections with a limit scan the precomputed
+        order only until limit matching cells are found.
+        """
+        matching = self._matching(statuses, cell_types)
+        if order == "index":
+            indices = np.arange(len(self)) if matching is None else matching
+        elif order in ("worst", "best", "severity"):
+            indices = getattr(self, f"{order}_order")
+            if matching is not None and len(matching) < len(self):
+                mask = np.zeros(len(self), dtype=bool)
+                mask[matching] = True
+                indices = _take_matching(indices, mask, limit)
+        else:
+            raise ValueError(f"Unknown sort order: {order}")
+        return indices if limit is None else indices[:limit]
+
+
+def _take_matching(ordered, mask, limit):
+    """Return the entries of ordered whose mask is set, stopping after limit of them"""
+    if limit is None:
+        return ordered[mask[ordered]]
+    found, count, start, chunk = [], 0, 0, max(4 * limit, 1024)
+    while count < limit and start < len(ordered):
+        part = ordered[start:start + chunk]
+        part = part[mask[part]]
+        found.append(part)
+        count += len(part)
+        start += chunk
+        chunk *= 2
+    return np.concatenate(found) if found else ordered[:0]
@@ -0,0 +1,116 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Capacity, as a fraction of the fitted initial capacity, that marks end of life
+END_OF_LIFE = 0.8
+
+# Samples a cell needs before its capacity fade fit is reported
+MIN_FIT_SAMPLES = 10
+
+# Throughput spread (standard deviation relative to the mean) below which
+# float resolution leaves no usable fade slope
+FIT_EPSILON = 1e-9
+
+SohResult = namedtuple("SohResult", [
+    "charge_ah",         # net coulomb count since the estimator started
+    "throughput_ah",     # total charge moved in either direction
+    "cycles",            # equivalent full cycles (throughput / 2 x initial capacity)
+    "initial_capacity",  # fitted capacity at zero throughput (Ah)
+    "capacity",          # fitted capacity now (Ah)
+    "soh",               # capacity / initial capacity (%)
+    "fade_per_cycle",    # fitted capacity change per equivalent full cycle (Ah)
+    "rul_cycles",        # equivalent full cycles until END_OF_LIFE (inf without fade)
+    "rul_hours",         # the same at the average cycling rate so far
+])
+
+
+class SohEstimator:
+    """State of health and remaining useful life for every cell of a pack.
+
+    Charge throughput is coulomb-counted from current, and each cell's
+    measured capacity is regressed linearly on throughput. The fit keeps only
+    centred running moments (n, means, Σ(x-x̄)², Σ(x-x̄)(y-ȳ)), merged per
+    update in the pairwise (Welford/Chan) form, so new ticks are folded in
+    without revisiting history and the fit stays accurate however large the
+    throughput grows. All cells are solved at once in closed form; the cost
+    per tick is a handful of vectorized operations whatever the age of the
+    pack.
+    """
+
+    def __init__(self, num_cells):
+        self.charge_ah = np.zeros(num_cells)
+        self.throughput_ah = np.zeros(num_cells)
+        self._moments = np.zeros((5, num_cells))  # n, x̄, ȳ, Σ(x-x̄)², Σ(x-x̄)(y-ȳ)
+        self._first_time = None
+        self._last_time = None
+        self.latest = None
+
+    def update(self, timestamps, current, capacity):
+        """Fold (ticks,) timestamps with (ticks, cells) current and capacity; return the estimate"""
+        if not len(timestamps):
+            return self.latest
+        timestamps = np.asarray(timestamps, dtype="datetime64[us]")
+        previous = timestamps[:1] if self._last_time is None else np.array([self._last_time])
+        hours = np.diff(np.concatenate((previous, timestamps))) / np.timedelta64(3600, "s")
+        if self._first_time is None:
+            self._first_time = timestamps[0]
+        self._last_time = timestamps[-1]
+
+        # Coulomb counting: each sample's current held over the interval before it
+        current = np.nan_to_num(np.asarray(current, dtype=float))
+        moved = current * hours[:, None]
+        self.charge_ah += moved.sum(axis=0)
+        throughput = self.throughput_ah + np.cumsum(np.abs(moved), axis=0)
+        self.throughput_ah = throughput[-1]
+
+        # Centred moments of capacity against throughput for the least squares fit
+        capacity = np.asarray(capacity, dtype=float)
+        valid = ~np.isnan(capacity)
+        count = valid.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_x = np.where(count > 0, np.where(valid, throughput, 0.0).sum(axis=0) / count, 0.0)
+            mean_y = np.where(count > 0, np.where(valid, capacity, 0.0).sum(axis=0) / count, 0.0)
+        dx = np.where(valid, throughput - mean_x, 0.0)
+        dy = np.where(valid, capacity - mean_y, 0.0)
+        self._merge(count, mean_x, mean_y, (dx * dx).sum(axis=0), (dx * dy).sum(axis=0))
+        self.latest = self._estimate()
+        return self.latest
+
+    def _merge(self, count, mean_x, mean_y, cxx, cxy):
+        """Combine the moments of a batch of samples with the running ones"""
+        n, running_x, running_y, running_cxx, running_cxy = self._moments
+        total = n + count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(total > 0, count / total, 0.0)
+        delta_x, delta_y = mean_x - running_x, mean_y - running_y
+        self._moments = np.stack([
+            total,
+            running_x + delta_x * weight,
+            running_y + delta_y * weight,
+            running_cxx + cxx + delta_x * delta_x * n * weight,
+            running_cxy + cxy + delta_x * delta_y * n * weight,
+        ])
+
+    def _estimate(self):
+        n, mean_x, mean_y, cxx, cxy = self._moments
+        with np.errstate(invalid="ignore", divide="ignore"):
+            spread = cxx > n * np.square(FIT_EPSILON * np.maximum(np.abs(mean_x), 1.0))
+            slope = np.where(spread, cxy / cxx, 0.0)
+            intercept = np.where(n > 0, mean_y - slope * mean_x, np.nan)
+            fitted = n >= MIN_FIT_SAMPLES
+            slope = np.where(fitted, slope, np.nan)
+            intercept = np.where(fitted, intercept, np.nan)
+            capacity = intercept + slope * self.throughput_ah
+            soh = 100 * capacity / intercept
+            # One equivalent full cycle moves twice the capacity (charge + discharge)
+            ah_per_cycle = 2 * intercept
+            cycles = self.throughput_ah / ah_per_cycle
+            end_of_life = END_OF_LIFE * intercept
+            remaining_ah = np.where(slope < 0, (end_of_life - capacity) / slope, np.inf)
+            rul_cycles = np.maximum(0.0, remaining_ah / ah_per_cycle)
+            elapsed_hours = (self._last_time - self._first_time) / np.timedelta64(3600, "s")
+            cycles_per_hour = cycles / elapsed_hours if elapsed_hours > 0 else np.zeros_like(cycles)
+            rul_hours = np.where(cycles_per_hour > 0, rul_cycles / cycles_per_hour, np.inf)
+        return SohResult(self.charge_ah.copy(), self.throughput_ah.copy(), cycles, intercept, capacity,
+                         soh, slope * ah_per_cycle, rul_cycles, rul_hours)
@@ -0,0 +1,266 @@
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from battery_health.telemetry import (
+    MAX_VOLTAGE, METRICS, MIN_VOLTAGE, NOMINAL_VOLTAGE, classify_status, compute_health,
+    encode_cell_types, generate_batch
+)
+
+# Columns a recorded bench log must provide (one row per cell per tick)
+REPLAY_REQUIRED_COLUMNS = ("timestamp", "cell_id", "cell_type", "voltage", "current", "temperature")
+REPLAY_OPTIONAL_COLUMNS = ("power", "capacity")
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+class DataSource:
+    """Base class for cell telemetry sources consumed by the acquisition engine.
+
+    Subclasses set cell_ids, cell_types and type_codes (see encode_cell_types)
+    and implement poll(), which returns the list of (timestamp, batch) ticks
+    that became available since the last call. Batches use the columnar
+    layout produced by generate_batch. Sources that make up their readings
+    set simulated, so the engine does not record their preview tick.
+    """
+
+    name = "source"
+    cell_ids = ()
+    cell_types = ()
+    type_codes = encode_cell_types(())
+    exhausted = False
+    simulated = False
+
+    def poll(self):
+        raise NotImplementedError
+
+    def resume(self):
+        """Called when sampling (re)starts after a pause"""
+
+    def close(self):
+        """Release any files or handles held by the source"""
+
+
+class SimulatorSource(DataSource):
+    """Random telemetry simulator producing one tick per poll"""
+
+    name = "Simulator"
+    simulated = True
+
+    def __init__(self, cell_ids, cell_types, rng=None):
+        self.cell_ids = list(cell_ids)
+        self.cell_types = list(cell_types)
+        self.type_codes = encode_cell_types(self.cell_types)
+        self._rng = rng
+
+    def poll(self):
+        return [(datetime.now(), generate_batch(self.type_codes, self._rng))]
+
+
+class ReplaySource(DataSource):
+    """Replays a recorded CSV or Parquet bench log in streamed chunks.
+
+    The log is in long format (one row per cell per tick) sorted by timestamp.
+    Only one chunk is held in memory at a time, so multi-GB logs replay with a
+    flat footprint. Ticks are released according to their recorded timestamps
+    scaled by the playback speed; seek() jumps to any recorded time, using
+    Parquet row-group statistics to skip data without reading it. Health and
+    status are recomputed from the raw channels with the dashboard thresholds,
+    and cells missing from a tick hold their previous reading.
+    """
+
+    name = "Replay"
+
+    def __init__(self, path, speed=1.0, chunk_rows=100_000, max_ticks_per_poll=1000):
+        self.path = Path(path)
+        if not self.path.is_file():
+            raise FileNotFoundError(f"Replay log not found: {self.path}")
+        self.is_parquet = self.path.suffix.lower() in PARQUET_SUFFIXES
+        self.speed = float(speed)
+        self.chunk_rows = chunk_rows
+        self.max_ticks_per_poll = max_ticks_per_poll
+        self._columns = list(REPLAY_REQUIRED_COLUMNS) + self._available_optional_columns()
+        self.cell_ids, self.cell_types = self._discover_cells()
+        self._cell_index = pd.Index(self.cell_ids)
+        self.type_codes = encode_cell_types(self.cell_types)
+        self.start_time = None
+        self.position = None
+        self._open(None)
+
+    # Reading
+
+    def _available_optional_columns(self):
+        if self.is_parquet:
+            import pyarrow.parquet as pq
+            names = pq.ParquetFile(self.path).schema_arrow.names
+        else:
+            names = pd.read_csv(self.path, nrows=0).columns
+        missing = [c for c in REPLAY_REQUIRED_COLUMNS if c not in names]
+        if missing:
+            raise ValueError(f"Replay log {self.path.name} is missing columns: {', '.join(missing)}")
+        return [c for c in REPLAY_OPTIONAL_COLUMNS if c in names]
+
+    def _iter_frames(self, start):
+        """Yield DataFrame chunks of the log, skipping rows before start"""
+        if self.is_parquet:
+            import pyarrow.parquet as pq
+            parquet_file = pq.ParquetFile(self.path)
+            row_groups = list(range(parquet_file.num_row_groups))
+            if start is not None:
+                row_groups = [rg for rg in row_groups
+                              if not self._row_group_ends_before(parquet_file, rg, start)]
+            batches = parquet_file.iter_batches(batch_size=self.chunk_rows,
+                                                row_groups=row_groups, columns=self._columns)
+            frames = (batch.to_pandas() for batch in batches)
+        else:
+            frames = pd.read_csv(self.path, usecols=self._columns, chunksize=self.chunk_rows,
+                                 parse_dates=["timestamp"])
+        for frame in frames:
+            frame["timestamp"] = pd.to_datetime(frame["timestamp"])
+            if start is not None:
+                if frame["timestamp"].iloc[-1] < start:
+                    continue
+                frame = frame[frame["timestamp"] >= start]
+            yield frame
+
+    @staticmethod
+    def _row_group_ends_before(parquet_file, row_group, start):
+        column = parquet_file.schema_arrow.get_field_index("timestamp")
+        stats = parquet_file.metadata.row_group(row_group).column(column).statistics
+        if stats is None or not stats.has_min_max:
+            return False
+        return pd.Timestamp(stats.max) < start
+
+    def _discover_cells(self):
+        """Read the first recorded tick to find the cell layout"""
+        frames = self._iter_frames(None)
+        first = next(frames, None)
+        if first is None or first.empty:
+            raise ValueError(f"Replay log {self.path.name} contains no rows")
+        # The first tick may span several chunks
+        while first["timestamp"].iloc[-1] == first["timestamp"].iloc[0]:
+            frame = next(frames, None)
+            if frame is None:
+                break
+            first = pd.concat([first, frame], ignore_index=True)
+        first_tick = first[first["timestamp"] == first["timestamp"].iloc[0]]
+        first_tick = first_tick.drop_duplicates("cell_id")
+        return first_tick["cell_id"].astype(str).tolist(), first_tick["cell_type"].astype(str).tolist()
+
+    def _open(self, start):
+        self._frames = self._iter_frames(start)
+        self._carry = None
+        self._pending = deque()
+        self._last = {metric: np.full(len(self.cell_ids), np.nan) for metric in METRICS}
+        self._last["status"] = np.ones(len(self.cell_ids), dtype=np.int8)
+        self.exhausted = False
+        self._anchor_wall = None
+        self._anchor_log = start
+
+    def _fill_pending(self):
+        """Parse the next chunk into ticks; the last tick is carried until complete"""
+        frame = next(self._frames, None)
+        final = frame is None
+        if self._carry is not None:
+            frame = self._carry if final else pd.concat([self._carry, frame], ignore_index=True)
+            self._carry = None
+        if frame is None or frame.empty:
+            self.exhausted = final
+            return
+        timestamps = frame["timestamp"].to_numpy()
+        boundaries = np.flatnonzero(timestamps[1:] != timestamps[:-1]) + 1
+        if not final:
+            # The chunk may end part-way through a tick
+            cut = boundaries[-1] if len(boundaries) else 0
+            self._carry = frame.iloc[cut:]
+            if cut == 0:
+                return
+            frame, timestamps = frame.iloc[:cut], timestamps[:cut]
+            boundaries = boundaries[:-1]
+
+        positions = self._cell_index.get_indexer(frame["cell_id"].astype(str))
+        known = positions >= 0
+        codes = self.type_codes[np.where(known, positions, 0)]
+        voltage = frame["voltage"].to_numpy(dtype=float)
+        current = frame["current"].to_numpy(dtype=float)
+        temperature = frame["temperature"].to_numpy(dtype=float)
+        columns = {
+            "voltage": voltage,
+            "current": current,
+            "temperature": temperature,
+            "power": (frame["power"].to_numpy(dtype=float) if "power" in frame
+                      else np.round(voltage * np.abs(current), 2)),
+            "capacity": (frame["capacity"].to_numpy(dtype=float) if "capacity" in frame
+                         else np.full(len(frame), np.nan)),
+        }
+        columns["health"] = compute_health(voltage, temperature, NOMINAL_VOLTAGE[codes])
+        columns["status"] = classify_status(voltage, temperature, columns["health"],
+                                            MIN_VOLTAGE[codes], MAX_VOLTAGE[codes])
+
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(frame)]))
+        for start, end in zip(starts, ends):
+            rows = slice(start, end)
+            mask = known[rows]
+            index = positions[rows][mask]
+            batch = {}
+            for key, values in columns.items():
+                tick_values = self._last[key].copy()
+                tick_values[index] = values[rows][mask]
+                batch[key] = tick_values
+            self._last = batch
+            self._pending.append((timestamps[start], batch))
+        if final:
+            self.exhausted = True
+
+    def _next_tick_time(self):
+        while not self._pending and not self.exhausted:
+            self._fill_pending()
+        return self._pending[0][0] if self._pending else None
+
+    # Playback
+
+    def poll(self):
+        first_time = self._next_tick_time()
+        if first_time is None:
+            return []
+        if self.start_time is None:
+            self.start_time = pd.Timestamp(first_time).to_pydatetime()
+        now = time.monotonic()
+        if self._anchor_wall is None:
+            self._anchor_wall = now
+        if self._anchor_log is None:
+            self._anchor_log = pd.Timestamp(first_time)
+        due = self._anchor_log + pd.Timedelta(seconds=(now - self._anchor_wall) * self.speed)
+
+        ticks = []
+        while len(ticks) < self.max_ticks_per_poll:
+            tick_time = self._next_tick_time()
+            if tick_time is None or tick_time > due:
+                break
+            timestamp, batch = self._pending.popleft()
+            self.position = pd.Timestamp(timestamp).to_pydatetime()
+            ticks.append((self.position, batch))
+        return ticks
+
+    def resume(self):
+        """Restart the playback clock from the current position"""
+        self._anchor_wall = time.monotonic()
+        self._anchor_log = None if self.position is None else pd.Timestamp(self.position)
+
+    def set_speed(self, speed):
+        """Change the playback speed multiplier without jumping in the log"""
+        self.resume()
+        self.speed = float(speed)
+
+    def seek(self, timestamp):
+        """Continue playback from the first tick at or after timestamp"""
+        self._open(pd.Timestamp(timestamp))
+        self.position = None
+
+    def close(self):
+        self._frames = iter(())
+        self._pending.clear()
@@ -0,0 +1,662 @@
+import json
+import mmap
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from battery_health.telemetry import METRICS
+
+# On-disk schema: long format (one row per cell per tick), readable by ReplaySource
+STORE_SCHEMA = pa.schema(
+    [
+        ("timestamp", pa.timestamp("us")),
+        ("cell_id", pa.dictionary(pa.int32(), pa.string())),
+        ("cell_type", pa.dictionary(pa.int32(), pa.string())),
+    ]
+    + [(metric, pa.float32()) for metric in METRICS]
+    + [("status", pa.int8())]
+)
+
+# Timestamps repeat per cell and grow steadily, so delta coding packs them to a
+# few bits per row; float32 channels use byte-stream-split, which lets the
+# compressor exploit the slowly varying exponent and high mantissa bytes
+COLUMN_ENCODING = {"timestamp": "DELTA_BINARY_PACKED", **{metric: "BYTE_STREAM_SPLIT" for metric in METRICS}}
+DICTIONARY_COLUMNS = ["cell_id", "cell_type", "status"]
+
+# Upper bound on rows per row group in compacted hour files (rounded down to
+# whole ticks); each merged part stays its own row group, split only above this
+ROW_GROUP_ROWS = 1_000_000
+
+_TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+_HOUR_FORMAT = "%Y-%m-%dT%H"
+
+
+def _partition_name(value):
+    return re.sub(r"[^\w.-]", "_", str(value))
+
+
+def store_directory(root, bench, group):
+    """Return the directory a TelemetryStore under root keeps one bench/group in"""
+    return Path(root) / f"bench={_partition_name(bench)}" / f"group={_partition_name(group)}"
+
+
+def _range_stem(prefix, first, last):
+    return f"{prefix}-{pd.Timestamp(first):{_TIME_FORMAT}}-{pd.Timestamp(last):{_TIME_FORMAT}}"
+
+
+def _file_range(path):
+    """Return the (first, last) tick times encoded in a part or segment file name"""
+    first, last = path.name.split(".")[0].split("-")[1:]
+    return (np.datetime64(pd.to_datetime(first, format=_TIME_FORMAT), "us"),
+            np.datetime64(pd.to_datetime(last, format=_TIME_FORMAT), "us"))
+
+
+def _replaced_names(directory):
+    """Return the names of files a written replacement supersedes (see _replace_files)"""
+    replaced = set()
+    for manifest in directory.glob("replace-*.json"):
+        try:
+            entry = json.loads(manifest.read_text())
+        except (FileNotFoundError, ValueError):
+            continue  # finished (or still being written) since the directory was listed
+        if (directory / entry["target"]).exists():
+            replaced.update(entry["sources"])
+    return replaced
+
+
+def _visible_files(directory, pattern):
+    """Return sorted (first, last, path) of the files in an hour directory.
+
+    Files superseded by a compaction or truncation whose sources are not yet
+    removed are skipped; overlapping ranges alone never hide a file.
+    """
+    replaced = _replaced_names(directory)
+    return sorted(((*_file_range(path), path) for path in directory.glob(pattern) if path.name not in replaced),
+                  key=lambda file: (file[0], file[1], file[2].name))
+
+
+def _hour_directories(directory, start=None, end=None):
+    """Return the hour partitions of a bench/group directory overlapping [start, end]"""
+    if not directory.is_dir():
+        return []
+    directories = []
+    for hour_directory in sorted(directory.glob("hour=*")):
+        hour = np.datetime64(pd.to_datetime(hour_directory.name[len("hour="):], format=_HOUR_FORMAT), "h")
+        if start is not None and hour < start.astype("datetime64[h]"):
+            continue
+        if end is not None and hour > end.astype("datetime64[h]"):
+            continue
+        directories.append(hour_directory)
+    return directories
+
+
+def _as_time(value):
+    return None if value is None else np.datetime64(pd.Timestamp(value), "us")
+
+
+def _replace_atomically(path, write):
+    # Write beside the target and rename, so readers never see partial files
+    temporary = path.with_name(path.name + ".tmp")
+    write(temporary)
+    os.replace(temporary, path)
+
+
+def _save_array(path, array):
+    def write(temporary):
+        with open(temporary, "wb") as handle:
+            np.save(handle, array)
+    _replace_atomically(path, write)
+
+
+def _save_json(path, content):
+    def write(temporary):
+        with open(temporary, "w") as handle:
+            json.dump(content, handle)
+    _replace_atomically(path, write)
+
+
+# Memory-mapped segments: one set of files per flush (merged per closed hour)
+#   seg-<first>-<last>.ticks.npy   datetime64[us] (ticks,)
+#   seg-<first>-<last>.values.npy  float32 (ticks, metrics, cells)
+#   seg-<first>-<last>.status.npy  int8 (ticks, cells)
+#   seg-<first>-<last>.json        cell layout and metric order, written last
+SEGMENT_ARRAYS = ("ticks", "values", "status")
+
+
+def _segment_path(directory, stem, array):
+    return directory / f"{stem}.{array}.npy"
+
+
+def _write_segment(directory, stem, arrays, layout):
+    for name in SEGMENT_ARRAYS:
+        _save_array(_segment_path(directory, stem, name), arrays[name])
+    _save_json(directory / f"{stem}.json", layout)
+
+
+def _remove_file(directory, name):
+    """Remove a part file, or a segment (its layout first, then its arrays)"""
+    (directory / name).unlink(missing_ok=True)
+    if name.startswith("seg-"):
+        for array in SEGMENT_ARRAYS:
+            _segment_path(directory, name[:-len(".json")], array).unlink(missing_ok=True)
+
+
+# Compaction and truncation replace files through a manifest written before
+# anything else, replace-<target name>.json {"target": ..., "sources": [...]}:
+# once the target exists readers skip the sources, so an interrupted
+# replacement never shows rows twice, and the next one finishes it.
+
+def _free_stem(directory, stem, suffix):
+    """Return stem, or stem.<n> when a file of that name (and suffix) already exists"""
+    candidate, generation = stem, 0
+    while (directory / f"{candidate}{suffix}").exists():
+        generation += 1
+        candidate = f"{stem}.{generation}"
+    return candidate
+
+
+def _replace_files(directory, target, sources, write):
+    """Replace the named source files of directory by target, created by write()"""
+    manifest = directory / f"replace-{target}.json"
+    _save_json(manifest, {"target": target, "sources": sources})
+    write()
+    for name in sources:
+        _remove_file(directory, name)
+    manifest.unlink()
+
+
+def _finish_replacements(directory):
+    """Complete (or drop) the replacements an interrupted writer left in directory"""
+    for manifest in directory.glob("replace-*.json"):
+        entry = json.loads(manifest.read_text())
+        if (directory / entry["target"]).exists():
+            for name in entry["sources"]:
+                _remove_file(directory, name)
+        else:
+            _remove_file(directory, entry["target"])
+        manifest.unlink()
+
+
+def _map_array(path):
+    """Map a .npy file read-only; return (array, mapping, data offset)"""
+    with open(path, "rb") as handle:
+        version = np.lib.format.read_magic(handle)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(handle)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(handle)
+        offset = handle.tell()
+        mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    count = int(np.prod(shape, dtype=np.int64))
+    array = np.frombuffer(mapping, dtype=dtype, count=count, offset=offset)
+    return array.reshape(shape, order="F" if fortran_order else "C"), mapping, offset
+
+
+class TelemetryStore:
+    """Append-only Parquet store of cell telemetry for one bench and group.
+
+    Files are laid out as root/bench=<name>/group=<n>/hour=<YYYY-MM-DDTHH>/,
+    one part file per flush, named by the first and last tick they hold so
+    range queries prune files without opening them. Ticks are buffered in
+    memory and written in batches; when an hour closes its parts are compacted
+    into a single file that keeps each part as its own row group (split at
+    whole ticks only when a part exceeds ROW_GROUP_ROWS). Readers stream one
+    row group at a time, so querying any time range keeps a bounded footprint.
+
+    With memory_map, every flush also writes an uncompressed segment that
+    MappedHistory serves as zero-copy views (see the segment layout above).
+    """
+
+    def __init__(self, root, bench, group, cell_ids, cell_types,
+                 flush_ticks=600, flush_seconds=30.0, compression="zstd", memory_map=True):
+        self.root = Path(root)
+        self.directory = store_directory(root, bench, group)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.cell_ids = list(cell_ids)
+        self.cell_types = list(cell_types)
+        self._cell_index = pd.Index(self.cell_ids)
+        self.flush_ticks = flush_ticks
+        self.flush_seconds = flush_seconds
+        self.compression = compression
+        self.mapped = MappedHistory(self.directory, self.cell_ids) if memory_map else None
+        self.ticks_written = 0
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._open_hour = None
+
+    # Writing
+
+    def append(self, timestamp, batch):
+        """Buffer one tick; nothing touches the disk until the next flush"""
+        with self._pending_lock:
+            self._pending.append((np.datetime64(timestamp, "us"), batch))
+
+    def flush_if_due(self):
+        """Flush when enough ticks are buffered or the flush interval elapsed"""
+        if len(self._pending) >= self.flush_ticks or (
+                self._pending and time.monotonic() - self._last_flush >= self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        """Write buffered ticks as one part file per hour they span"""
+        with self._write_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            if not pending:
+                return
+            timestamps = np.array([timestamp for timestamp, _ in pending])
+            hours = timestamps.astype("datetime64[h]")
+            boundaries = np.flatnonzero(hours[1:] != hours[:-1]) + 1
+            for start, end in zip(np.concatenate(([0], boundaries)), np.concatenate((boundaries, [len(pending)]))):
+                hour = hours[start]
+                if self._open_hour is not None and hour != self._open_hour:
+                    self._compact(self._hour_directory(self._open_hour))
+                self._open_hour = hour
+                self._write_part(timestamps[start:end], [batch for _, batch in pending[start:end]])
+            self.ticks_written += len(pending)
+
+    def close(self):
+        """Flush buffered ticks and compact the current hour"""
+        self.flush()
+        with self._write_lock:
+            if self._open_hour is not None:
+                self._compact(self._hour_directory(self._open_hour))
+
+    def _hour_directory(self, hour):
+        return self.directory / f"hour={pd.Timestamp(hour):{_HOUR_FORMAT}}"
+
+    def _table(self, timestamps, batches):
+        num_cells = len(self.cell_ids)
+        cell_index = pa.array(np.tile(np.arange(num_cells, dtype=np.int32), len(batches)))
+        columns = {
+            "timestamp": pa.array(np.repeat(timestamps, num_cells)),
+            "cell_id": pa.DictionaryArray.from_arrays(cell_index, pa.array(self.cell_ids, pa.string())),
+            "cell_type": pa.DictionaryArray.from_arrays(cell_index, pa.array(self.cell_types, pa.string())),
+        }
+        for metric in METRICS:
+            columns[metric] = pa.array(np.concatenate([batch[metric] for batch in batches]).astype(np.float32))
+        columns["status"] = pa.array(np.concatenate([batch["status"] for batch in batches]).astype(np.int8))
+        return pa.Table.from_pydict(columns, schema=STORE_SCHEMA)
+
+    def _write(self, path, tables, row_group_rows):
+        def write(temporary):
+            with pq.ParquetWriter(temporary, STORE_SCHEMA, compression=self.compression,
+                                  use_dictionary=DICTIONARY_COLUMNS, column_encoding=COLUMN_ENCODING) as writer:
+                for table in tables:
+                    writer.write_table(table, row_group_size=row_group_rows)
+        _replace_atomically(path, write)
+
+    @property
+    def _layout(self):
+        return {"cell_ids": self.cell_ids, "cell_types": self.cell_types, "metrics": list(METRICS)}
+
+    def _write_part(self, timestamps, batches):
+        directory = self._hour_directory(timestamps[0])
+        directory.mkdir(parents=True, exist_ok=True)
+        table = self._table(timestamps, batches)
+        stem = _range_stem("part", timestamps[0], timestamps[-1])
+        self._write(directory / f"{stem}.parquet", [table], max(1, table.num_rows))
+        if self.mapped is not None:
+            arrays = {
+                "ticks": timestamps,
+                "values": np.stack([np.stack([batch[metric] for metric in METRICS]) for batch in batches])
+                            .astype(np.float32),
+                "status": np.stack([batch["status"] for batch in batches]).astype(np.int8),
+            }
+            _write_segment(directory, _range_stem("seg", timestamps[0], timestamps[-1]), arrays, self._layout)
+
+    @property
+    def _row_group_rows(self):
+        num_cells = max(1, len(self.cell_ids))
+        return max(1, ROW_GROUP_ROWS // num_cells) * num_cells
+
+    def _compact(self, directory):
+        """Merge the part files (and this layout's segments) of a closed hour"""
+        _finish_replacements(directory)
+        parts = _visible_files(directory, "part-*.parquet")
+        if len(parts) > 1:
+            stem = _free_stem(directory, _range_stem("part", parts[0][0], max(last for _, last, _ in parts)),
+                              ".parquet")
+            tables = (pq.read_table(path, schema=STORE_SCHEMA) for _, _, path in parts)
+            _replace_files(directory, f"{stem}.parquet", [path.name for _, _, path in parts],
+                           lambda: self._write(directory / f"{stem}.parquet", tables, self._row_group_rows))
+        if self.mapped is not None:
+            self._merge_segments(directory)
+
+    def _merge_segments(self, directory):
+        """Concatenate segments through memory maps, never loading a whole hour"""
+        segments = [(first, last, path) for first, last, path in _visible_files(directory, "seg-*.json")
+                    if json.loads(path.read_text()) == self._layout]
+        if len(segments) < 2:
+            return
+        sources = [
+            {name: np.load(_segment_path(directory, path.name[:-len(".json")], name), mmap_mode="r")
+             for name in SEGMENT_ARRAYS}
+            for _, _, path in segments
+        ]
+        stem = _free_stem(directory, _range_stem("seg", segments[0][0], max(last for _, last, _ in segments)),
+                          ".json")
+        total = sum(len(source["ticks"]) for source in sources)
+
+        def write_merged():
+            for name in SEGMENT_ARRAYS:
+                def write(temporary, name=name):
+                    first = sources[0][name]
+                    merged = np.lib.format.open_memmap(temporary, mode="w+", dtype=first.dtype,
+                                                       shape=(total,) + first.shape[1:])
+                    offset = 0
+                    for source in sources:
+                        merged[offset:offset + len(source[name])] = source[name]
+                        offset += len(source[name])
+                    merged.flush()
+                    del merged
+                _replace_atomically(_segment_path(directory, stem, name), write)
+            _save_json(directory / f"{stem}.json", self._layout)
+        _replace_files(directory, f"{stem}.json", [path.name for _, _, path in segments], write_merged)
+
+    def truncate(self, timestamp):
+        """Drop the stored ticks at or after timestamp, so a rewound source can record them again"""
+        cutoff = _as_time(timestamp)
+        with self._write_lock:
+            with self._pending_lock:
+                self._pending = [(tick, batch) for tick, batch in self._pending if tick < cutoff]
+            for directory in _hour_directories(self.directory, start=cutoff):
+                _finish_replacements(directory)
+                for first, last, path in _visible_files(directory, "part-*.parquet"):
+                    if last < cutoff:
+                        continue
+                    if first >= cutoff:
+                        _remove_file(directory, path.name)
+                        continue
+                    self._truncate_part(directory, path, first, cutoff)
+                for first, last, path in _visible_files(directory, "seg-*.json"):
+                    if last < cutoff:
+                        continue
+                    if first >= cutoff:
+                        _remove_file(directory, path.name)
+                        continue
+                    self._truncate_segment(directory, path, first, cutoff)
+                if not any(directory.iterdir()):
+                    directory.rmdir()
+            # The hour holding the cutoff is written again, and compacted when it closes
+            self._open_hour = None
+
+    def _truncate_part(self, directory, path, first, cutoff):
+        """Rewrite a part file without its ticks at or after cutoff, one row group at a time"""
+        parquet_file = pq.ParquetFile(path)
+        timestamps = parquet_file.read(columns=["timestamp"]).column("timestamp").to_numpy()
+        last = timestamps[timestamps < cutoff].max()
+        stem = _free_stem(directory, _range_stem("part", first, last), ".parquet")
+        before = pa.scalar(cutoff, pa.timestamp("us"))
+        tables = (
+            table.filter(pc.less(table.column("timestamp"), before))
+            for table in (parquet_file.read_row_group(row_group)
+                          for row_group in range(parquet_file.num_row_groups))
+        )
+        _replace_files(directory, f"{stem}.parquet", [path.name],
+                       lambda: self._write(directory / f"{stem}.parquet", tables, self._row_group_rows))
+
+    def _truncate_segment(self, directory, path, first, cutoff):
+        """Rewrite a segment without its ticks at or after cutoff"""
+        source_stem = path.name[:-len(".json")]
+        arrays = {name: np.load(_segment_path(directory, source_stem, name), mmap_mode="r")
+                  for name in SEGMENT_ARRAYS}
+        kept = int(np.searchsorted(arrays["ticks"], cutoff))
+        stem = _free_stem(directory, _range_stem("seg", first, arrays["ticks"][kept - 1]), ".json")
+        layout = json.loads(path.read_text())
+        _replace_files(directory, f"{stem}.json", [path.name],
+                       lambda: _write_segment(directory, stem, {name: array[:kept] for name, array in arrays.items()},
+                                              layout))
+
+    # Reading
+
+    def time_range(self):
+        """Return the (first, last) persisted tick times, or None if nothing is stored"""
+        directories = [directory for directory in _hour_directories(self.directory)
+                       if _visible_files(directory, "part-*.parquet")]
+        if not directories:
+            return None
+        first = _visible_files(directories[0], "part-*.parquet")[0][0]
+        last = max(part_last for _, part_last, _ in _visible_files(directories[-1], "part-*.parquet"))
+        return first, last
+
+    def query(self, start=None, end=None, metrics=METRICS):
+        """Yield (timestamps, {metric: values}) chunks of the ticks in [start, end].
+
+        values are float32 arrays of shape (ticks, cells) in the order of this
+        store's cell_ids (cells missing from a tick are NaN). Only the files
+        and row groups overlapping the range are read, one row group at a time.
+        """
+        start, end = _as_time(start), _as_time(end)
+        columns = ["timestamp", "cell_id", *metrics]
+        for directory in _hour_directories(self.directory, start, end):
+            for first, last, path in _visible_files(directory, "part-*.parquet"):
+                if (start is not None and last < start) or (end is not None and first > end):
+                    continue
+                try:
+                    parquet_file = pq.ParquetFile(path)
+                except FileNotFoundError:
+                    continue  # compacted away since the directory was listed
+                for row_group in range(parquet_file.num_row_groups):
+                    chunk = self._read_row_group(parquet_file, row_group, columns, start, end)
+                    if chunk is not None:
+                        yield chunk
+
+    def _read_row_group(self, parquet_file, row_group, columns, start, end):
+        stats = parquet_file.metadata.row_group(row_group).column(0).statistics
+        if stats is not None and stats.has_min_max:
+            if (start is not None and np.datetime64(stats.max, "us") < start) or (
+                    end is not None and np.datetime64(stats.min, "us") > end):
+                return None
+        table = parquet_file.read_row_group(row_group, columns=columns)
+        timestamps = table.column("timestamp").to_numpy()
+        rows = np.ones(len(timestamps), dtype=bool)
+        if start is not None:
+            rows &= timestamps >= start
+        if end is not None:
+            rows &= timestamps <= end
+        if not rows.any():
+            return None
+
+        cell_column = table.column("cell_id").combine_chunks()
+        if isinstance(cell_column, pa.DictionaryArray):
+            positions = self._cell_index.get_indexer(cell_column.dictionary.to_pylist())
+            positions = positions[cell_column.indices.to_numpy(zero_copy_only=False)]
+        else:
+            positions = self._cell_index.get_indexer(cell_column.to_pylist())
+        rows &= positions >= 0
+        timestamps, positions = timestamps[rows], positions[rows]
+        if not len(timestamps):
+            return None
+        tick = np.concatenate(([0], np.cumsum(timestamps[1:] != timestamps[:-1])))
+        tick_times = timestamps[np.concatenate(([0], np.flatnonzero(np.diff(tick)) + 1))]
+        values = {}
+        for metric in columns[2:]:
+            grid = np.full((len(tick_times), len(self.cell_ids)), np.nan, dtype=np.float32)
+            grid[tick, positions] = table.column(metric).to_numpy()[rows]
+            values[metric] = grid
+        return tick_times, values
+
+
+def read_rows(directory, start=None, end=None, columns=None, cell_ids=None, cell_types=None):
+    """Yield the stored rows of a bench/group directory in [start, end] as pyarrow tables.
+
+    Rows keep the on-disk long format (STORE_SCHEMA, or the given columns in
+    that order), one table per row group, optionally restricted to some
+    cell_ids and cell_types. Works on any store directory without knowing
+    its cell layout, so it also serves jobs outside the dashboard.
+    """
+    start, end = _as_time(start), _as_time(end)
+    directory = Path(directory)
+    columns = STORE_SCHEMA.names if columns is None else [name for name in STORE_SCHEMA.names if name in columns]
+    filters = [("cell_id", cell_ids), ("cell_type", cell_types)]
+    filters = [(name, pa.array(list(values), pa.string())) for name, values in filters if values is not None]
+    read_columns = list(dict.fromkeys(["timestamp", *columns, *(name for name, _ in filters)]))
+    for hour_directory in _hour_directories(directory, start, end):
+        for first, last, path in _visible_files(hour_directory, "part-*.parquet"):
+            if (start is not None and last < start) or (end is not None and first > end):
+                continue
+            try:
+                parquet_file = pq.ParquetFile(path)
+            except FileNotFoundError:
+                continue  # compacted away since the directory was listed
+            for row_group in range(parquet_file.num_row_groups):
+                stats = parquet_file.metadata.row_group(row_group).column(0).statistics
+                if stats is not None and stats.has_min_max and (
+                        (start is not None and np.datetime64(stats.max, "us") < start)
+                        or (end is not None and np.datetime64(stats.min, "us") > end)):
+                    continue
+                table = parquet_file.read_row_group(row_group, columns=read_columns)
+                mask = None
+                if start is not None:
+                    mask = pc.greater_equal(table.column("timestamp"), pa.scalar(start, pa.timestamp("us")))
+                if end is not None:
+                    upper = pc.less_equal(table.column("timestamp"), pa.scalar(end, pa.timestamp("us")))
+                    mask = upper if mask is None else pc.and_(mask, upper)
+                for name, values in filters:
+                    matches = pc.is_in(table.column(name), value_set=values)
+                    mask = matches if mask is None else pc.and_(mask, matches)
+                if mask is not None:
+                    table = table.filter(mask)
+                if table.num_rows:
+                    yield table.select(columns)
+
+
+class MappedHistory:
+    """Zero-copy reader over the memory-mapped segments of a TelemetryStore.
+
+    Segments are found from their file names and mapped lazily on first use,
+    so opening any amount of history costs a directory listing. Range reads
+    binary-search each segment's tick index and return views into the
+    mapping: only the pages actually read are faulted in, and query() hands
+    them back to the OS once the caller moves on, keeping resident memory flat.
+    Values are stored metric-major per tick, so reading one metric skips the
+    pages of the others once a metric's slice of a tick (4 bytes per cell)
+    spans at least a page; for smaller packs every page of the range is read.
+    """
+
+    # Mapped bytes per chunk yielded by query(), bounding resident memory
+    CHUNK_BYTES = 64 * 2**20
+
+    def __init__(self, directory, cell_ids, metrics=METRICS):
+        self.directory = Path(directory)
+        self.cell_ids = list(cell_ids)
+        self.metrics = tuple(metrics)
+        self._mapped = {}
+
+    def segments(self, start=None, end=None):
+        """Return (first, last, path) of the segments overlapping [start, end]"""
+        start, end = _as_time(start), _as_time(end)
+        segments = [
+            (first, last, path)
+            for directory in _hour_directories(self.directory, start, end)
+            for first, last, path in _visible_files(directory, "seg-*.json")
+            if (start is None or last >= start) and (end is None or first <= end)
+        ]
+        # Drop mappings of segments merged away since they were opened
+        self._mapped = {path: mapped for path, mapped in self._mapped.items() if path.exists()}
+        return segments
+
+    def time_range(self):
+        """Return the (first, last) mapped tick times, or None if there are no segments"""
+        segments = self.segments()
+        if not segments:
+            return None
+        return segments[0][0], max(last for _, last, _ in segments)
+
+    def _map(self, path):
+        stat = path.stat()
+        # truncate() can remove a segment and a later flush write it again under the same name
+        identity = stat.st_ino, stat.st_size, stat.st_mtime_ns
+        if path not in self._mapped or self._mapped[path][0] != identity:
+            layout = json.loads(path.read_text())
+            stem = path.name[:-len(".json")]
+            mapped = {name: _map_array(_segment_path(path.parent, stem, name)) for name in SEGMENT_ARRAYS}
+            arrays = {name: array for name, (array, _, _) in mapped.items()}
+            # Our own handle on the values file, for handing its pages back to the OS
+            values_mapping = mapped["values"][1:]
+            # Segment column of each of our cells (-1 if absent); None when identical
+            columns = None
+            if layout["cell_ids"] != self.cell_ids:
+                columns = pd.Index(layout["cell_ids"]).get_indexer(self.cell_ids)
+            metric_rows = {metric: layout["metrics"].index(metric)
+                           for metric in self.metrics if metric in layout["metrics"]}
+            self._mapped[path] = identity, (arrays, values_mapping, columns, metric_rows)
+        return self._mapped[path][1]
+
+    def _ranges(self, start, end):
+        start, end = _as_time(start), _as_time(end)
+        for _, _, path in self.segments(start, end):
+            try:
+                arrays, values_mapping, columns, metric_rows = self._map(path)
+            except FileNotFoundError:
+                continue  # merged away since the directory was listed
+            ticks = arrays["ticks"]
+            lo = 0 if start is None else int(np.searchsorted(ticks, start))
+            hi = len(ticks) if end is None else int(np.searchsorted(ticks, end, side="right"))
+            if lo < hi:
+                yield arrays, values_mapping, columns, metric_rows, lo, hi
+
+    @staticmethod
+    def _select(view, columns):
+        """Reorder a (..., cells) view into our cell order; zero-copy when layouts match"""
+        if columns is None:
+            return view
+        selected = np.full(view.shape[:-1] + (len(columns),), np.nan, dtype=np.float32)
+        present = columns >= 0
+        selected[..., present] = view[..., columns[present]]
+        return selected
+
+    def window(self, start=None, end=None):
+        """Yield (timestamps, values, status) per segment for the ticks in [start, end].
+
+        values has shape (ticks, metrics, cells) and status (ticks, cells);
+        both are read-only views into the mapping when the cell layout matches.
+        """
+        for arrays, _, columns, _, lo, hi in self._ranges(start, end):
+            status = arrays["status"][lo:hi]
+            if columns is not None:
+                status = np.where(columns >= 0, status[:, np.maximum(columns, 0)], 0).astype(np.int8)
+            yield arrays["ticks"][lo:hi], self._select(arrays["values"][lo:hi], columns), status
+
+    def query(self, start=None, end=None, metrics=None):
+        """Yield (timestamps, {metric: values}) chunks like TelemetryStore.query.
+
+        values are (ticks, cells) views into the mapping; each chunk's pages
+        are released after the caller has consumed it.
+        """
+        metrics = self.metrics if metrics is None else metrics
+        for arrays, values_mapping, columns, metric_rows, lo, hi in self._ranges(start, end):
+            values = arrays["values"]
+            chunk_ticks = max(1, self.CHUNK_BYTES // values.strides[0])
+            for chunk_lo in range(lo, hi, chunk_ticks):
+                chunk_hi = min(hi, chunk_lo + chunk_ticks)
+                chunk = {}
+                for metric in metrics:
+                    if metric in metric_rows:
+                        chunk[metric] = self._select(values[chunk_lo:chunk_hi, metric_rows[metric]], columns)
+                    else:
+                        chunk[metric] = np.full((chunk_hi - chunk_lo, len(self.cell_ids)), np.nan, np.float32)
+                yield arrays["ticks"][chunk_lo:chunk_hi], chunk
+                _release(*values_mapping, values.strides[0], chunk_lo, chunk_hi)
+
+
+def _release(mapping, offset, row_bytes, lo, hi):
+    """Tell the OS the mapped pages of rows [lo, hi) after offset are no longer needed"""
+    if not hasattr(mmap, "MADV_DONTNEED"):
+        return
+    begin = (offset + lo * row_bytes) // mmap.PAGESIZE * mmap.PAGESIZE
+    end = offset + hi * row_bytes
+    if end > begin:
+        mapping.madvise(mmap.MADV_DONTNEED, begin, end - begin)
@@ -0,0 +1,84 @@
+from collections import namedtuple
+
+import numpy as np
+
+from battery_health.selection import status_counts, type_counts
+
+# Health percentiles reported in the pack summary
+HEALTH_PERCENTILES = (5, 25, 50, 75, 95)
+
+PackSummary = namedtuple("PackSummary", [
+    "total_cells",
+    "status_counts",        # indexed like STATUSES
+    "mean_health",
+    "min_health",
+    "max_health",
+    "health_percentiles",   # indexed like HEALTH_PERCENTILES
+    "total_power",
+    "type_counts",          # indexed like CELL_TYPES
+    "type_mean_health",
+    "type_total_power",
+])
+
+
+def summarize(batch, type_codes):
+    """Compute every pack-level aggregate of one tick in a single vectorized pass"""
+    health = batch["health"]
+    power = batch["power"]
+    valid = ~np.isnan(health)
+    counts_by_type = type_counts(type_codes)
+    health_by_type = np.bincount(type_codes[valid], weights=health[valid], minlength=len(counts_by_type))
+    valid_by_type = np.bincount(type_codes[valid], minlength=len(counts_by_type))
+    power_by_type = np.bincount(type_codes, weights=np.nan_to_num(power), minlength=len(counts_by_type))
+    has_health = valid.any()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_by_type = health_by_type / valid_by_type
+    return PackSummary(
+        total_cells=len(health),
+        status_counts=status_counts(batch["status"]),
+        mean_health=float(health[valid].mean()) if has_health else float("nan"),
+        min_health=float(health[valid].min()) if has_health else float("nan"),
+        max_health=float(health[valid].max()) if has_health else float("nan"),
+        health_percentiles=(np.percentile(health[valid], HEALTH_PERCENTILES) if has_health
+                            else np.full(len(HEALTH_PERCENTILES), np.nan)),
+        total_power=float(np.nansum(power)),
+        type_counts=counts_by_type,
+        type_mean_health=mean_by_type,
+        type_total_power=power_by_type,
+    )
+
+
+def rollup(summaries, groups):
+    """Aggregate many PackSummary objects by group label (e.g. bench) in one pass.
+
+    Returns (labels, totals) where totals maps a column name to an array
+    indexed like labels: cells, partitions, one count per status, mean, min
+    and max health (cell-weighted, NaN-safe) and total power.
+    """
+    labels, codes = np.unique(np.asarray(groups), return_inverse=True)
+    size = len(labels)
+    cells = np.array([summary.total_cells for summary in summaries], dtype=float)
+    counts = np.array([summary.status_counts for summary in summaries]).reshape(len(summaries), -1)
+    mean_health = np.array([summary.mean_health for summary in summaries], dtype=float)
+    min_health = np.array([summary.min_health for summary in summaries], dtype=float)
+    max_health = np.array([summary.max_health for summary in summaries], dtype=float)
+    weights = np.where(np.isnan(mean_health), 0.0, cells)
+
+    totals = {
+        "partitions": np.bincount(codes, minlength=size),
+        "cells": np.bincount(codes, weights=cells, minlength=size).astype(int),
+    }
+    for status_index in range(counts.shape[1]):
+        totals[f"status_{status_index}"] = np.bincount(codes, weights=counts[:, status_index], minlength=size).astype(int)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        totals["mean_health"] = (np.bincount(codes, weights=np.nan_to_num(mean_health) * weights, minlength=size)
+                                 / np.bincount(codes, weights=weights, minlength=size))
+    totals["min_health"] = np.full(size, np.inf)
+    np.fmin.at(totals["min_health"], codes, min_health)
+    totals["max_health"] = np.full(size, -np.inf)
+    np.fmax.at(totals["max_health"], codes, max_health)
+    for column in ("min_health", "max_health"):
+        totals[column][np.isinf(totals[column])] = np.nan
+    totals["total_power"] = np.bincount(codes, weights=[summary.total_power for summary in summaries],
+                                        minlength=size)
+    return labels, totals
@@ -0,0 +1,153 @@
+import numpy as np
+
+# Cell type configurations with enhanced colors
+CELL_CONFIGS = {
+    "LFP": {
+        "nominal_voltage": 3.2,
+        "min_voltage": 2.8,
+        "max_voltage": 3.6,
+        "color": "#00ff88",
+        "gradient": "linear-gradient(135deg, #11998e 0%, #38ef7d 100%)"
+    },
+    "NMC": {
+        "nominal_voltage": 3.6,
+        "min_voltage": 3.2,
+        "max_voltage": 4.0,
+        "color": "#ff6b6b",
+        "gradient": "linear-gradient(135deg, #ff416c 0%, #ff4b2b 100%)"
+    },
+    "LTO": {
+        "nominal_voltage": 2.4,
+        "min_voltage": 1.5,
+        "max_voltage": 2.8,
+        "color": "#ffa726",
+        "gradient": "linear-gradient(135deg, #f093fb 0%, #f5576c 100%)"
+    },
+    "LiCoO2": {
+        "nominal_voltage": 3.7,
+        "min_voltage": 3.0,
+        "max_voltage": 4.2,
+        "color": "#ab47bc",
+        "gradient": "linear-gradient(135deg, #667eea 0%, #764ba2 100%)"
+    }
+}
+
+# Numeric telemetry columns, in storage order
+METRICS = ("voltage", "current", "temperature", "power", "capacity", "health")
+
+# Status labels indexed by the status codes produced by classify_status
+STATUSES = ("Excellent", "Good", "Warning", "Critical")
+
+# Per-type lookup tables indexed by type code
+CELL_TYPES = tuple(CELL_CONFIGS.keys())
+TYPE_CODES = {cell_type: code for code, cell_type in enumerate(CELL_TYPES)}
+NOMINAL_VOLTAGE = np.array([CELL_CONFIGS[t]["nominal_voltage"] for t in CELL_TYPES])
+MIN_VOLTAGE = np.array([CELL_CONFIGS[t]["min_voltage"] for t in CELL_TYPES])
+MAX_VOLTAGE = np.array([CELL_CONFIGS[t]["max_voltage"] for t in CELL_TYPES])
+
+_default_rng = np.random.default_rng()
+
+
+def encode_cell_types(cell_types):
+    """Return an array of type codes for a sequence of cell type names"""
+    return np.fromiter((TYPE_CODES[t] for t in cell_types), dtype=np.int8, count=len(cell_types))
+
+
+def mix_cell_types(num_cells, weights):
+    """Return num_cells cell type names interleaved in proportion to weights.
+
+    weights maps cell types to non-negative shares; counts are apportioned by
+    largest remainder and each type's cells are spread evenly through the
+    pack, so equal weights give a plain round robin.
+    """
+    types = [cell_type for cell_type in CELL_TYPES if weights.get(cell_type, 0) > 0]
+    if not types:
+        raise ValueError("Give at least one cell type a positive weight")
+    shares = np.array([weights[cell_type] for cell_type in types], dtype=float)
+    exact = num_cells * shares / shares.sum()
+    counts = np.floor(exact).astype(int)
+    counts[np.argsort(counts - exact, kind="stable")[:num_cells - counts.sum()]] += 1
+    # Place the k-th of a type's c cells at fraction (k + 0.5) / c of the pack
+    codes = np.repeat(np.arange(len(types)), counts)
+    positions = np.concatenate([(np.arange(count) + 0.5) / count for count in counts if count])
+    order = np.lexsort((codes, positions))
+    return [types[code] for code in codes[order]]
+
+
+def compute_health(voltage, temperature, nominal_voltage):
+    """Return overall health from voltage deviation and temperature (vectorized)"""
+    voltage_health = 100 * (1 - np.abs(voltage - nominal_voltage) / nominal_voltage)
+    temp_health = 100 * np.maximum(0, 1 - np.maximum(0, temperature - 35) / 20)
+    return np.round((voltage_health + temp_health) / 2, 1)
+
+
+def classify_status(voltage, temperature, health, min_voltage, max_voltage):
+    """Return status codes (indexes into STATUSES) from the health thresholds"""
+    critical = (voltage < min_voltage) | (voltage > max_voltage) | (temperature > 45)
+    warning = (temperature > 40) | (health < 75)
+    excellent = health >= 90
+    return np.select([critical, warning, excellent], [3, 2, 0], default=1).astype(np.int8)
+
+
+def generate_batch(type_codes, rng=None):
+    """Generate realistic battery data for many cells in one vectorized pass.
+
+    Returns a dict of equally sized arrays (one per metric plus "status" codes).
+    """
+    rng = _default_rng if rng is None else rng
+    type_codes = np.asarray(type_codes, dtype=np.int8)
+    n = len(type_codes)
+    nominal = NOMINAL_VOLTAGE[type_codes]
+
+    # Simulate realistic voltage fluctuations
+    voltage = np.round(nominal + rng.uniform(-0.1, 0.1, n), 3)
+
+    # Simulate current (positive for charging, negative for discharging)
+    current = np.round(rng.uniform(-5.0, 5.0, n), 2)
+
+    # Temperature simulation with some correlation to current
+    temperature = np.round(25 + np.abs(current) * 0.5 + rng.uniform(-2, 8, n), 1)
+
+    # Calculate power and capacity
+    power = np.round(voltage * np.abs(current), 2)
+    capacity = np.round(rng.uniform(2.8, 3.2, n), 2)  # Ah
+
+    health = compute_health(voltage, temperature, nominal)
+    status = classify_status(voltage, temperature, health,
+                             MIN_VOLTAGE[type_codes], MAX_VOLTAGE[type_codes])
+
+    return {
+        "voltage": voltage,
+        "current": current,
+        "temperature": temperature,
+        "power": power,
+        "capacity": capacity,
+        "health": health,
+        "status": status,
+    }
+
+
+def batch_to_records(batch, cell_ids, cell_types, current_time):
+    """Convert a columnar batch into the per-cell dict records used by the dashboard"""
+    columns = {metric: batch[metric].tolist() for metric in METRICS}
+    statuses = [STATUSES[code] for code in batch["status"].tolist()]
+    records = {}
+    for i, (cell_id, cell_type) in enumerate(zip(cell_ids, cell_types)):
+        config = CELL_CONFIGS[cell_type]
+        record = {"cell_id": cell_id, "cell_type": cell_type}
+        for metric in METRICS:
+            record[metric] = columns[metric][i]
+        record.update({
+            "status": statuses[i],
+            "timestamp": current_time,
+            "min_voltage": config["min_voltage"],
+            "max_voltage": config["max_voltage"]
+        })
+        records[cell_id] = record
+    return records
+
+
+def generate_cell_data(cell_type, cell_id, current_time, rng=None):
+    """Generate realistic battery cell data with enhanced status"""
+    batch = generate_batch(encode_cell_types([cell_type]), rng)
+    return batch_to_records(batch, [cell_id], [cell_type], current_time)[cell_id]
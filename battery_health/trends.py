@@ -0,0 +1,211 @@
+import numpy as np
+
+from battery_health.downsample import MinMaxAggregator, downsample
+
+# Metrics plotted on the Historical Trends tab, in subplot order
+TREND_METRICS = ("voltage", "current", "temperature", "health")
+
+
+class TrendWindow:
+    """Per-cell columns of the most recent history ticks, maintained incrementally.
+
+    update() only copies the ticks appended to the engine history since the
+    previous call, so the cost per rerun is proportional to the new data rather
+    than to the window size times the number of cells.
+    """
+
+    def __init__(self, size=50, metrics=TREND_METRICS):
+        self.size = size
+        self.metrics = tuple(metrics)
+        self._reset(None)
+
+    def _reset(self, history):
+        self.history = history
+        self.last_tick = 0
+        self.cell_ids = [] if history is None else history.cell_ids
+        self.timestamps = np.array([], dtype="datetime64[us]")
+        self.columns = {metric: np.empty((len(self.cell_ids), 0)) for metric in self.metrics}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def key(self):
+        """Identifies the window contents; changes whenever new ticks are merged"""
+        return id(self.history), self.last_tick
+
+    def update(self, engine):
+        """Merge ticks recorded since the last update; return True if anything changed"""
+        with engine.lock:
+            history = engine.history
+            if history is not self.history:
+                self._reset(history)
+            if history is None or history.total_ticks == self.last_tick:
+                return False
+            new_ticks = min(history.total_ticks - self.last_tick, self.size)
+            timestamps, _, _ = history.window(new_ticks)
+            timestamps = timestamps.copy()
+            # Store cell-major so each trace reads one contiguous row
+            new_columns = {metric: history.metric(metric, new_ticks).T.copy() for metric in self.metrics}
+            self.last_tick = history.total_ticks
+
+        self.timestamps = np.concatenate((self.timestamps, timestamps))[-self.size:]
+        for metric in self.metrics:
+            merged = np.concatenate((self.columns[metric], new_columns[metric]), axis=1)
+            self.columns[metric] = merged[:, -self.size:]
+        return True
+
+    def trace(self, metric, cell_index):
+        """Return the (x, y) arrays of one cell's trace"""
+        return self.timestamps, self.columns[metric][cell_index]
+
+
+# Long-range trend windows: label -> (seconds, point budget per trace)
+TREND_WINDOWS = {
+    "Last 5 min": (300, 600),
+    "Last 1 h": (3600, 1200),
+    "Last 24 h": (86400, 2000),
+}
+
+
+class _DownsampledTraces:
+    """Per-metric traces reduced from MinMaxAggregator buckets to a point budget"""
+
+    def __len__(self):
+        if not self._traces:
+            return 0
+        x, _ = next(iter(self._traces.values()))
+        return x.shape[1]
+
+    def _downsample(self, method):
+        self._traces = {}
+        for metric, aggregator in self.aggregators.items():
+            if len(aggregator):
+                timestamps, values = aggregator.series()
+                self._traces[metric] = downsample(timestamps, values, self.budget, method)
+
+    def trace(self, metric, cell_index):
+        """Return the (x, y) arrays of one cell's downsampled trace"""
+        x, y = self._traces[metric]
+        return x[cell_index], y[cell_index]
+
+
+class DecimatedTrends(_DownsampledTraces):
+    """Downsampled long-range trend traces cached per (cell, metric, window).
+
+    Each metric keeps a MinMaxAggregator over the window that is fed only the
+    ticks appended since the previous update, so the engine lock is held for
+    a short, bounded time even when the window spans hours of history. The
+    aggregated series (two candidate points per bucket) is then reduced to the
+    window's point budget with LTTB or min/max and cached until a new bucket
+    opens, so traces refresh at the resolution of the visible time range.
+    """
+
+    # Ticks folded in per lock acquisition while catching up on long history
+    CATCH_UP_TICKS = 8192
+
+    def __init__(self, window, metrics=TREND_METRICS):
+        self.window = window
+        self.seconds, self.budget = TREND_WINDOWS[window]
+        self.metrics = tuple(metrics)
+        self.aggregators = {
+            metric: MinMaxAggregator(self.seconds / self.budget, self.budget)
+            for metric in self.metrics
+        }
+        self.history = None
+        self.cell_ids = []
+        self.last_tick = 0
+        self.key = (None, 0)
+        self._traces = {}
+
+    def _reset(self, history):
+        self.history = history
+        self.cell_ids = [] if history is None else history.cell_ids
+        self.last_tick = 0
+        for aggregator in self.aggregators.values():
+            aggregator.reset()
+        if history is not None and history.total_ticks:
+            # Start from the first tick inside the window
+            start = history.latest()[0] - np.timedelta64(self.seconds, "s")
+            self.last_tick = history.total_ticks - history.ticks_since(start)
+
+    def _fold_new_ticks(self, engine):
+        """Fold at most CATCH_UP_TICKS unseen ticks; return how many remain"""
+        with engine.lock:
+            history = engine.history
+            if history is not self.history:
+                self._reset(history)
+            if history is None:
+                return 0
+            # Ticks already overwritten in the ring buffer are skipped
+            self.last_tick = max(self.last_tick, history.total_ticks - len(history))
+            unseen = history.total_ticks - self.last_tick
+            count = min(unseen, self.CATCH_UP_TICKS)
+            if not count:
+                return 0
+            timestamps, _, _ = history.window(unseen)
+            timestamps = timestamps[:count]
+            for metric, aggregator in self.aggregators.items():
+                if not aggregator.add(timestamps, history.metric(metric, unseen)[:count]):
+                    self._reset(history)
+                    return history.total_ticks - self.last_tick
+            self.last_tick += count
+            return unseen - count
+
+    def update(self, engine, method="lttb"):
+        """Bring the traces up to date; return True if they changed"""
+        while self._fold_new_ticks(engine):
+            pass
+        open_bucket = self.aggregators[self.metrics[0]].open_bucket
+        key = ((id(self.history), self.window, method), open_bucket)
+        if key == self.key:
+            return False
+        self.key = key
+        self._downsample(method)
+        return True
+
+
+class StoredTrends(_DownsampledTraces):
+    """Downsampled traces over any time range read back from a TelemetryStore.
+
+    The range is streamed chunk by chunk, from the store's memory-mapped
+    segments when it keeps them and from its Parquet row groups otherwise,
+    through a MinMaxAggregator per metric, so memory stays bounded by the
+    point budget however long the range is. Later updates only read ticks
+    persisted since the previous one.
+    """
+
+    def __init__(self, store, start, end, budget=2000, metrics=TREND_METRICS):
+        self.store = store
+        self.reader = store if store.mapped is None else store.mapped
+        self.start = np.datetime64(start, "us")
+        self.end = np.datetime64(end, "us")
+        self.budget = budget
+        self.metrics = tuple(metrics)
+        seconds = max(1e-6, (self.end - self.start) / np.timedelta64(1, "s"))
+        self.aggregators = {
+            metric: MinMaxAggregator(seconds / budget, budget + 1)
+            for metric in self.metrics
+        }
+        self.cell_ids = store.cell_ids
+        self.read_until = None  # last persisted tick folded in
+        self.ticks_written = -1
+        self.key = (None, 0)
+        self._traces = {}
+
+    def update(self, method="lttb"):
+        """Fold newly persisted ticks in range; return True if the traces changed"""
+        complete = self.read_until is not None and self.read_until >= self.end
+        if not complete and self.store.ticks_written != self.ticks_written:
+            self.ticks_written = self.store.ticks_written
+            start = self.start if self.read_until is None else self.read_until + np.timedelta64(1, "us")
+            for timestamps, values in self.reader.query(start, self.end, self.metrics):
+                for metric, aggregator in self.aggregators.items():
+                    aggregator.add(timestamps, values[metric])
+                self.read_until = timestamps[-1]
+        key = ((id(self.store), self.start, self.end, method), self.read_until)
+        if key == self.key:
+            return False
+        self.key = key
+        self._downsample(method)
+        return True
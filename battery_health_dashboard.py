@@ -1,12 +1,26 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import random
+from datetime import timedelta
+import os
 import time
-from datetime import datetime, timedelta
-import numpy as np
+from battery_health.telemetry import CELL_CONFIGS, CELL_TYPES, mix_cell_types
+from battery_health.history import DEFAULT_CAPACITY
+from battery_health.fleet import simulator_specs
+from battery_health.gateway import (
+    GATEWAY_MAX_CELLS, GATEWAY_PROTOCOLS, GatewaySource, open_transport, simulator_address
+)
+from battery_health.sources import ReplaySource, SimulatorSource
+from battery_health.profiling import profiler
+from battery_health.dashboard.resources import (
+    get_acquisition_engine, get_alert_dispatcher, get_bus_viewer, get_fleet_engine, get_metrics_server,
+    get_protocol_simulator, get_webhook_stub
+)
+from battery_health.dashboard.styles import DASHBOARD_CSS
+from battery_health.dashboard.views import (
+    init_session_state, render_diagnostics, render_fleet_overview, render_group_views
+)
+
+# Full reruns are timed when profiling is enabled
+rerun_started = time.perf_counter()
 
 # Page configuration
 st.set_page_config(
@@ -16,302 +30,21 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Enhanced Custom CSS for better styling and animations
-st.markdown("""
-<style>
-    .main-header {
-        text-align: center;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        font-size: 3rem;
-        font-weight: bold;
-        margin-bottom: 2rem;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
-    }
-    
-    .metric-card {
-        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-        padding: 1.5rem;
-        border-radius: 15px;
-        border-left: 5px solid #1f77b4;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        transition: transform 0.3s ease;
-    }
-    
-    .metric-card:hover {
-        transform: translateY(-5px);
-    }
-    
-    .health-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 20px;
-        border-radius: 20px;
-        color: white;
-        text-align: center;
-        margin: 10px 0;
-        box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-        transition: all 0.3s ease;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .health-card::before {
-        content: '';
-        position: absolute;
-        top: -50%;
-        left: -50%;
-        width: 200%;
-        height: 200%;
-        background: linear-gradient(45deg, transparent, rgba(255,255,255,0.1), transparent);
-        transform: rotate(45deg);
-        transition: all 0.6s ease;
-    }
-    
-    .health-card:hover::before {
-        animation: shine 0.6s ease-in-out;
-    }
-    
-    @keyframes shine {
-        0% { transform: translateX(-100%) translateY(-100%) rotate(45deg); }
-        100% { transform: translateX(100%) translateY(100%) rotate(45deg); }
-    }
-    
-    .health-excellent {
-        background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
-        animation: pulse-green 2s infinite;
-    }
-    
-    .health-good {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-    }
-    
-    .health-warning {
-        background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-        animation: pulse-orange 2s infinite;
-    }
-    
-    .health-critical {
-        background: linear-gradient(135deg, #ff416c 0%, #ff4b2b 100%);
-        animation: pulse-red 1s infinite;
-    }
-    
-    @keyframes pulse-green {
-        0%, 100% { box-shadow: 0 8px 25px rgba(17, 153, 142, 0.3); }
-        50% { box-shadow: 0 8px 35px rgba(17, 153, 142, 0.6); }
-    }
-    
-    @keyframes pulse-orange {
-        0%, 100% { box-shadow: 0 8px 25px rgba(240, 147, 251, 0.3); }
-        50% { box-shadow: 0 8px 35px rgba(240, 147, 251, 0.6); }
-    }
-    
-    @keyframes pulse-red {
-        0%, 100% { box-shadow: 0 8px 25px rgba(255, 65, 108, 0.4); }
-        50% { box-shadow: 0 8px 35px rgba(255, 65, 108, 0.8); }
-    }
-    
-    .status-excellent {
-        color: #00ff88;
-        font-weight: bold;
-        text-shadow: 0 0 10px rgba(0, 255, 136, 0.5);
-    }
-    
-    .status-good {
-        color: #28a745;
-        font-weight: bold;
-        text-shadow: 0 0 10px rgba(40, 167, 69, 0.5);
-    }
-    
-    .status-warning {
-        color: #ff6b35;
-        font-weight: bold;
-        text-shadow: 0 0 10px rgba(255, 107, 53, 0.5);
-        animation: blink 1.5s infinite;
-    }
-    
-    .status-critical {
-        color: #ff3838;
-        font-weight: bold;
-        text-shadow: 0 0 15px rgba(255, 56, 56, 0.8);
-        animation: blink 0.8s infinite;
-    }
-    
-    @keyframes blink {
-        0%, 50% { opacity: 1; }
-        51%, 100% { opacity: 0.6; }
-    }
-    
-    .battery-icon {
-        font-size: 2.5rem;
-        margin-bottom: 10px;
-        display: block;
-    }
-    
-    .health-percentage {
-        font-size: 2.5rem;
-        font-weight: bold;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-    }
-    
-    .cell-name {
-        font-size: 1.1rem;
-        font-weight: 600;
-        margin-bottom: 5px;
-        opacity: 0.9;
-    }
-    
-    .overview-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 20px;
-        border-radius: 15px;
-        text-align: center;
-        box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-        margin: 10px 0;
-    }
-    
-    .overview-number {
-        font-size: 2rem;
-        font-weight: bold;
-        display: block;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-    }
-    
-    .overview-label {
-        font-size: 0.9rem;
-        opacity: 0.8;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Initialize session state
-if 'cells_data' not in st.session_state:
-    st.session_state.cells_data = {}
-if 'historical_data' not in st.session_state:
-    st.session_state.historical_data = []
-if 'is_monitoring' not in st.session_state:
-    st.session_state.is_monitoring = False
-
-# Cell type configurations with enhanced colors
-CELL_CONFIGS = {
-    "LFP": {
-        "nominal_voltage": 3.2,
-        "min_voltage": 2.8,
-        "max_voltage": 3.6,
-        "color": "#00ff88",
-        "gradient": "linear-gradient(135deg, #11998e 0%, #38ef7d 100%)"
-    },
-    "NMC": {
-        "nominal_voltage": 3.6,
-        "min_voltage": 3.2,
-        "max_voltage": 4.0,
-        "color": "#ff6b6b",
-        "gradient": "linear-gradient(135deg, #ff416c 0%, #ff4b2b 100%)"
-    },
-    "LTO": {
-        "nominal_voltage": 2.4,
-        "min_voltage": 1.5,
-        "max_voltage": 2.8,
-        "color": "#ffa726",
-        "gradient": "linear-gradient(135deg, #f093fb 0%, #f5576c 100%)"
-    },
-    "LiCoO2": {
-        "nominal_voltage": 3.7,
-        "min_voltage": 3.0,
-        "max_voltage": 4.2,
-        "color": "#ab47bc",
-        "gradient": "linear-gradient(135deg, #667eea 0%, #764ba2 100%)"
-    }
-}
+st.markdown(DASHBOARD_CSS, unsafe_allow_html=True)
 
-def get_battery_icon(health):
-    """Return battery icon based on health percentage"""
-    if health >= 90:
-        return "🔋"  # Full battery
-    elif health >= 75:
-        return "🔋"  # Good battery
-    elif health >= 50:
-        return "🪫"  # Medium battery
-    elif health >= 25:
-        return "🪫"  # Low battery
-    else:
-        return "🪫"  # Critical battery
+dispatcher = get_alert_dispatcher()
+engine = get_acquisition_engine()
+fleet = get_fleet_engine()
 
-def get_health_class(health):
-    """Return CSS class based on health percentage"""
-    if health >= 90:
-        return "health-excellent"
-    elif health >= 75:
-        return "health-good"
-    elif health >= 50:
-        return "health-warning"
-    else:
-        return "health-critical"
+# Largest simulated pack whose cell types can be picked one by one
+MAX_PER_CELL_TYPES = 16
 
-def get_status_class(status):
-    """Return CSS class based on status"""
-    if status == "Excellent":
-        return "status-excellent"
-    elif status == "Good":
-        return "status-good"
-    elif status == "Warning":
-        return "status-warning"
-    else:
-        return "status-critical"
+# Sidebar modes
+SINGLE_GROUP = "Single Group"
+FLEET = "Fleet"
 
-def generate_cell_data(cell_type, cell_id, current_time):
-    """Generate realistic battery cell data with enhanced status"""
-    config = CELL_CONFIGS[cell_type]
-    
-    # Simulate realistic voltage fluctuations
-    base_voltage = config["nominal_voltage"]
-    voltage_variation = random.uniform(-0.1, 0.1)
-    voltage = round(base_voltage + voltage_variation, 3)
-    
-    # Simulate current (positive for charging, negative for discharging)
-    current = round(random.uniform(-5.0, 5.0), 2)
-    
-    # Temperature simulation with some correlation to current
-    base_temp = 25
-    temp_variation = abs(current) * 0.5 + random.uniform(-2, 8)
-    temperature = round(base_temp + temp_variation, 1)
-    
-    # Calculate power and capacity
-    power = round(voltage * abs(current), 2)
-    capacity = round(random.uniform(2.8, 3.2), 2)  # Ah
-    
-    # Enhanced health calculation
-    voltage_health = 100 * (1 - abs(voltage - config["nominal_voltage"]) / config["nominal_voltage"])
-    temp_health = 100 * max(0, 1 - max(0, temperature - 35) / 20)
-    overall_health = round((voltage_health + temp_health) / 2, 1)
-    
-    # Enhanced status determination
-    if voltage < config["min_voltage"] or voltage > config["max_voltage"] or temperature > 45:
-        status = "Critical"
-    elif temperature > 40 or overall_health < 75:
-        status = "Warning"
-    elif overall_health >= 90:
-        status = "Excellent"
-    else:
-        status = "Good"
-    
-    return {
-        "cell_id": cell_id,
-        "cell_type": cell_type,
-        "voltage": voltage,
-        "current": current,
-        "temperature": temperature,
-        "power": power,
-        "capacity": capacity,
-        "health": overall_health,
-        "status": status,
-        "timestamp": current_time,
-        "min_voltage": config["min_voltage"],
-        "max_voltage": config["max_voltage"]
-    }
+# Initialize session state
+init_session_state()
 
 # Main Dashboard
 st.markdown('<h1 class="main-header">🔋 Battery Cell Monitoring Dashboard</h1>', unsafe_allow_html=True)
@@ -320,421 +53,300 @@ st.markdown('<h1 class="main-header">🔋 Battery Cell Monitoring Dashboard</h1>
 with st.sidebar:
     st.header("⚙️ Configuration")
     
-    # Bench and group information
-    bench_name = st.text_input("Bench Name", value="Bench-001", key="bench_name")
-    group_num = st.number_input("Group Number", min_value=1, max_value=100, value=1, key="group_num")
-    
-    st.divider()
-    
-    # Cell configuration
-    st.subheader("Cell Configuration")
-    num_cells = st.slider("Number of Cells", min_value=1, max_value=16, value=8)
+    # Monitor one bench group, or many (bench, group) partitions at once
+    mode = st.radio("Mode", [SINGLE_GROUP, FLEET], horizontal=True, key="mode")
     
-    cell_types = []
-    for i in range(num_cells):
-        cell_type = st.selectbox(
-            f"Cell {i+1} Type",
-            options=list(CELL_CONFIGS.keys()),
-            key=f"cell_type_{i}"
-        )
-        cell_types.append(cell_type)
+    history_capacity = st.number_input(
+        "History Capacity (ticks)", min_value=10, max_value=100000,
+        value=DEFAULT_CAPACITY, step=60, key="history_capacity"
+    )
+    gauge_tile_threshold = st.number_input(
+        "Heat Tiles Above (cells)", min_value=1, max_value=100000,
+        value=32, key="gauge_tile_threshold"
+    )
     
     st.divider()
     
-    # Control panel
-    st.subheader("🎛️ Control Panel")
-    
-    if st.button("Initialize Cells", type="primary"):
-        current_time = datetime.now()
-        st.session_state.cells_data = {}
-        for i, cell_type in enumerate(cell_types):
-            cell_id = f"Cell_{i+1}_{cell_type}"
-            st.session_state.cells_data[cell_id] = generate_cell_data(cell_type, cell_id, current_time)
-        st.success("Cells initialized successfully!")
-    
-    # Monitoring controls
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button("Start Monitoring"):
-            st.session_state.is_monitoring = True
-            st.success("Monitoring started!")
-    
-    with col2:
-        if st.button("Stop Monitoring"):
-            st.session_state.is_monitoring = False
-            st.info("Monitoring stopped!")
-    
-    # Auto-refresh
-    auto_refresh = st.checkbox("Auto Refresh (5s)", value=True)
-    
-    if auto_refresh and st.session_state.is_monitoring:
-        time.sleep(5)
-        st.rerun()
-
-# Main content area
-if st.session_state.cells_data:
-    
-    # Update data if monitoring
-    if st.session_state.is_monitoring:
-        current_time = datetime.now()
-        for cell_id in st.session_state.cells_data.keys():
-            cell_type = st.session_state.cells_data[cell_id]["cell_type"]
-            st.session_state.cells_data[cell_id] = generate_cell_data(cell_type, cell_id, current_time)
+    viewer = None
+    if mode == SINGLE_GROUP:
+        # Bench and group information
+        bench_name = st.text_input("Bench Name", value="Bench-001", key="bench_name")
+        group_num = st.number_input("Group Number", min_value=1, max_value=100, value=1, key="group_num")
         
-        # Store historical data
-        st.session_state.historical_data.append({
-            "timestamp": current_time,
-            "data": st.session_state.cells_data.copy()
-        })
+        # Data source selection
+        data_source = st.radio("Data Source", ["Simulator", "Replay Log", "Gateway", "Snapshot Bus"],
+                               horizontal=True, key="data_source")
         
-        # Keep only last 100 records
-        if len(st.session_state.historical_data) > 100:
-            st.session_state.historical_data = st.session_state.historical_data[-100:]
-    
-    # System overview with enhanced styling
-    st.header(f"📊 System Overview - {bench_name} (Group {group_num})")
-    
-    # Summary metrics with enhanced cards
-    total_cells = len(st.session_state.cells_data)
-    excellent_cells = sum(1 for cell in st.session_state.cells_data.values() if cell["status"] == "Excellent")
-    good_cells = sum(1 for cell in st.session_state.cells_data.values() if cell["status"] == "Good")
-    warning_cells = sum(1 for cell in st.session_state.cells_data.values() if cell["status"] == "Warning")
-    critical_cells = sum(1 for cell in st.session_state.cells_data.values() if cell["status"] == "Critical")
-    avg_health = np.mean([cell["health"] for cell in st.session_state.cells_data.values()])
-    total_power = sum([cell["power"] for cell in st.session_state.cells_data.values()])
-    
-    col1, col2, col3, col4, col5, col6, col7 = st.columns(7)
-    
-    with col1:
-        st.markdown(f"""
-        <div class="overview-card">
-            <span class="overview-number">{total_cells}</span>
-            <span class="overview-label">Total Cells</span>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div class="overview-card" style="background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);">
-            <span class="overview-number">{excellent_cells}</span>
-            <span class="overview-label">Excellent</span>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(f"""
-        <div class="overview-card" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);">
-            <span class="overview-number">{good_cells}</span>
-            <span class="overview-label">Good</span>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown(f"""
-        <div class="overview-card" style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);">
-            <span class="overview-number">{warning_cells}</span>
-            <span class="overview-label">Warning</span>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col5:
-        st.markdown(f"""
-        <div class="overview-card" style="background: linear-gradient(135deg, #ff416c 0%, #ff4b2b 100%);">
-            <span class="overview-number">{critical_cells}</span>
-            <span class="overview-label">Critical</span>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col6:
-        st.markdown(f"""
-        <div class="overview-card">
-            <span class="overview-number">{avg_health:.1f}%</span>
-            <span class="overview-label">Avg Health</span>
-        </div>
-        """, unsafe_allow_html=True)
+        cell_types = []
+        if data_source == "Simulator":
+            # Cell configuration
+            st.subheader("Cell Configuration")
+            num_cells = st.number_input("Number of Cells", min_value=1, max_value=100000, value=8, key="num_cells")
+            
+            # Small packs can pick each cell's type; larger ones are built from a type mix
+            type_mode = st.radio("Cell Types", ["Mix", "Per Cell"], horizontal=True, key="cell_type_mode",
+                                 disabled=num_cells > MAX_PER_CELL_TYPES)
+            if type_mode == "Per Cell" and num_cells <= MAX_PER_CELL_TYPES:
+                for i in range(num_cells):
+                    cell_type = st.selectbox(
+                        f"Cell {i+1} Type",
+                        options=list(CELL_CONFIGS.keys()),
+                        key=f"cell_type_{i}"
+                    )
+                    cell_types.append(cell_type)
+            else:
+                st.caption("Type ratio (equal weights interleave the types round robin)")
+                weights = {}
+                for column, cell_type in zip(st.columns(len(CELL_TYPES)), CELL_TYPES):
+                    with column:
+                        weights[cell_type] = st.number_input(cell_type, min_value=0, max_value=100, value=1,
+                                                             key=f"cell_weight_{cell_type}")
+                try:
+                    cell_types = mix_cell_types(int(num_cells), weights)
+                except ValueError as exc:
+                    st.error(str(exc))
+        elif data_source == "Gateway":
+            # Hardware ingestion: one link carrying every cell of the group
+            st.subheader("Gateway Configuration")
+            gateway_protocol = st.selectbox("Protocol", list(GATEWAY_PROTOCOLS), key="gateway_protocol")
+            gateway_simulated = st.checkbox("Use Local Protocol Simulator", value=True, key="gateway_simulated")
+            gateway_address = st.text_input(
+                f"Address ({GATEWAY_PROTOCOLS[gateway_protocol]})", key="gateway_address",
+                disabled=gateway_simulated
+            )
+            # Each protocol addresses a bounded number of cells on one link
+            max_link_cells = min(100000, GATEWAY_MAX_CELLS[gateway_protocol])
+            if st.session_state.get("gateway_cells", 0) > max_link_cells:
+                st.session_state.gateway_cells = max_link_cells
+            gateway_cells = st.number_input("Cells on Link", min_value=1, max_value=max_link_cells, value=64,
+                                            key="gateway_cells")
+            gateway_type = st.selectbox("Cell Type", CELL_TYPES, key="gateway_type")
+            if isinstance(engine.source, GatewaySource):
+                stats = engine.source.stats()
+                st.caption(
+                    f"{stats['frames_per_second']:,.0f} frames/s · {stats['bad_frames']} bad · "
+                    f"{stats['ticks_dropped']} ticks dropped · "
+                    + " · ".join(f"{name} {'up' if connected else 'down'}"
+                                 for name, connected, _ in stats["links"])
+                )
+                for name, connected, error in stats["links"]:
+                    if error and not connected:
+                        st.warning(f"{name}: {error}")
+        elif data_source == "Snapshot Bus":
+            # Render the ticks another dashboard or acquisition process publishes;
+            # that process keeps the history, dispatches alerts and persists
+            st.subheader("Snapshot Bus")
+            source_bus = st.text_input("Bus Name", value="battery-bus", key="source_bus")
+            if st.session_state.get("followed_bus"):
+                try:
+                    viewer = get_bus_viewer(st.session_state.followed_bus)
+                    version = viewer.version
+                    st.caption(f"Following {viewer.label} · "
+                               + ("bus closed" if version is None else f"version {version}"))
+                except (OSError, ValueError) as exc:
+                    st.error(f"Could not follow the snapshot bus: {exc}")
+        else:
+            # Replay configuration
+            st.subheader("Replay Configuration")
+            replay_path = st.text_input("Log File (CSV or Parquet)", key="replay_path")
+            replay_speed = st.select_slider(
+                "Playback Speed",
+                options=[0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 50.0, 100.0],
+                value=1.0,
+                key="replay_speed"
+            )
+            replay = engine.source if isinstance(engine.source, ReplaySource) else None
+            if replay is not None:
+                if replay.speed != replay_speed:
+                    with engine.lock:
+                        replay.set_speed(replay_speed)
+                if replay.start_time is not None:
+                    seek_offset = st.number_input("Seek Offset (s)", min_value=0.0, value=0.0, step=60.0)
+                    if st.button("Seek"):
+                        engine.seek(replay.start_time + timedelta(seconds=seek_offset))
+    else:
+        # Simulated fleet layout
+        st.subheader("Fleet Configuration")
+        fleet_benches = st.number_input("Benches", min_value=1, max_value=100, value=4, key="fleet_benches")
+        fleet_groups = st.number_input("Groups per Bench", min_value=1, max_value=50, value=4, key="fleet_groups")
+        fleet_cells = st.number_input("Cells per Group", min_value=1, max_value=4096, value=64, key="fleet_cells")
+        fleet_types = st.multiselect("Cell Types", CELL_TYPES, default=list(CELL_TYPES), key="fleet_types")
+        fleet_workers = st.number_input(
+            "Worker Processes", min_value=1, max_value=max(1, os.cpu_count() or 1),
+            value=max(1, os.cpu_count() or 1), key="fleet_workers"
+        )
     
-    with col7:
-        st.markdown(f"""
-        <div class="overview-card">
-            <span class="overview-number">{total_power:.1f}W</span>
-            <span class="overview-label">Total Power</span>
-        </div>
-        """, unsafe_allow_html=True)
+    # Persistence; bus viewers never persist, the publisher stores its own telemetry
+    follows_bus = mode == SINGLE_GROUP and data_source == "Snapshot Bus"
+    persist_telemetry = st.checkbox(
+        "Persist Telemetry", value=True, key="persist_telemetry", disabled=follows_bus,
+        help="The publisher of a followed bus persists its telemetry" if follows_bus else None
+    ) and not follows_bus
+    storage_directory = st.text_input(
+        "Storage Directory", value="telemetry_store",
+        key="storage_directory", disabled=not persist_telemetry
+    )
+    
+    if mode == SINGLE_GROUP:
+        # Share this engine's ticks with dashboards in other processes
+        publish_bus = st.checkbox("Publish Snapshot Bus", key="publish_bus", disabled=follows_bus,
+                                  help="Other processes can follow this group with the Snapshot Bus data source")
+        bus_name = st.text_input("Published Bus Name", value="battery-bus", key="bus_name",
+                                 disabled=not publish_bus)
+        try:
+            engine.set_bus(bus_name if publish_bus and not follows_bus else None)
+        except (OSError, ValueError) as exc:
+            st.error(f"Could not publish the snapshot bus: {exc}")
+    
+    with st.expander("🔔 Alert Sinks"):
+        alert_log = st.text_input("Log File (JSON lines)", value="alerts.log", key="alert_log")
+        webhook_url = st.text_input("Webhook URL", key="webhook_url")
+        if st.checkbox("Use Local Webhook Stub", key="webhook_stub"):
+            webhook_url = get_webhook_stub().url
+            st.caption(f"Posting to {webhook_url} ({len(get_webhook_stub().received)} alerts received)")
+    dispatcher.configure_sinks(alert_log, webhook_url)
     
-    # Tabs for different views
-    tab1, tab2, tab3, tab4 = st.tabs(["📈 Real-time Data", "🔋 Enhanced Health", "🔥 Temperature Monitor", "⚡ Historical Trends"])
+    st.divider()
     
-    with tab1:
-        st.subheader("Real-time Cell Data")
-        
-        # Create DataFrame for display
-        df = pd.DataFrame(st.session_state.cells_data.values())
-        
-        # Display data table with colored status
-        df_display = df[["cell_id", "cell_type", "voltage", "current", "temperature", "power", "capacity", "health", "status"]].copy()
-        st.dataframe(df_display, use_container_width=True)
-        
-        # Enhanced voltage comparison chart with better colors
-        fig_voltage = px.bar(
-            df, 
-            x="cell_id", 
-            y="voltage", 
-            color="cell_type",
-            title="🔋 Cell Voltage Comparison",
-            color_discrete_map={cell_type: config["color"] for cell_type, config in CELL_CONFIGS.items()}
-        )
-        fig_voltage.update_traces(marker_line_width=2, marker_line_color='white')
-        fig_voltage.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font_color='#333',
-            title_font_size=20
-        )
-        st.plotly_chart(fig_voltage, use_container_width=True)
+    # Control panel
+    st.subheader("🎛️ Control Panel")
     
-    with tab2:
-        st.subheader("🔋 Enhanced Battery Health Indicators")
-        
-        # Enhanced health cards with animations and better visuals
-        cols = st.columns(4)
-        for i, (cell_id, cell_data) in enumerate(st.session_state.cells_data.items()):
-            with cols[i % 4]:
-                health_class = get_health_class(cell_data["health"])
-                battery_icon = get_battery_icon(cell_data["health"])
-                status_class = get_status_class(cell_data["status"])
-                
-                st.markdown(f"""
-                <div class="health-card {health_class}">
-                    <div class="battery-icon">{battery_icon}</div>
-                    <div class="cell-name">{cell_id}</div>
-                    <div class="health-percentage">{cell_data["health"]:.1f}%</div>
-                    <div class="{status_class}" style="margin-top: 10px; font-size: 1.1rem;">
-                        {cell_data["status"]}
-                    </div>
-                    <div style="margin-top: 8px; font-size: 0.9rem; opacity: 0.8;">
-                        {cell_data["cell_type"]} • {cell_data["voltage"]}V
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-        
-        # Enhanced circular health indicators
-        st.subheader("🎯 Health Overview Gauges")
-        gauge_cols = st.columns(4)
-        
-        for i, (cell_id, cell_data) in enumerate(st.session_state.cells_data.items()):
-            with gauge_cols[i % 4]:
-                # Create enhanced gauge with better colors
-                health_value = cell_data["health"]
-                
-                # Determine colors based on health
-                if health_value >= 90:
-                    gauge_color = "#00ff88"
-                    bar_color = "#11998e"
-                elif health_value >= 75:
-                    gauge_color = "#667eea"
-                    bar_color = "#764ba2"
-                elif health_value >= 50:
-                    gauge_color = "#f093fb"
-                    bar_color = "#f5576c"
-                else:
-                    gauge_color = "#ff416c"
-                    bar_color = "#ff4b2b"
-                
-                fig_gauge = go.Figure(go.Indicator(
-                    mode = "gauge+number+delta",
-                    value = health_value,
-                    domain = {'x': [0, 1], 'y': [0, 1]},
-                    title = {'text': f"🔋 {cell_id}", 'font': {'size': 14, 'color': '#333'}},
-                    delta = {'reference': 100, 'increasing': {'color': gauge_color}},
-                    gauge = {
-                        'axis': {'range': [None, 100], 'tickcolor': '#666'},
-                        'bar': {'color': bar_color, 'thickness': 0.8},
-                        'bgcolor': "rgba(255,255,255,0.1)",
-                        'borderwidth': 3,
-                        'bordercolor': gauge_color,
-                        'steps': [
-                            {'range': [0, 25], 'color': "rgba(255, 65, 108, 0.2)"},
-                            {'range': [25, 50], 'color': "rgba(240, 147, 251, 0.2)"},
-                            {'range': [50, 75], 'color': "rgba(102, 126, 234, 0.2)"},
-                            {'range': [75, 90], 'color': "rgba(17, 153, 142, 0.2)"},
-                            {'range': [90, 100], 'color': "rgba(0, 255, 136, 0.3)"}
-                        ],
-                        'threshold': {
-                            'line': {'color': gauge_color, 'width': 4},
-                            'thickness': 0.75,
-                            'value': 90
-                        }
-                    }
-                ))
-                
-                fig_gauge.update_layout(
-                    height=280,
-                    font={'color': "#333", 'size': 12},
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    plot_bgcolor='rgba(0,0,0,0)'
+    if mode == FLEET:
+        controller = fleet
+        if st.button("Initialize Fleet", type="primary"):
+            try:
+                specs = simulator_specs(
+                    [f"Bench-{i+1:03d}" for i in range(int(fleet_benches))],
+                    range(1, int(fleet_groups) + 1), int(fleet_cells), fleet_types or CELL_TYPES
                 )
-                st.plotly_chart(fig_gauge, use_container_width=True)
-        
-        # Enhanced health distribution with better colors
-        fig_health = px.histogram(
-            df, 
-            x="health", 
-            nbins=15, 
-            title="🎯 Health Distribution Analysis",
-            color="status",
-            color_discrete_map={
-                "Excellent": "#00ff88", 
-                "Good": "#667eea", 
-                "Warning": "#f093fb", 
-                "Critical": "#ff416c"
-            }
-        )
-        fig_health.update_traces(marker_line_width=2, marker_line_color='white')
-        fig_health.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font_color='#333',
-            title_font_size=18
+                fleet.configure(
+                    specs, workers=int(fleet_workers), capacity=int(history_capacity),
+                    store_root=storage_directory if persist_telemetry else None
+                )
+                st.success(f"Fleet initialized: {len(specs)} groups, "
+                           f"{fleet.history_nbytes / 2**20:.0f} MB of history buffers")
+            except (OSError, ValueError) as exc:
+                st.error(f"Could not initialize fleet: {exc}")
+    elif follows_bus:
+        controller = viewer
+        if st.button("Follow Bus", type="primary"):
+            try:
+                viewer = controller = get_bus_viewer(source_bus)
+                st.session_state.followed_bus = source_bus
+                st.success(f"Following bus {source_bus}")
+            except (OSError, ValueError) as exc:
+                st.error(f"Could not follow the snapshot bus: {exc}")
+    else:
+        controller = engine
+        if st.button("Initialize Cells", type="primary"):
+            try:
+                if data_source == "Simulator":
+                    if not cell_types:
+                        raise ValueError("the type mix gives no cells")
+                    cell_ids = [f"Cell_{i+1}_{cell_type}" for i, cell_type in enumerate(cell_types)]
+                    source = SimulatorSource(cell_ids, cell_types)
+                elif data_source == "Gateway":
+                    cell_types = [gateway_type] * int(gateway_cells)
+                    cell_ids = [f"Cell_{i+1}_{cell_type}" for i, cell_type in enumerate(cell_types)]
+                    address = gateway_address
+                    if gateway_simulated:
+                        simulator = get_protocol_simulator()
+                        simulator.set_pack(cell_types)
+                        address = simulator_address(simulator, gateway_protocol)
+                    interval = st.session_state.get("sampling_interval", 1.0)
+                    source = GatewaySource(cell_ids, cell_types,
+                                           [open_transport(gateway_protocol, address, len(cell_ids))],
+                                           publish_interval=interval)
+                    # Wait for the first published tick so the views have a snapshot
+                    source.wait_for_tick(2 * interval + 3)
+                else:
+                    source = ReplaySource(replay_path, speed=replay_speed)
+                store = None
+                if persist_telemetry:
+                    from battery_health.storage import TelemetryStore
+                    store = TelemetryStore(storage_directory, bench_name, group_num, source.cell_ids, source.cell_types)
+                engine.configure(source, capacity=int(history_capacity), store=store,
+                                 label=f"{bench_name} / Group {group_num}")
+                st.success("Cells initialized successfully!")
+            except (OSError, ValueError) as exc:
+                st.error(f"Could not initialize cells: {exc}")
+    
+    # Sampling runs on the shared background engine, independent of page reruns;
+    # bus viewers follow the publisher's sampling
+    if not follows_bus:
+        sampling_interval = st.select_slider(
+            "Sampling Interval (s)",
+            options=[0.01, 0.05, 0.1, 0.5, 1.0, 5.0],
+            value=1.0,
+            key="sampling_interval"
         )
-        st.plotly_chart(fig_health, use_container_width=True)
-    
-    with tab3:
-        st.subheader("🔥 Temperature Monitoring")
+        controller.set_interval(sampling_interval)
         
-        # Enhanced temperature heatmap
-        temp_data = df.pivot_table(values='temperature', index='cell_type', columns='cell_id', fill_value=0)
-        fig_temp = px.imshow(
-            temp_data, 
-            title="🌡️ Temperature Heatmap",
-            color_continuous_scale="plasma",
-            aspect="auto"
-        )
-        fig_temp.update_layout(
-            title_font_size=18,
-            font_color='#333'
-        )
-        st.plotly_chart(fig_temp, use_container_width=True)
+        # Monitoring controls
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Start Monitoring"):
+                controller.start()
+                st.success("Monitoring started!")
         
-        # Enhanced temperature vs power scatter with better styling
-        fig_scatter = px.scatter(
-            df, 
-            x="temperature", 
-            y="power", 
-            color="cell_type",
-            size="health",
-            title="🔥 Temperature vs Power Analysis",
-            hover_data=["cell_id", "voltage", "current"],
-            color_discrete_map={cell_type: config["color"] for cell_type, config in CELL_CONFIGS.items()}
-        )
-        fig_scatter.update_traces(marker_line_width=2, marker_line_color='white')
-        fig_scatter.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font_color='#333',
-            title_font_size=18
+        with col2:
+            if st.button("Stop Monitoring"):
+                controller.stop()
+                st.info("Monitoring stopped!")
+    
+    # Auto-refresh reruns each live view as a fragment on its own interval, so the
+    # sidebar, styles and hidden tabs are not rebuilt on every tick
+    auto_refresh = st.checkbox("Auto Refresh", value=True)
+    with st.expander("⏱️ Refresh Intervals (s)"):
+        refresh_options = [0.5, 1.0, 2.0, 5.0, 10.0, 30.0]
+        refresh_intervals = {
+            "overview": st.select_slider("Overview", refresh_options, value=2.0, key="refresh_overview"),
+            "realtime": st.select_slider("Real-time Data", refresh_options, value=2.0, key="refresh_realtime"),
+            "health": st.select_slider("Enhanced Health", refresh_options, value=5.0, key="refresh_health"),
+            "temperature": st.select_slider("Temperature Monitor", refresh_options, value=5.0, key="refresh_temperature"),
+            "trends": st.select_slider("Historical Trends", refresh_options, value=5.0, key="refresh_trends")
+        }
+    
+    # Opt-in instrumentation; the profiler is shared by every session and engine
+    with st.expander("🩺 Diagnostics"):
+        st.checkbox(
+            "Enable Profiling", value=profiler.enabled, key="profiling",
+            on_change=lambda: setattr(profiler, "enabled", st.session_state.profiling),
+            help="Times engine phases, tab renders and chart payloads for every session"
         )
-        st.plotly_chart(fig_scatter, use_container_width=True)
-    
-    with tab4:
-        st.subheader("⚡ Historical Trends")
-        
-        if len(st.session_state.historical_data) > 1:
-            # Prepare historical data
-            hist_df = []
-            for record in st.session_state.historical_data[-50:]:  # Last 50 records
-                for cell_id, cell_data in record["data"].items():
-                    hist_df.append({
-                        "timestamp": record["timestamp"],
-                        "cell_id": cell_id,
-                        "voltage": cell_data["voltage"],
-                        "current": cell_data["current"],
-                        "temperature": cell_data["temperature"],
-                        "health": cell_data["health"]
-                    })
-            
-            hist_df = pd.DataFrame(hist_df)
-            
-            # Enhanced multi-line charts with better colors
-            fig_trends = make_subplots(
-                rows=2, cols=2,
-                subplot_titles=("⚡ Voltage Trends", "🔄 Current Trends", "🌡️ Temperature Trends", "💚 Health Trends"),
-                vertical_spacing=0.08
-            )
-            
-            # Color palette for different cells
-            colors = ['#00ff88', '#ff416c', '#f093fb', '#667eea', '#ffa726', '#ab47bc', '#26c6da', '#66bb6a']
-            
-            # Voltage trends
-            for i, cell_id in enumerate(hist_df["cell_id"].unique()):
-                cell_hist = hist_df[hist_df["cell_id"] == cell_id]
-                fig_trends.add_trace(
-                    go.Scatter(
-                        x=cell_hist["timestamp"], 
-                        y=cell_hist["voltage"], 
-                        name=f"{cell_id}_V", 
-                        line=dict(width=3, color=colors[i % len(colors)])
-                    ),
-                    row=1, col=1
-                )
-            
-            # Current trends
-            for i, cell_id in enumerate(hist_df["cell_id"].unique()):
-                cell_hist = hist_df[hist_df["cell_id"] == cell_id]
-                fig_trends.add_trace(
-                    go.Scatter(
-                        x=cell_hist["timestamp"], 
-                        y=cell_hist["current"], 
-                        name=f"{cell_id}_I", 
-                        showlegend=False,
-                        line=dict(width=3, color=colors[i % len(colors)])
-                    ),
-                    row=1, col=2
-                )
-            
-            # Temperature trends
-            for i, cell_id in enumerate(hist_df["cell_id"].unique()):
-                cell_hist = hist_df[hist_df["cell_id"] == cell_id]
-                fig_trends.add_trace(
-                    go.Scatter(
-                        x=cell_hist["timestamp"], 
-                        y=cell_hist["temperature"], 
-                        name=f"{cell_id}_T", 
-                        showlegend=False,
-                        line=dict(width=3, color=colors[i % len(colors)])
-                    ),
-                    row=2, col=1
-                )
-            
-            # Health trends
-            for i, cell_id in enumerate(hist_df["cell_id"].unique()):
-                cell_hist = hist_df[hist_df["cell_id"] == cell_id]
-                fig_trends.add_trace(
-                    go.Scatter(
-                        x=cell_hist["timestamp"], 
-                        y=cell_hist["health"], 
-                        name=f"{cell_id}_H", 
-                        showlegend=False,
-                        line=dict(width=3, color=colors[i % len(colors)])
-                    ),
-                    row=2, col=2
-                )
-            
-            fig_trends.update_layout(
-                height=600, 
-                title_text="📈 Historical Data Trends",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font_color='#333'
-            )
-            fig_trends.update_xaxes(title_text="Time")
-            fig_trends.update_yaxes(title_text="Voltage (V)", row=1, col=1)
-            fig_trends.update_yaxes(title_text="Current (A)", row=1, col=2)
-            fig_trends.update_yaxes(title_text="Temperature (°C)", row=2, col=1)
-            fig_trends.update_yaxes(title_text="Health (%)", row=2, col=2)
-            
-            st.plotly_chart(fig_trends, use_container_width=True)
-        else:
-            st.info("Start monitoring to see historical trends...")
+        if profiler.enabled:
+            st.fragment(render_diagnostics, run_every=2.0)()
+            if st.button("Reset Timings"):
+                profiler.reset()
+        if st.checkbox("Serve Prometheus Metrics", key="serve_metrics"):
+            metrics_port = st.number_input("Metrics Port", min_value=1024, max_value=65535,
+                                           value=9464, key="metrics_port")
+            try:
+                st.caption(f"Scrape {get_metrics_server(int(metrics_port)).url}")
+            except OSError as exc:
+                st.error(f"Could not serve metrics on port {metrics_port}: {exc}")
+
+# Views only refresh on a timer while the engine is sampling
+live = auto_refresh and controller is not None and controller.is_running
+run_every = {view: interval if live else None for view, interval in refresh_intervals.items()}
+
+# Main content area
+if mode == FLEET and fleet.partitions:
+    st.fragment(render_fleet_overview, run_every=run_every["overview"])(fleet)
+    
+    # Drill down into any partition with the per-group views
+    partition_labels = {f"{bench} / Group {group}": (bench, group) for bench, group in fleet.partitions}
+    drill_down = partition_labels[st.selectbox("🔎 Drill Down", list(partition_labels), key="fleet_drill_down")]
+    partition = fleet.focus(drill_down)
+    if partition.stale:
+        st.warning(f"{partition.label} lost its fleet worker; its views show the last sample.")
+    render_group_views(partition, *drill_down, run_every, gauge_tile_threshold)
+
+elif follows_bus and viewer is not None and viewer.snapshot() is not None:
+    render_group_views(viewer, bench_name, group_num, run_every, gauge_tile_threshold)
+
+elif mode == SINGLE_GROUP and not follows_bus and engine.snapshot() is not None:
+    render_group_views(engine, bench_name, group_num, run_every, gauge_tile_threshold)
 
 else:
     st.info("👈 Please configure and initialize cells using the sidebar to begin monitoring.")
@@ -753,4 +365,7 @@ st.markdown(
     </div>
     """, 
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+if profiler.enabled:
+    profiler.record("rerun", time.perf_counter() - rerun_started)
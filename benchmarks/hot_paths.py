@@ -0,0 +1,242 @@
+"""Benchmarks for the telemetry, aggregation, history and chart hot paths.
+
+Per-tick paths run at every --cells size; history paths run at every
+(--cells, --ticks) pair whose history buffer fits in --history-budget-mb,
+and the others are reported as skipped. Run from the repository root:
+
+    python benchmarks/hot_paths.py [--cells 16 256 4096] [--ticks 100 10000 1000000]
+                                   [--output results.json] [--compare baseline.json]
+
+Results are JSON: one record per benchmark and size with seconds per call
+(median and min), the number of calls timed and, for figures, the
+serialized size. --compare matches records against an earlier run and
+exits with status 1 if any is slower than --threshold times the baseline.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from battery_health.acquisition import AcquisitionEngine, Snapshot  # noqa: E402
+from battery_health.dashboard import charts, gauges, rack_heatmap, trend_charts  # noqa: E402
+from battery_health.rack import RackLayout  # noqa: E402
+from battery_health.selection import CellIndex, select_cells  # noqa: E402
+from battery_health.sources import SimulatorSource  # noqa: E402
+from battery_health.summary import summarize  # noqa: E402
+from battery_health.telemetry import (  # noqa: E402
+    CELL_TYPES, METRICS, encode_cell_types, generate_batch, generate_cell_data
+)
+from battery_health.trends import DecimatedTrends, TrendWindow  # noqa: E402
+
+# Gauge grids are only drawn for small packs (heat tiles above the sidebar threshold)
+MAX_GAUGE_CELLS = 256
+
+# Trend figures with more points than this are reported as skipped
+MAX_TREND_FIGURE_POINTS = 2_000_000
+
+# Distinct simulated ticks cycled through when filling long histories
+BATCH_POOL = 64
+
+
+def timed(function, min_seconds=0.2, max_runs=50):
+    """Call function repeatedly for about min_seconds; return per-call timing stats"""
+    samples = []
+    deadline = time.perf_counter() + min_seconds
+    while not samples or (len(samples) < max_runs and time.perf_counter() < deadline):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return {"median_s": statistics.median(samples), "min_s": min(samples), "runs": len(samples)}
+
+
+def pack(cells):
+    cell_types = [CELL_TYPES[i % len(CELL_TYPES)] for i in range(cells)]
+    cell_ids = [f"Cell_{i+1}_{cell_type}" for i, cell_type in enumerate(cell_types)]
+    return cell_ids, cell_types
+
+
+def bench_figure(results, name, build, **params):
+    figure = build()
+    results.append({"name": f"figure_build/{name}", **params, **timed(build)})
+    serialized = figure.to_json()
+    results.append({"name": f"figure_json/{name}", **params, **timed(figure.to_json),
+                    "bytes": len(serialized)})
+
+
+def bench_tick(results, cells):
+    """Generation, aggregation and per-tab figures for one tick of a pack"""
+    cell_ids, cell_types = pack(cells)
+    type_codes = encode_cell_types(cell_types)
+    now = datetime.now()
+    params = {"cells": cells}
+
+    results.append({"name": "generate_cell_data", **params, **timed(
+        lambda: [generate_cell_data(cell_type, cell_id, now) for cell_id, cell_type in zip(cell_ids, cell_types)]
+    )})
+    results.append({"name": "generate_batch", **params, **timed(lambda: generate_batch(type_codes))})
+    batch = generate_batch(type_codes)
+    results.append({"name": "overview_summary", **params, **timed(lambda: summarize(batch, type_codes))})
+    results.append({"name": "snapshot_frame", **params, **timed(
+        lambda: Snapshot(0, now, cell_ids, cell_types, type_codes, batch).frame
+    )})
+    frame = Snapshot(0, now, cell_ids, cell_types, type_codes, batch).frame
+    results.append({"name": "cell_index", **params, **timed(
+        lambda: CellIndex(type_codes, batch["status"], batch["health"])
+    )})
+    index = CellIndex(type_codes, batch["status"], batch["health"])
+    results.append({"name": "select_cells_worst", **params, **timed(
+        lambda: select_cells(batch["health"], batch["status"], type_codes, cell_types=["LFP"], order="worst", limit=20)
+    )})
+    results.append({"name": "cell_index_worst", **params, **timed(
+        lambda: index.select(cell_types=["LFP"], order="worst", limit=20)
+    )})
+    results.append({"name": "heatmap_pivot", **params, **timed(
+        lambda: frame.pivot_table(values='temperature', index='cell_type', columns='cell_id', fill_value=0)
+    )})
+    layout = RackLayout(cells, series=16)
+    results.append({"name": "rack_fill", **params, **timed(lambda: layout.fill(batch["temperature"]))})
+    results.append({"name": "rack_module_max", **params, **timed(
+        lambda: layout.aggregate(batch["temperature"], "max")
+    )})
+
+    bench_figure(results, "realtime_voltage", lambda: charts.build_voltage_chart(frame), **params)
+    if cells <= MAX_GAUGE_CELLS:
+        bench_figure(results, "health_gauges", lambda: gauges.build_gauge_grid(cell_ids, batch["health"]),
+                     **params)
+    bench_figure(results, "health_tiles", lambda: gauges.build_health_tiles(cell_ids, batch["health"]), **params)
+    bench_figure(results, "health_histogram", lambda: charts.build_health_histogram(frame), **params)
+    bench_figure(results, "temperature_heatmap", lambda: charts.build_temperature_heatmap(frame), **params)
+    bench_figure(results, "rack_heatmap", lambda: rack_heatmap.build_rack_heatmap(
+        layout.fill(batch["temperature"]).copy(), layout.cell_labels(cell_ids), "Rack", (layout.series, 1)
+    ), **params)
+    bench_figure(results, "temperature_scatter", lambda: charts.build_temperature_scatter(frame), **params)
+
+
+def history_nbytes(cells, ticks):
+    # Double-written float32 metrics and int8 status, plus timestamps
+    return 2 * ticks * (cells * (4 * len(METRICS) + 1) + 8)
+
+
+def bench_history(results, cells, ticks, budget_bytes):
+    """History append, trend windows and the trends figure over a filled history"""
+    params = {"cells": cells, "ticks": ticks}
+    needed = history_nbytes(cells, ticks)
+    if needed > budget_bytes:
+        results.append({"name": "history", **params,
+                        "skipped": f"needs {needed / 2**20:.0f} MB of history, over the budget"})
+        return
+
+    cell_ids, cell_types = pack(cells)
+    engine = AcquisitionEngine(capacity=ticks, history_dtype=np.float32)
+    engine.configure(SimulatorSource(cell_ids, cell_types))
+    history = engine.history
+    batches = [generate_batch(engine.source.type_codes) for _ in range(BATCH_POOL)]
+    start = np.datetime64("2026-01-01T00:00:00", "us")
+    second = np.timedelta64(1, "s")
+
+    began = time.perf_counter()
+    for tick in range(ticks):
+        history.append(start + tick * second, batches[tick % BATCH_POOL])
+    per_tick = (time.perf_counter() - began) / ticks
+    results.append({"name": "history_append", **params, "median_s": per_tick, "min_s": per_tick, "runs": ticks})
+
+    results.append({"name": "trend_window_update", **params, **timed(lambda: TrendWindow(size=50).update(engine))})
+    results.append({"name": "decimated_trends_cold", **params, **timed(
+        lambda: DecimatedTrends("Last 24 h").update(engine)
+    )})
+    trends = DecimatedTrends("Last 24 h")
+    trends.update(engine)
+    next_tick = [ticks]
+
+    def append_and_update():
+        history.append(start + next_tick[0] * second, batches[next_tick[0] % BATCH_POOL])
+        next_tick[0] += 1
+        trends.update(engine)
+
+    results.append({"name": "decimated_trends_warm", **params, **timed(append_and_update)})
+
+    points = len(trends) * cells * len(trend_charts.TREND_SUBPLOTS)
+    if points > MAX_TREND_FIGURE_POINTS:
+        results.append({"name": "figure_build/trends", **params,
+                        "skipped": f"{points:,} points, over {MAX_TREND_FIGURE_POINTS:,}"})
+    else:
+        bench_figure(results, "trends", lambda: trend_charts.build_trends_figure(trends), **params)
+
+
+def _key(record):
+    return record["name"], record.get("cells"), record.get("ticks")
+
+
+def compare(results, baseline, threshold):
+    """Print the ratio to the baseline of every timed record; return the regressions"""
+    previous = {_key(record): record for record in baseline["results"] if "median_s" in record}
+    regressions = []
+    for record in results:
+        before = previous.get(_key(record))
+        if before is None or "median_s" not in record or not before["median_s"]:
+            continue
+        ratio = record["median_s"] / before["median_s"]
+        flag = ""
+        if ratio > threshold:
+            regressions.append(record)
+            flag = "  REGRESSION"
+        print(f"{record['name']:32} cells={record.get('cells')!s:>5} ticks={record.get('ticks')!s:>8} "
+              f"{ratio:6.2f}x{flag}", file=sys.stderr)
+    return regressions
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cells", type=int, nargs="+", default=[16, 256, 4096])
+    parser.add_argument("--ticks", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    parser.add_argument("--history-budget-mb", type=float, default=2560)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path, help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    results = []
+    for cells in args.cells:
+        print(f"tick paths: {cells} cells", file=sys.stderr)
+        bench_tick(results, cells)
+        for ticks in args.ticks:
+            print(f"history paths: {cells} cells x {ticks} ticks", file=sys.stderr)
+            bench_history(results, cells, ticks, args.history_budget_mb * 2**20)
+
+    report = {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+    if args.compare and compare(results, json.loads(args.compare.read_text()), args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Cold-start benchmark: import time and first paint of a fresh dashboard worker.
+
+Every measurement runs in a new interpreter so nothing is shared through
+sys.modules. Run from the repository root:
+
+    python benchmarks/import_time.py [--runs 5] [--output results.json]
+
+Results are printed (and optionally written) as JSON.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DASHBOARD = ROOT / "battery_health_dashboard.py"
+
+# Modules whose presence after first paint shows what was loaded eagerly
+HEAVY_MODULES = ("plotly.express", "plotly.graph_objects", "plotly.subplots", "pyarrow.parquet")
+
+_CORE = """
+import time
+start = time.perf_counter()
+import battery_health.analysis
+print(time.perf_counter() - start)
+"""
+
+_FIRST_PAINT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+app = AppTest.from_file({dashboard!r}, default_timeout=120)
+app.run()
+painted = time.perf_counter()
+assert not app.exception, [e.value for e in app.exception]
+print(json.dumps({{
+    "streamlit_import_s": imported - start,
+    "first_paint_s": painted - imported,
+    "total_s": painted - start,
+    "modules_loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def _run(code):
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return output.strip().splitlines()[-1]
+
+
+def _stats(samples):
+    return {"median_s": statistics.median(samples), "min_s": min(samples), "runs": len(samples)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    core = [float(_run(_CORE)) for _ in range(args.runs)]
+    paints = [json.loads(_run(_FIRST_PAINT.format(dashboard=str(DASHBOARD), heavy=HEAVY_MODULES)))
+              for _ in range(args.runs)]
+    results = {
+        "python": platform.python_version(),
+        "benchmarks": [
+            {"name": "core_import", **_stats(core)},
+            *({"name": f"dashboard_{key}", **_stats([paint[key] for paint in paints])}
+              for key in ("streamlit_import_s", "first_paint_s", "total_s")),
+        ],
+        "modules_loaded_at_first_paint": paints[-1]["modules_loaded"],
+    }
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Ingestion gateway throughput against the local protocol simulator.
+
+Each protocol is offered --rates frames per second for --seconds, and the
+frames the gateway actually parsed and published are counted. Modbus-TCP is
+polled as fast as the simulator answers, so its rate is the achieved cell
+readings per second. Run from the repository root:
+
+    python benchmarks/ingest_throughput.py [--cells 1024] [--rates 1000 10000 50000]
+
+Results are printed (and optionally written) as JSON.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from battery_health.gateway import (  # noqa: E402
+    CanTransport, GatewaySource, ModbusTransport, ProtocolSimulator, SerialTransport
+)
+from battery_health.telemetry import CELL_TYPES  # noqa: E402
+
+
+def measure(simulator, transport, cells, seconds):
+    cell_types = [CELL_TYPES[i % len(CELL_TYPES)] for i in range(cells)]
+    source = GatewaySource([f"Cell_{i+1}" for i in range(cells)], cell_types, [transport], publish_interval=0.5)
+    try:
+        source.wait_for_tick(5)
+        before, started = transport.frames, time.monotonic()
+        time.sleep(seconds)
+        frames, elapsed = transport.frames - before, time.monotonic() - started
+        ticks = len(source.poll())
+        return {"frames_per_s": frames / elapsed, "bad_frames": transport.bad_frames,
+                "ticks": ticks, "ticks_dropped": source.ticks_dropped}
+    finally:
+        source.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cells", type=int, default=1024)
+    parser.add_argument("--rates", type=int, nargs="+", default=[1000, 10_000, 50_000])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    cell_types = [CELL_TYPES[i % len(CELL_TYPES)] for i in range(args.cells)]
+    results = []
+    for rate in args.rates:
+        simulator = ProtocolSimulator(cell_types, interval=0.5, frame_rate=rate)
+        try:
+            for name, transport in (("can", CanTransport(simulator.can_channel, cells=args.cells)),
+                                    ("serial", SerialTransport(simulator.serial_path, cells=args.cells))):
+                print(f"{name}: {rate} frames/s offered", file=sys.stderr)
+                results.append({"name": name, "cells": args.cells, "offered_per_s": rate,
+                                **measure(simulator, transport, args.cells, args.seconds)})
+        finally:
+            simulator.close()
+
+    simulator = ProtocolSimulator(cell_types, interval=0.5)
+    try:
+        print("modbus: polling continuously", file=sys.stderr)
+        transport = ModbusTransport(simulator.host, simulator.modbus_port, cells=args.cells, poll_interval=0)
+        results.append({"name": "modbus", "cells": args.cells,
+                        **measure(simulator, transport, args.cells, args.seconds)})
+    finally:
+        simulator.close()
+
+    text = json.dumps({"python": platform.python_version(), "results": results}, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text)
+
+
+if __name__ == "__main__":
+    main()
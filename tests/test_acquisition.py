@@ -0,0 +1,92 @@
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from battery_health.acquisition import AcquisitionEngine
+from battery_health.sources import DataSource, SimulatorSource
+from battery_health.telemetry import METRICS, encode_cell_types
+
+T0 = datetime(2024, 1, 1)
+CELLS = ["a", "b"]
+TYPES = ["NMC", "LFP"]
+
+
+class CountingSource(DataSource):
+    """One tick per poll encoding the poll number; the polls listed in failing raise"""
+
+    name = "Counting"
+
+    def __init__(self, failing=()):
+        self.cell_ids = CELLS
+        self.cell_types = TYPES
+        self.type_codes = encode_cell_types(TYPES)
+        self.failing = failing
+        self.polls = 0
+        self.polled = threading.Event()
+
+    def poll(self):
+        self.polls += 1
+        if self.polls >= 6:
+            self.polled.set()
+        if self.polls in self.failing:
+            raise ValueError("bad chunk")
+        batch = {metric: np.full(len(CELLS), float(self.polls)) for metric in METRICS}
+        batch["health"] = np.full(len(CELLS), 90.0)
+        batch["status"] = np.zeros(len(CELLS), dtype=np.int8)
+        return [(T0 + timedelta(seconds=self.polls), batch)]
+
+
+def test_samples_are_recorded_and_published():
+    engine = AcquisitionEngine(interval=1.0, capacity=10)
+    engine.configure(CountingSource())
+    # The first tick of a non-simulated source is recorded
+    assert engine.snapshot().version == 1 and len(engine.history) == 1
+    for _ in range(3):
+        snapshot = engine.sample()
+    assert snapshot is engine.snapshot() and snapshot.version == 4
+    assert snapshot.timestamp == T0 + timedelta(seconds=4) and snapshot.cell_ids == CELLS
+    np.testing.assert_array_equal(engine.history.metric("voltage")[:, 0], [1, 2, 3, 4])
+    assert engine.snapshot().summary.total_cells == 2
+    assert engine.snapshot().alert_levels is not None and engine.soh.latest is not None
+
+
+def test_simulated_preview_tick_is_not_recorded():
+    engine = AcquisitionEngine(capacity=10)
+    engine.configure(SimulatorSource(CELLS, TYPES, rng=np.random.default_rng(0)))
+    assert engine.snapshot().version == 1 and len(engine.history) == 0
+    engine.sample(record=False)
+    assert engine.snapshot().version == 2 and len(engine.history) == 0
+
+
+def test_sampling_thread_survives_a_failing_tick():
+    engine = AcquisitionEngine(interval=0.01, capacity=50)
+    source = CountingSource(failing={3, 4})
+    engine.configure(source)
+    engine.start()
+    try:
+        assert source.polled.wait(5)
+        assert engine.is_running
+    finally:
+        engine.stop()
+    # Polls 3 and 4 raised; every other poll was recorded and the error cleared
+    timestamps = engine.history.window()[0]
+    assert 3 not in (timestamps - np.datetime64(T0, "us")) // np.timedelta64(1, "s")
+    assert len(engine.history) == source.polls - 2 and engine.last_error is None
+
+
+def test_last_error_reports_a_failure_until_a_tick_succeeds(caplog):
+    engine = AcquisitionEngine(interval=0.01)
+    source = CountingSource(failing=range(2, 10**6))
+    engine.configure(source)
+    engine.start()
+    try:
+        assert source.polled.wait(5)
+        assert engine.is_running and engine.last_error == "ValueError: bad chunk"
+    finally:
+        engine.stop()
+    # The same failure on every tick is logged once
+    assert len([record for record in caplog.records if record.name == "battery_health.acquisition"]) == 1
+    assert engine.snapshot().version == 1
+    engine.configure(CountingSource())
+    assert engine.last_error is None
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from battery_health.alerts import AlertTracker
+
+T0 = datetime(2024, 1, 1)
+
+# Status codes: 0 Excellent, 1 Good, 2 Warning, 3 Critical
+GOOD, WARNING, CRITICAL = 1, 2, 3
+
+
+def feed(tracker, statuses, start=0):
+    """Feed one status list per tick, one second apart; return the alerts of each tick"""
+    return [tracker.update(T0 + timedelta(seconds=start + k), np.array(status, dtype=np.int8))
+            for k, status in enumerate(statuses)]
+
+
+def test_alert_raises_only_after_consecutive_ticks():
+    tracker = AlertTracker(["a"], raise_ticks=3, clear_ticks=5)
+    alerts = feed(tracker, [[CRITICAL], [CRITICAL], [GOOD], [CRITICAL], [CRITICAL]])
+    assert not any(alerts) and tracker.active[0] == 0
+    alerts = feed(tracker, [[CRITICAL]], start=5)
+    assert len(alerts[0]) == 1 and alerts[0][0].level == 2 and tracker.active[0] == 2
+
+
+def test_hovering_on_a_threshold_does_not_toggle():
+    tracker = AlertTracker(["a"], raise_ticks=2, clear_ticks=4)
+    raised = feed(tracker, [[WARNING], [WARNING]])
+    assert [len(a) for a in raised] == [0, 1]
+    # Brief dips below the threshold never add up to clear_ticks in a row
+    hovering = feed(tracker, [[GOOD], [WARNING], [GOOD], [GOOD], [GOOD], [WARNING]] * 3, start=2)
+    assert not any(hovering) and tracker.active[0] == 1
+    cleared = feed(tracker, [[GOOD]] * 4, start=20)
+    assert [len(a) for a in cleared] == [0, 0, 0, 1]
+    assert cleared[-1][0].level == 0 and cleared[-1][0].previous == 1
+
+
+def test_repeated_critical_samples_are_deduplicated():
+    tracker = AlertTracker(["a", "b"], raise_ticks=1)
+    alerts = feed(tracker, [[CRITICAL, GOOD]] * 20)
+    assert sum(len(a) for a in alerts) == 1
+
+
+def test_flapping_cells_are_rate_limited_and_counted():
+    tracker = AlertTracker(["a"], raise_ticks=1, clear_ticks=1, burst=2, refill_seconds=3600)
+    alerts = feed(tracker, [[CRITICAL], [GOOD]] * 4)
+    assert sum(len(a) for a in alerts) == 2
+    assert tracker.suppressed[0] == 6
+
+
+def test_many_simultaneous_changes_become_summaries():
+    tracker = AlertTracker([f"c{i}" for i in range(50)], raise_ticks=1, max_alerts=20)
+    alerts = feed(tracker, [[CRITICAL] * 30 + [WARNING] * 20])[0]
+    assert all(alert.cell_id is None for alert in alerts)
+    assert sorted(alert.message for alert in alerts) == ["20 cells raised to Warning", "30 cells raised to Critical"]
@@ -0,0 +1,57 @@
+import json
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from battery_health.__main__ import main
+
+T0 = datetime(2024, 1, 1)
+TICKS = 6
+
+
+@pytest.fixture
+def log(tmp_path):
+    """Two healthy cells and one heating by 5 °C per tick, plus a row of an unknown type at the end"""
+    rows = [
+        {"timestamp": T0 + timedelta(seconds=k), "cell_id": cell, "cell_type": cell_type,
+         "voltage": voltage, "current": 1.0, "temperature": temperature}
+        for k in range(TICKS)
+        for cell, cell_type, voltage, temperature in (("a", "NMC", 3.7, 25), ("b", "LFP", 3.2, 25),
+                                                      ("c", "NMC", 3.7, 25 + 5 * k))
+    ]
+    rows.append({"timestamp": T0 + timedelta(seconds=TICKS - 1), "cell_id": "x", "cell_type": "NiMH",
+                 "voltage": 1.2, "current": 1.0, "temperature": 25})
+    path = tmp_path / "log.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path
+
+
+# The whole log in one part, and a few rows per part so ticks are split across parts
+@pytest.mark.parametrize("chunk_mb", ["64", "0.0002"])
+def test_analyze_scores_a_small_log(log, tmp_path, capsys, chunk_mb):
+    output = tmp_path / "report"
+    assert main(["analyze", str(log), "-o", str(output), "-w", "1", "--chunk-mb", chunk_mb]) == 0
+    printed = capsys.readouterr().out
+    assert f"{log}: 19 rows, 6 ticks, 3 cells" in printed
+    assert "cells by worst status: Excellent 2, Good 0, Warning 0, Critical 1" in printed
+    assert "skipped 1 rows with unknown cell types" in printed
+
+    summary = json.loads((output / "summary.json").read_text())
+    assert (summary["rows"], summary["skipped_rows"], summary["ticks"]) == (19, 1, TICKS)
+    assert summary["start"] == "2024-01-01 00:00:00" and summary["end"] == "2024-01-01 00:00:05"
+    assert sum(summary["status_counts"].values()) == 3 * TICKS
+    assert list(summary["types"]) == ["LFP", "NMC"] and summary["types"]["NMC"]["samples"] == 2 * TICKS
+    assert summary["worst_cells"][0] == "c"
+
+    cells = pd.read_csv(output / "cells.csv").set_index("cell_id")
+    assert list(cells.index) == ["a", "b", "c"] and list(cells["samples"]) == [TICKS] * 3
+    assert list(cells["worst_status"]) == ["Excellent", "Excellent", "Critical"]
+    assert cells.loc["c", "max_temperature"] == 50 and cells.loc["c", "min_health"] < cells.loc["a", "min_health"]
+
+
+def test_analyze_exit_status(log, tmp_path, capsys):
+    output = ["-o", str(tmp_path / "report"), "-w", "1"]
+    assert main(["analyze", str(log), *output, "--fail-on", "Critical"]) == 1
+    assert main(["analyze", str(tmp_path / "missing.csv"), *output]) == 2
+    assert "error: Log not found" in capsys.readouterr().err
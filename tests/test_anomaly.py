@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from battery_health.anomaly import AnomalyDetector, kind_mask
+from battery_health.telemetry import encode_cell_types
+
+T0 = datetime(2024, 1, 1)
+TYPES = encode_cell_types(["NMC"] * 3)
+
+
+def tick(voltage, temperature):
+    return {"voltage": np.asarray(voltage, dtype=float), "current": np.ones(3),
+            "temperature": np.asarray(temperature, dtype=float)}
+
+
+def first_flagged(results, kind, cell):
+    """Return the first tick flagging cell with kind, or None"""
+    ticks = [k for k, result in enumerate(results) if kind_mask(result.flags, kind)[cell]]
+    return ticks[0] if ticks else None
+
+
+def test_outliers_are_scored_but_not_flagged_during_warmup():
+    detector = AnomalyDetector(TYPES, warmup=10)
+    results = []
+    for k in range(40):
+        voltage = 3.7 + np.array([1, -1, 1]) * (-1) ** k * 0.001
+        if k in (5, 30):
+            voltage[0] = 3.9
+        results.append(detector.update(T0 + timedelta(seconds=k), tick(voltage, [25, 25, 25])))
+    # The spike is scored against the statistics before it either way
+    assert results[5].z_scores[0, 0] > 4 and results[30].z_scores[0, 0] > 4
+    assert not any(result.flags.any() for result in results[:10])
+    flagged = kind_mask(results[30].flags, "voltage_z")
+    assert list(flagged) == [True, False, False]
+    assert detector.ticks == 40
+
+
+def test_heating_warns_before_the_critical_temperature():
+    detector = AnomalyDetector(TYPES, warmup=10)
+    results = []
+    for k in range(900):
+        # Steady, heating at 1 °C/min and at 3 °C/min: 45 °C is reached at k = 900 and k = 500
+        temperature = [30.0, 30 + k / 60, 20 + k / 20]
+        results.append(detector.update(T0 + timedelta(seconds=k), tick([3.7] * 3, temperature)))
+    assert not any(result.flags[0] for result in results)
+    # Slow heating stays under the rate limit but is forecast to go critical within 5 minutes
+    assert first_flagged(results, "temperature_rate", 1) is None
+    assert 600 < first_flagged(results, "temperature_forecast", 1) < 900 - 180
+    np.testing.assert_allclose(results[-1].temperature_rate[1], 1.0, atol=0.05)
+    # Fast heating trips the rate limit once the smoothed rate passes 2 °C/min, then the forecast
+    assert 0 < first_flagged(results, "temperature_rate", 2) < first_flagged(results, "temperature_forecast", 2) < 500
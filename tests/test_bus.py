@@ -0,0 +1,144 @@
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from battery_health.acquisition import Snapshot
+from battery_health.bus import DEFAULT_SLOTS, BusReader, BusSource, BusViewer, SnapshotBus
+from battery_health.telemetry import METRICS, encode_cell_types
+
+T0 = datetime(2024, 1, 1)
+CELLS = ["a", "b", "c", "d"]
+TYPES = ["NMC", "NMC", "LFP", "LFP"]
+
+
+def snapshot(version):
+    """A snapshot whose every metric encodes its version"""
+    batch = {metric: np.full(len(CELLS), version + i / 10) for i, metric in enumerate(METRICS)}
+    batch["status"] = np.full(len(CELLS), version % 4, dtype=np.int8)
+    return Snapshot(version, T0 + timedelta(seconds=version), CELLS, TYPES, encode_cell_types(TYPES), batch,
+                    alert_levels=np.full(len(CELLS), version % 3, dtype=np.int8))
+
+
+@pytest.fixture
+def bus():
+    bus = SnapshotBus(f"test-{uuid.uuid4().hex[:12]}", CELLS, TYPES)
+    yield bus
+    bus.close()
+
+
+def publish(bus, versions):
+    for version in versions:
+        bus.publish(snapshot(version))
+
+
+def test_snapshot_is_the_latest_complete_tick(bus):
+    reader = BusReader(bus.name)
+    assert reader.snapshot() is None
+    publish(bus, range(1, 4))
+    latest = reader.snapshot()
+    assert latest.version == 3 and latest.timestamp == T0 + timedelta(seconds=3)
+    np.testing.assert_array_equal(latest.batch["voltage"], 3.0)
+    np.testing.assert_array_equal(latest.alert_levels, 0)
+    # Cached per version, so every session shares it
+    assert reader.snapshot() is latest
+    reader.close()
+
+
+def test_snapshot_survives_the_writer_lapping_the_ring(bus):
+    reader = BusReader(bus.name)
+    publish(bus, [1])
+    first = reader.snapshot()
+    publish(bus, range(2, 3 * DEFAULT_SLOTS))
+    assert not reader.valid(1)
+    np.testing.assert_array_equal(first.batch["voltage"], 1.0)
+    np.testing.assert_array_equal(first.batch["status"], 1)
+    reader.close()
+
+
+def test_slot_being_rewritten_is_not_read(bus):
+    reader = BusReader(bus.name)
+    publish(bus, [1, 2])
+    assert reader.snapshot().version == 2
+    # The writer clears a slot's version before rewriting it
+    bus.publish(snapshot(3))
+    bus._slots["version"][3 % DEFAULT_SLOTS] = 0
+    assert not reader.valid(3)
+    assert reader.snapshot().version == 2
+    bus._slots["version"][3 % DEFAULT_SLOTS] = 3
+    assert reader.snapshot().version == 3
+    reader.close()
+
+
+def test_ticks_since_returns_only_ticks_still_in_the_ring(bus):
+    reader = BusReader(bus.name)
+    publish(bus, range(1, 21))
+    ticks = reader.ticks_since(5)
+    assert [version for version, _, _ in ticks] == list(range(21 - DEFAULT_SLOTS, 21))
+    np.testing.assert_array_equal(ticks[-1][2]["temperature"], 20.2)
+    assert reader.ticks_since(20) == []
+    reader.close()
+
+
+def test_bus_source_follows_a_republished_bus():
+    name = f"test-{uuid.uuid4().hex[:12]}"
+    bus = SnapshotBus(name, CELLS, TYPES)
+    publish(bus, [1, 2])
+    source = BusSource(name)
+    assert [timestamp for timestamp, _ in source.poll()] == [T0 + timedelta(seconds=2)]
+    bus.close()
+    bus = SnapshotBus(name, CELLS, TYPES)
+    try:
+        bus.publish(snapshot(7))
+        ticks = source.poll()
+        assert source.reader.generation == 2 and len(ticks) == 1
+        np.testing.assert_array_equal(ticks[0][1]["voltage"], 7.0)
+    finally:
+        source.close()
+        bus.close()
+
+
+def test_viewer_renders_the_published_alert_levels(bus):
+    viewer = BusViewer(bus.name)
+    publish(bus, [1, 2, 5])
+    assert viewer.is_running and viewer.history is None and viewer.store is None
+    assert viewer.cell_ids == CELLS and viewer.cell_types == TYPES
+    np.testing.assert_array_equal(viewer.snapshot().alert_levels, 2)
+    viewer.close()
+
+
+def test_sessions_share_a_viewer_while_the_bus_is_republished():
+    name = f"test-{uuid.uuid4().hex[:12]}"
+    bus = SnapshotBus(name, CELLS, TYPES)
+    publish(bus, [1])
+    viewer = BusViewer(name)
+    errors, done = [], threading.Event()
+
+    def session():
+        while not done.is_set():
+            try:
+                snapshot = viewer.snapshot()
+                assert snapshot is None or len(snapshot.batch["voltage"]) == len(CELLS)
+                viewer.version, viewer.is_running
+            except Exception as error:
+                errors.append(error)
+                return
+
+    sessions = [threading.Thread(target=session) for _ in range(4)]
+    for thread in sessions:
+        thread.start()
+    try:
+        # Each republish makes the next read reattach, unmapping the old block
+        for _ in range(200):
+            bus.close()
+            bus = SnapshotBus(name, CELLS, TYPES)
+            publish(bus, [1, 2])
+    finally:
+        done.set()
+        for thread in sessions:
+            thread.join()
+        viewer.close()
+        bus.close()
+    assert not errors
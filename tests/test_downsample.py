@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from battery_health.downsample import MinMaxAggregator, downsample, lttb_indices, minmax_indices
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(3)
+    y = rng.normal(size=(10_001, 4)).cumsum(axis=0)
+    # Isolated spikes a decimator must not drop
+    y[1234, 0], y[7777, 1], y[5000, 2] = 500.0, -500.0, 300.0
+    return y
+
+
+def test_minmax_keeps_every_bucket_extreme(series):
+    indices = minmax_indices(series, 200)
+    assert indices.shape[0] <= 202
+    assert np.all(np.diff(indices, axis=0) >= 0)
+    kept = series[indices, np.arange(series.shape[1])]
+    np.testing.assert_array_equal(kept.max(axis=0), series.max(axis=0))
+    np.testing.assert_array_equal(kept.min(axis=0), series.min(axis=0))
+
+
+def test_lttb_keeps_endpoints_and_spikes(series):
+    x = np.arange(len(series), dtype=float)
+    indices = lttb_indices(x, series, 300)
+    assert indices.shape == (300, series.shape[1])
+    assert np.all(indices[0] == 0) and np.all(indices[-1] == len(series) - 1)
+    assert np.all(np.diff(indices, axis=0) > 0)
+    assert 1234 in indices[:, 0] and 7777 in indices[:, 1] and 5000 in indices[:, 2]
+
+
+def test_short_series_are_not_decimated():
+    y = np.arange(10.0)[:, None]
+    for method in ("lttb", "minmax"):
+        timestamps = np.datetime64("2024-01-01") + np.arange(10).astype("timedelta64[s]")
+        x, values = downsample(timestamps, y, 50, method)
+        np.testing.assert_array_equal(values[0], y[:, 0])
+    with pytest.raises(ValueError):
+        downsample(timestamps, y, 5, "mean")
+
+
+def test_minmax_aggregator_preserves_extremes_across_appends(series):
+    timestamps = np.datetime64("2024-01-01T00:00", "us") + np.arange(len(series)) * np.timedelta64(100, "ms")
+    aggregator = MinMaxAggregator(bucket_seconds=10, max_buckets=10_000)
+    for start in range(0, len(series), 777):
+        assert aggregator.add(timestamps[start:start + 777], series[start:start + 777])
+    times, values = aggregator.series()
+    np.testing.assert_array_equal(values.max(axis=0), series.max(axis=0))
+    np.testing.assert_array_equal(values.min(axis=0), series.min(axis=0))
+    assert np.all(np.diff(times.astype(np.int64), axis=0) >= 0)
+    # Samples older than the open bucket are refused so the caller can reset
+    assert not aggregator.add(timestamps[:5], series[:5])
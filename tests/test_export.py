@@ -0,0 +1,169 @@
+import http.client
+import io
+import threading
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import pytest
+
+from battery_health import export
+from battery_health.export import (
+    EXPORT_COLUMNS, ExportServer, export_file_name, history_rows, snapshot_rows, stored_rows, write_rows
+)
+from battery_health.history import HistoryBuffer
+from battery_health.storage import TelemetryStore
+from battery_health.telemetry import METRICS, STATUSES
+
+T0 = datetime(2024, 1, 1)
+CELLS = ["a", "b", "c"]
+TYPES = ["NMC", "LFP", "NMC"]
+
+
+def tick_batch(k):
+    """A batch whose every metric encodes the tick number k and the cell; capacity is missing"""
+    batch = {metric: np.arange(len(CELLS)) * 10 + k + i / 10 for i, metric in enumerate(METRICS)}
+    batch["capacity"] = np.full(len(CELLS), np.nan)
+    batch["status"] = np.full(len(CELLS), k % 4, dtype=np.int8)
+    return batch
+
+
+def tick_time(k):
+    return T0 + timedelta(seconds=int(k))
+
+
+@pytest.fixture
+def engine():
+    """Just what history_rows reads from an engine"""
+    history = HistoryBuffer(CELLS, capacity=20)
+    for k in range(12):
+        history.append(tick_time(k), tick_batch(k))
+    return SimpleNamespace(lock=threading.Lock(), history=history, cell_ids=CELLS, cell_types=TYPES)
+
+
+def read_back(data, fmt, compression):
+    """Parse an export back into a DataFrame with typed timestamps"""
+    codec = None if compression == "none" else compression
+    if fmt == "parquet":
+        return pq.read_table(io.BytesIO(data)).to_pandas()
+    text = pa.input_stream(pa.py_buffer(data), compression=codec).read()
+    if fmt == "csv":
+        return pa_csv.read_csv(io.BytesIO(text)).to_pandas()
+    frame = pd.read_json(io.BytesIO(text), lines=True, dtype=False)
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"])
+    return frame
+
+
+def export_bytes(tables, fmt, compression, columns=None):
+    buffer = io.BytesIO()
+    rows = write_rows(tables, buffer, fmt, compression, columns)
+    return rows, buffer.getvalue()
+
+
+def check_ticks(frame, ticks, cells=CELLS):
+    """Check an exported frame holds exactly the given ticks of the given cells"""
+    assert len(frame) == len(ticks) * len(cells)
+    expected_k = np.repeat(ticks, len(cells))
+    positions = np.tile([CELLS.index(cell) for cell in cells], len(ticks))
+    np.testing.assert_array_equal(pd.to_datetime(frame["timestamp"]).to_numpy(),
+                                  [np.datetime64(tick_time(k), "ns") for k in expected_k])
+    assert list(frame["cell_id"]) == [CELLS[p] for p in positions]
+    assert list(frame["cell_type"]) == [TYPES[p] for p in positions]
+    np.testing.assert_allclose(frame["voltage"], positions * 10 + expected_k, rtol=1e-6)
+    np.testing.assert_allclose(frame["current"], positions * 10 + expected_k + 0.1, rtol=1e-6)
+    assert frame["capacity"].isna().all()
+    assert list(frame["status"]) == [STATUSES[k % 4] for k in expected_k]
+
+
+@pytest.mark.parametrize("compression", ["none", "zstd", "gzip"])
+@pytest.mark.parametrize("fmt", ["parquet", "csv", "ndjson"])
+def test_history_round_trips_in_every_format(engine, fmt, compression):
+    rows, data = export_bytes(history_rows(engine, tick_time(3), tick_time(9), chunk_rows=7), fmt, compression)
+    assert rows == 7 * len(CELLS)
+    check_ticks(read_back(data, fmt, compression), np.arange(3, 10))
+
+
+def test_text_exports_are_compressed_as_a_whole_stream(engine):
+    plain = export_bytes(history_rows(engine), "csv", "none")[1]
+    for compression, magic in (("gzip", b"\x1f\x8b"), ("zstd", b"\x28\xb5\x2f\xfd")):
+        data = export_bytes(history_rows(engine), "csv", compression)[1]
+        assert data.startswith(magic) and len(data) < len(plain)
+    assert export_file_name("range", "csv", "gzip") == "range.csv.gz"
+    assert export_file_name("range", "parquet", "gzip") == "range.parquet"
+    # Parquet compresses its pages instead
+    table = pq.ParquetFile(io.BytesIO(export_bytes(history_rows(engine), "parquet", "gzip")[1]))
+    assert table.metadata.row_group(0).column(0).compression == "GZIP"
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv", "ndjson"])
+def test_snapshot_rows_keep_the_filtered_cells_and_columns(fmt):
+    snapshot = SimpleNamespace(timestamp=tick_time(5), batch=tick_batch(5), cell_ids=CELLS, cell_types=TYPES)
+    columns = ["timestamp", "cell_id", "voltage", "status"]
+    tables = snapshot_rows(snapshot, columns, cells=["a", "b", "c"], cell_types=["NMC"])
+    rows, data = export_bytes(tables, fmt, "zstd", columns)
+    frame = read_back(data, fmt, "zstd")
+    assert rows == 2 and list(frame.columns) == columns
+    assert list(frame["cell_id"]) == ["a", "c"] and list(frame["status"]) == [STATUSES[1]] * 2
+    np.testing.assert_allclose(frame["voltage"], [5.0, 25.0])
+    assert list(snapshot_rows(None)) == []
+    with pytest.raises(ValueError):
+        list(snapshot_rows(snapshot, ["voltage", "resistance"]))
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv", "ndjson"])
+def test_stored_rows_round_trip_a_persisted_range(tmp_path, fmt):
+    store = TelemetryStore(tmp_path, "bench", 1, CELLS, TYPES, flush_ticks=4)
+    for k in range(12):
+        store.append(tick_time(k), tick_batch(k))
+        store.flush_if_due()
+    store.close()
+    tables = stored_rows(store.directory, tick_time(2), tick_time(10), cells=["b", "c"])
+    rows, data = export_bytes(tables, fmt, "gzip")
+    assert rows == 9 * 2
+    check_ticks(read_back(data, fmt, "gzip"), np.arange(2, 11), cells=["b", "c"])
+
+
+def read_chunked(port, path):
+    """GET path and return (status, headers, sizes of the body chunks, body) from the raw response"""
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request("GET", path)
+    response = connection.getresponse()
+    headers = dict(response.getheaders())
+    raw = response.fp
+    sizes, body = [], b""
+    if headers.get("Transfer-Encoding") == "chunked":
+        while True:
+            size = int(raw.readline().strip(), 16)
+            sizes.append(size)
+            if not size:
+                break
+            body += raw.read(size)
+            assert raw.read(2) == b"\r\n"
+    connection.close()
+    return response.status, headers, sizes, body
+
+
+def test_export_server_streams_a_chunked_body(engine, monkeypatch):
+    monkeypatch.setattr(export, "HTTP_CHUNK_BYTES", 256)
+    monkeypatch.setattr(export, "NDJSON_BATCH_ROWS", len(CELLS))
+    engine.snapshot = lambda: None
+    engine.store = None
+    server = ExportServer(engine, port=0)
+    try:
+        port = int(server.url.split(":")[2].split("/")[0])
+        url = server.link("history", "ndjson", "none", columns=EXPORT_COLUMNS, start=tick_time(2))
+        status, headers, sizes, body = read_chunked(port, url.split(str(port), 1)[1])
+        assert status == 200 and headers["Transfer-Encoding"] == "chunked"
+        assert headers["Content-Disposition"] == 'attachment; filename="battery_history.ndjson"'
+        # Sent as the rows are rendered: several chunks, then the terminating empty one
+        assert len(sizes) > 3 and sizes[-1] == 0 and all(size >= 256 for size in sizes[:-2])
+        check_ticks(read_back(body, "ndjson", "none"), np.arange(2, 12))
+        assert read_chunked(port, "/export/stored")[0] == 400
+        assert read_chunked(port, "/export/history?format=xml")[0] == 400
+        assert read_chunked(port, "/export/everything")[0] == 404
+    finally:
+        server.close()
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from battery_health.fleet import FleetEngine, simulator_specs
+
+
+class CollectingDispatcher:
+    def __init__(self):
+        self.alerts = []
+
+    def submit(self, alerts):
+        self.alerts += alerts
+
+
+@pytest.fixture(scope="module")
+def fleet():
+    fleet = FleetEngine(interval=0.01, capacity=50, dispatcher=CollectingDispatcher())
+    fleet.configure(simulator_specs(["Bench-001", "Bench-002"], [1, 2, 3], 8, seed=7), workers=2)
+    yield fleet
+    fleet.close()
+
+
+def test_every_partition_publishes_snapshots_from_its_worker(fleet):
+    for _ in range(5):
+        fleet.sample()
+    snapshots = fleet.snapshots()
+    assert len(snapshots) == 6
+    for (bench, group), snapshot in snapshots.items():
+        partition = fleet.partitions[(bench, group)]
+        assert snapshot.cell_ids == partition.cell_ids and len(snapshot.batch["health"]) == 8
+        assert snapshot.alert_levels is not None and snapshot.summary.total_cells == 8
+        # Only the drilled-down partition mirrors its history
+        assert partition.history is None
+    assert all(alert.source in {partition.label for partition in fleet.partitions.values()}
+               for alert in fleet.dispatcher.alerts)
+
+
+def test_focus_mirrors_the_worker_history(fleet):
+    key = ("Bench-002", 3)
+    partition = fleet.focus(key)
+    recorded = len(partition.history)
+    assert recorded > 0
+    for _ in range(70):
+        fleet.sample()
+    assert len(partition.history) == 50 and partition.history.total_ticks == recorded + 70
+    timestamps, values, _ = partition.history.window()
+    assert np.all(np.diff(timestamps) > np.timedelta64(0))
+    assert timestamps[-1] == np.datetime64(partition.snapshot().timestamp, "us")
+    np.testing.assert_allclose(values[-1, :, partition.history.metric_index["health"]],
+                               partition.snapshot().batch["health"])
+    # Drilling into another partition stops mirroring the first one
+    other = fleet.focus(("Bench-001", 1))
+    assert partition.history is None and len(other.history) == 50
+
+
+def test_a_dead_worker_marks_its_partitions_stale():
+    fleet = FleetEngine(interval=0.01, capacity=20, dispatcher=CollectingDispatcher())
+    specs = simulator_specs(["Bench-001"], [1, 2], 4, seed=3)
+    try:
+        fleet.configure(specs, workers=2)
+        process, _, keys = fleet._workers[0]
+        process.kill()
+        process.join()
+        before = fleet.partitions[keys[0]].snapshot()
+        fleet.sample()
+        fleet.sample()
+        assert fleet.last_error and len(fleet._workers) == 1
+        assert fleet.partitions[keys[0]].stale and fleet.partitions[keys[0]].snapshot() is before
+        live = next(key for key in fleet.partitions if key not in keys)
+        assert not fleet.partitions[live].stale and fleet.partitions[live].snapshot().version == 3
+        assert fleet.focus(keys[0]).history is not None
+        fleet.stop()
+        # The fleet can be reconfigured after losing a worker
+        fleet.configure(specs, workers=2)
+        assert fleet.last_error is None and not any(partition.stale for partition in fleet.partitions.values())
+    finally:
+        fleet.close()
+
+
+def test_partition_stores_follow_what_the_workers_write(tmp_path):
+    fleet = FleetEngine(interval=0.01, capacity=20)
+    try:
+        fleet.configure(simulator_specs(["Bench-001"], [1, 2], 4, seed=5), workers=2, store_root=tmp_path)
+        for _ in range(3):
+            fleet.sample()
+        store = fleet.focus(("Bench-001", 2)).store
+        # The workers buffer ticks until their next flush
+        assert store.ticks_written == 0 and store.time_range() is None
+        store.flush()
+        assert store.ticks_written == 3 and fleet.partitions[("Bench-001", 1)].store.ticks_written == 0
+        timestamps = np.concatenate([timestamps for timestamps, _ in store.query(metrics=["health"])])
+        assert len(timestamps) == 3
+        fleet.sample()
+        fleet.stop()
+        assert all(partition.store.ticks_written == 4 for partition in fleet.partitions.values())
+    finally:
+        fleet.close()
@@ -0,0 +1,83 @@
+import struct
+import threading
+
+import numpy as np
+import pytest
+
+from battery_health.gateway import (
+    GATEWAY_MAX_CELLS, MODBUS_CELLS_PER_REQUEST, SERIAL_MAX_CELLS, WIRE_CHANNELS, GatewaySource, ModbusTransport,
+    Transport, encode_serial_frames, open_transport, parse_serial_frames
+)
+
+
+def decode_requests(data):
+    """Return (transaction, unit, function, register, count) of each request in a pipelined poll"""
+    requests = []
+    for offset in range(0, len(data), 12):
+        transaction, _, length, unit, function, register, count = struct.unpack(">HHHBBHH", data[offset:offset + 12])
+        assert length == 6
+        requests.append((transaction, unit, function, register, count))
+    return requests
+
+
+@pytest.mark.parametrize("cells", [1, 31, 32, 1000, GATEWAY_MAX_CELLS["Modbus-TCP"]])
+def test_modbus_requests_cover_every_cell_register(cells):
+    transport = open_transport("Modbus-TCP", "127.0.0.1:1502", cells)
+    data, pending = transport._requests()
+    requests = decode_requests(data)
+    assert len(requests) == -(-cells // MODBUS_CELLS_PER_REQUEST) == len(pending)
+    assert all(count <= 125 for *_, count in requests)
+    registers = [(register, register + count) for *_, register, count in requests]
+    assert registers[0][0] == 0 and registers[-1][1] == cells * len(WIRE_CHANNELS)
+    assert all(end == start for (_, end), (start, _) in zip(registers, registers[1:]))
+    assert [pending[transaction] * len(WIRE_CHANNELS) for transaction, *_ in requests] == [r for r, _ in registers]
+
+
+def test_modbus_rejects_cells_beyond_the_register_space():
+    with pytest.raises(ValueError):
+        open_transport("Modbus-TCP", "127.0.0.1", GATEWAY_MAX_CELLS["Modbus-TCP"] + 1)
+    # A start register leaves fewer addressable cells
+    ModbusTransport("127.0.0.1", cells=16383, register=4)._requests()
+    with pytest.raises(ValueError):
+        ModbusTransport("127.0.0.1", cells=16384, register=4)
+
+
+def test_serial_cell_indices_fit_the_frame():
+    open_transport("Serial", "/dev/null", SERIAL_MAX_CELLS)
+    with pytest.raises(ValueError):
+        open_transport("Serial", "/dev/null", SERIAL_MAX_CELLS + 1)
+    cells = np.array([0, SERIAL_MAX_CELLS - 1])
+    wire = np.array([[3700, -150, 251, 5000], [4200, 320, -45, 0]])
+    parsed, values, consumed, resyncs = parse_serial_frames(encode_serial_frames(cells, wire))
+    np.testing.assert_array_equal(parsed, cells)
+    np.testing.assert_allclose(values, wire / np.array([1000.0, 100.0, 10.0, 100.0]))
+    assert resyncs == 0
+
+
+class CrashingTransport(Transport):
+    """Raises an unexpected error on its first run, then stays connected"""
+
+    name = "Crashing"
+
+    def __init__(self):
+        super().__init__(cells=1)
+        self.runs = 0
+        self.recovered = threading.Event()
+
+    async def run(self, publish):
+        self.runs += 1
+        if self.runs == 1:
+            raise struct.error("argument out of range")
+        self.recovered.set()
+        await publish(np.array([0]), np.array([[3.7, 1.0, 25.0, 50.0]]))
+
+
+def test_supervisor_records_unexpected_errors_and_reconnects():
+    transport = CrashingTransport()
+    source = GatewaySource(["c"], ["NMC"], [transport], publish_interval=0.01, reconnect_seconds=0.01)
+    try:
+        assert transport.recovered.wait(5)
+        assert transport.last_error == "error: argument out of range"
+        assert source.wait_for_tick(5)
+    finally:
+        source.close()
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from battery_health.history import HistoryBuffer
+from battery_health.telemetry import METRICS
+
+T0 = datetime(2024, 1, 1)
+
+
+def tick_batch(k, cells):
+    """A batch whose every metric encodes the tick number k"""
+    batch = {metric: np.full(cells, k + i / 10) for i, metric in enumerate(METRICS)}
+    batch["status"] = np.full(cells, k % 4, dtype=np.int8)
+    return batch
+
+
+def fill(history, ticks):
+    for k in range(ticks):
+        history.append(T0 + timedelta(seconds=k), tick_batch(k, len(history.cell_ids)))
+
+
+def test_window_before_wraparound():
+    history = HistoryBuffer(["a", "b"], capacity=5)
+    assert history.latest() is None and len(history) == 0
+    fill(history, 3)
+    timestamps, values, status = history.window()
+    assert len(history) == 3
+    assert list(timestamps) == [np.datetime64(T0 + timedelta(seconds=k), "us") for k in range(3)]
+    np.testing.assert_array_equal(values[:, 0, 0], [0, 1, 2])
+    np.testing.assert_array_equal(status[:, 1], [0, 1, 2])
+
+
+@pytest.mark.parametrize("ticks", [5, 6, 12, 23])
+def test_window_after_wraparound_keeps_the_latest_ticks_in_order(ticks):
+    history = HistoryBuffer(["a", "b", "c"], capacity=5)
+    fill(history, ticks)
+    assert len(history) == 5 and history.total_ticks == ticks
+    timestamps, values, status = history.window()
+    expected = np.arange(ticks - 5, ticks)
+    np.testing.assert_array_equal(values[:, 2, METRICS.index("voltage")], expected)
+    np.testing.assert_array_equal(values[:, 0, METRICS.index("health")], expected + METRICS.index("health") / 10)
+    np.testing.assert_array_equal(status[:, 0], expected % 4)
+    assert np.all(np.diff(timestamps) > np.timedelta64(0))
+    # Shorter windows are the newest ticks of the full one
+    np.testing.assert_array_equal(history.metric("voltage", 2)[:, 1], expected[-2:])
+    latest_time, latest_values, latest_status = history.latest()
+    assert latest_time == timestamps[-1] and latest_values[0, 0] == ticks - 1
+
+
+def test_windows_are_read_only_views():
+    history = HistoryBuffer(["a"], capacity=4)
+    fill(history, 6)
+    timestamps, values, _ = history.window()
+    assert np.shares_memory(values, history._values)
+    with pytest.raises(ValueError):
+        values[0, 0, 0] = 1.0
+
+
+def test_ticks_since():
+    history = HistoryBuffer(["a"], capacity=4)
+    fill(history, 10)
+    assert history.ticks_since(T0 + timedelta(seconds=8)) == 2
+    assert history.ticks_since(T0) == 4
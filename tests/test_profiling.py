@@ -0,0 +1,69 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from battery_health.profiling import MetricsServer, Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    calls = []
+
+    @profiler.timed("work")
+    def work(value):
+        calls.append(value)
+        return value * 2
+
+    # One shared no-op context manager whatever the phase
+    assert profiler.phase("a") is profiler.phase("b")
+    with profiler.phase("a"):
+        pass
+    assert work(3) == 6 and calls == [3]
+    assert profiler.stats() == {} and profiler.sizes() == {}
+    assert profiler.prometheus().splitlines()[-1] == "battery_dashboard_profiling_enabled 0"
+
+
+def test_prometheus_exposition():
+    profiler = Profiler(window=4)
+    profiler.enabled = True
+    for seconds in (0.5, 1.0, 2.0, 4.0, 3.0):
+        profiler.record("soh", seconds)
+    profiler.record("chart/\"cells\"", 0.25)
+    profiler.record_size("cells", 2048)
+    with profiler.phase("aggregation"):
+        pass
+    profiler.timed("tab/overview")(lambda: None)()
+
+    lines = profiler.prometheus(prefix="bench").splitlines()
+    assert lines[:2] == ["# HELP bench_phase_seconds Time spent in each instrumented phase",
+                         "# TYPE bench_phase_seconds summary"]
+    # Quantiles cover the last window samples, sum and count every sample
+    assert 'bench_phase_seconds{phase="soh",quantile="0.5"} 2.5' in lines
+    assert 'bench_phase_seconds{phase="soh",quantile="0.99"} 3.97' in lines
+    assert 'bench_phase_seconds_sum{phase="soh"} 10.5' in lines
+    assert 'bench_phase_seconds_count{phase="soh"} 5' in lines
+    assert 'bench_phase_seconds_count{phase="chart/\\"cells\\""} 1' in lines
+    assert 'bench_phase_seconds_count{phase="aggregation"} 1' in lines
+    assert 'bench_phase_seconds_count{phase="tab/overview"} 1' in lines
+    assert "# TYPE bench_payload_bytes gauge" in lines
+    assert 'bench_payload_bytes{chart="cells"} 2048' in lines
+    assert lines[-1] == "bench_profiling_enabled 1"
+    count, total, quantiles, last = profiler.stats()["soh"]
+    assert (count, total, last) == (5, 10.5, 3.0)
+
+
+def test_metrics_server_serves_the_exposition():
+    profiler = Profiler()
+    profiler.enabled = True
+    profiler.record("soh", 0.5)
+    server = MetricsServer(profiler, port=0)
+    try:
+        with urllib.request.urlopen(server.url) as response:
+            assert response.headers["Content-Type"] == "text/plain; version=0.0.4; charset=utf-8"
+            assert response.read().decode() == profiler.prometheus()
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(server.url.replace("/metrics", "/other"))
+        assert error.value.code == 404
+    finally:
+        server.close()
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from battery_health.rack import RackLayout
+
+NAN = np.nan
+
+
+def layout():
+    """10 cells in 2s2p modules: three modules, two per row, the last half full"""
+    return RackLayout(10, series=2, parallel=2)
+
+
+def test_cells_are_placed_module_by_module():
+    rack = layout()
+    assert (rack.modules, rack.module_columns, rack.module_rows, rack.shape) == (3, 2, 2, (4, 4))
+    image = rack.fill(np.arange(10.0))
+    np.testing.assert_array_equal(image, [
+        [0, 1, 4, 5],
+        [2, 3, 6, 7],
+        [8, 9, NAN, NAN],
+        [NAN, NAN, NAN, NAN],
+    ])
+    # The image is updated in place on the next tick
+    assert rack.fill(np.arange(10.0) + 1) is image and image[2, 1] == 10
+    labels = rack.cell_labels([f"c{k}" for k in range(10)])
+    assert list(labels[2]) == ["c8", "c9", "", ""]
+    assert list(rack.module_labels().flat) == ["Module 1", "Module 2", "Module 3", ""]
+
+
+def test_module_aggregates_skip_missing_cells():
+    rack = layout()
+    # Module 2 has no reading at all, module 3 only two cells
+    values = np.array([1, NAN, 3, 2, NAN, NAN, NAN, NAN, 5, 7])
+    np.testing.assert_array_equal(rack.aggregate(values, "max"), [[3, NAN], [7, NAN]])
+    np.testing.assert_array_equal(rack.aggregate(values, "mean"), [[2, NAN], [6, NAN]])
+    with pytest.raises(ValueError):
+        rack.aggregate(values, "median")
+
+
+def test_layout_arguments():
+    with pytest.raises(ValueError):
+        RackLayout(10, series=0)
+    assert RackLayout(10, series=5, module_columns=4).shape == (5, 2)
+    assert RackLayout(0, series=4).shape == (4, 1)
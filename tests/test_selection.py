@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from battery_health.selection import CellIndex, select_cells
+from battery_health.telemetry import CELL_TYPES, STATUSES
+
+N = 200
+ORDERS = ["index", "worst", "best", "severity"]
+FILTERS = [
+    (None, None),
+    (list(STATUSES[2:]), None),
+    (None, [CELL_TYPES[1]]),
+    ([STATUSES[0]], CELL_TYPES[:2]),
+    ([], None),
+]
+
+
+def tick(rng):
+    """Health with many exact ties, a few unrounded values and missing cells"""
+    health = np.round(rng.uniform(70, 100, N), 1)
+    health[rng.random(N) < 0.1] = rng.choice([80.0, 90.0])
+    health[:5] += 1e-9
+    health[rng.random(N) < 0.05] = np.nan
+    status = rng.integers(0, len(STATUSES), N).astype(np.int8)
+    return health, status
+
+
+def test_cell_index_selects_like_select_cells():
+    rng = np.random.default_rng(3)
+    type_codes = rng.integers(0, len(CELL_TYPES), N)
+    index = None
+    for _ in range(4):
+        health, status = tick(rng)
+        # The previous tick's order only seeds the sort
+        index = CellIndex(type_codes, status, health, index)
+        for order in ORDERS:
+            for statuses, cell_types in FILTERS:
+                for limit in (None, 0, 1, 7, 60, N, N + 5):
+                    expected = select_cells(health, status, type_codes, statuses, cell_types, order, limit)
+                    selected = index.select(statuses, cell_types, order, limit)
+                    np.testing.assert_array_equal(selected, expected, err_msg=f"{order} {statuses} {cell_types} {limit}")
+
+
+def test_health_ties_and_missing_health_are_ordered_by_cell():
+    health = np.array([90.0, np.nan, 80.0, 90.0, np.nan, 80.0])
+    status = np.array([0, 2, 1, 2, 0, 1], dtype=np.int8)
+    type_codes = np.zeros(6, dtype=np.int64)
+    previous = CellIndex(type_codes, status, health[::-1].copy())
+    index = CellIndex(type_codes, status, health, previous)
+    np.testing.assert_array_equal(index.worst_order, [2, 5, 0, 3, 1, 4])
+    np.testing.assert_array_equal(index.best_order, [0, 3, 2, 5, 1, 4])
+    np.testing.assert_array_equal(index.severity_order, [3, 1, 2, 5, 0, 4])
+    np.testing.assert_array_equal(select_cells(health, status, type_codes, order="worst", limit=3), [2, 5, 0])
+    with pytest.raises(ValueError):
+        index.select(order="newest")
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from battery_health.soh import MIN_FIT_SAMPLES, SohEstimator
+
+T0 = np.datetime64("2024-01-01T00:00", "us")
+
+
+def run(estimator, ticks, current, capacity, start=0, seconds=1.0):
+    timestamps = T0 + ((start + np.arange(ticks)) * seconds * 1e6).astype("timedelta64[us]")
+    return estimator.update(timestamps, current, capacity)
+
+
+def test_fit_matches_least_squares_over_a_long_run():
+    # 40 A for over two years of hourly ticks: throughput reaches ~10^6 Ah,
+    # where raw-sum fits (n Σx² - (Σx)²) cancel catastrophically
+    cells, chunk, chunks = 3, 500, 40
+    estimator = SohEstimator(cells)
+    rng = np.random.default_rng(0)
+    current = np.full((chunk, cells), 40.0)
+    xs, ys = [], []
+    for k in range(chunks):
+        # Hourly ticks at 40 A: tick t has moved 40 t Ah
+        throughput = np.repeat(40.0 * (k * chunk + np.arange(chunk))[:, None], cells, axis=1)
+        capacity = 3.0 - 2e-6 * throughput + rng.normal(0, 1e-3, (chunk, cells))
+        capacity[rng.random((chunk, cells)) < 0.05] = np.nan
+        result = run(estimator, chunk, current, capacity, start=k * chunk, seconds=3600)
+        xs.append(throughput)
+        ys.append(capacity)
+    x, y = np.concatenate(xs), np.concatenate(ys)
+    assert x.max() > 1e5
+    for cell in range(cells):
+        valid = ~np.isnan(y[:, cell])
+        slope, intercept = np.polyfit(x[valid, cell], y[valid, cell], 1)
+        assert result.initial_capacity[cell] == pytest.approx(intercept, rel=1e-9)
+        assert result.fade_per_cycle[cell] / (2 * result.initial_capacity[cell]) == pytest.approx(slope, rel=1e-6)
+    np.testing.assert_allclose(result.throughput_ah, x[-1], rtol=1e-12)
+
+
+def test_fit_is_stable_far_from_zero_throughput():
+    # Fitted samples only arrive once 10^9 Ah have moved, spread over 10^3 Ah,
+    # where n Σx² and (Σx)² agree in all their significant digits
+    estimator = SohEstimator(1)
+    run(estimator, 1001, np.full((1001, 1), 1e6), np.full((1001, 1), np.nan), seconds=3600)
+    offset = estimator.throughput_ah[0]
+    x = offset + np.arange(1, 1001)[:, None]
+    capacity = 3.0 - 1e-4 * (x - offset)
+    result = run(estimator, 1000, np.ones((1000, 1)), capacity, start=1001, seconds=3600)
+    assert offset == pytest.approx(1e9)
+    assert result.fade_per_cycle[0] / (2 * result.initial_capacity[0]) == pytest.approx(-1e-4, rel=1e-6)
+    assert result.capacity[0] == pytest.approx(capacity[-1, 0], rel=1e-9)
+
+
+def test_constant_throughput_gives_no_fade_and_no_division_errors():
+    estimator = SohEstimator(2)
+    result = run(estimator, 50, np.zeros((50, 2)), np.full((50, 2), 3.0))
+    np.testing.assert_array_equal(result.fade_per_cycle, [0.0, 0.0])
+    np.testing.assert_array_equal(result.capacity, [3.0, 3.0])
+    assert np.all(np.isinf(result.rul_cycles))
+
+
+def test_fit_waits_for_enough_samples():
+    estimator = SohEstimator(1)
+    result = run(estimator, MIN_FIT_SAMPLES - 1, np.ones((MIN_FIT_SAMPLES - 1, 1)), np.full((MIN_FIT_SAMPLES - 1, 1), 3.0))
+    assert np.isnan(result.capacity[0])
+    result = run(estimator, 1, np.ones((1, 1)), np.full((1, 1), 3.0), start=MIN_FIT_SAMPLES)
+    assert result.capacity[0] == pytest.approx(3.0)
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from battery_health import sources
+from battery_health.sources import ReplaySource
+
+T0 = datetime(2024, 1, 1)
+CELLS = ["a", "b", "c"]
+TICKS = 20
+# Tick 7 has no reading for cell b, which holds its previous value
+MISSING = {(7, "b")}
+
+
+def write_log(path, row_group_ticks=4):
+    """A log whose current encodes the tick number and the cell, one tick every 10 s"""
+    rows = [
+        {"timestamp": T0 + timedelta(seconds=10 * k), "cell_id": cell, "cell_type": "NMC",
+         "voltage": 3.7, "current": k + i / 10, "temperature": 25.0}
+        for k in range(TICKS) for i, cell in enumerate(CELLS) if (k, cell) not in MISSING
+    ]
+    frame = pd.DataFrame(rows)
+    if path.suffix == ".parquet":
+        frame.to_parquet(path, index=False, row_group_size=row_group_ticks * len(CELLS))
+    else:
+        frame.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A playback clock that only moves when the test advances it"""
+    now = SimpleNamespace(seconds=0.0)
+    monkeypatch.setattr(sources, "time", SimpleNamespace(monotonic=lambda: now.seconds))
+    return now
+
+
+def drain(source, clock):
+    """Poll an hour of log time at a time until the log is exhausted; return the ticks"""
+    ticks = []
+    for _ in range(TICKS + 2):
+        polled = source.poll()
+        if not polled and source.exhausted:
+            return ticks
+        ticks += polled
+        clock.seconds += 3600 / source.speed
+    raise AssertionError("replay did not finish")
+
+
+def tick_numbers(ticks):
+    return [int((timestamp - T0).total_seconds()) // 10 for timestamp, _ in ticks]
+
+
+def expected_current(k):
+    current = k + np.arange(len(CELLS)) / 10
+    if k == 7:
+        current[1] = 6.1
+    return current
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+@pytest.mark.parametrize("chunk_rows", [1, 2, 4, 100])
+def test_every_tick_is_replayed_once_across_chunks(tmp_path, clock, suffix, chunk_rows):
+    source = ReplaySource(write_log(tmp_path / f"log{suffix}"), speed=100, chunk_rows=chunk_rows)
+    assert source.cell_ids == CELLS and source.cell_types == ["NMC"] * 3
+    ticks = drain(source, clock)
+    assert tick_numbers(ticks) == list(range(TICKS)) and source.exhausted
+    for k, (_, batch) in enumerate(ticks):
+        np.testing.assert_allclose(batch["current"], expected_current(k))
+    assert source.position == T0 + timedelta(seconds=10 * (TICKS - 1))
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_seek_replays_from_the_requested_time(tmp_path, clock, suffix):
+    source = ReplaySource(write_log(tmp_path / f"log{suffix}"), speed=100, chunk_rows=2)
+    assert tick_numbers(drain(source, clock)) == list(range(TICKS))
+    # Backwards, between ticks: the next tick is the first one replayed
+    source.seek(T0 + timedelta(seconds=65))
+    assert source.position is None and not source.exhausted
+    ticks = drain(source, clock)
+    assert tick_numbers(ticks) == list(range(7, TICKS))
+    # Readings held before the seek are dropped, so the missing cell is unknown
+    assert np.isnan(ticks[0][1]["current"][1])
+    np.testing.assert_allclose(ticks[1][1]["current"], expected_current(8))
+    # Forwards again
+    source.seek(T0 + timedelta(seconds=150))
+    assert tick_numbers(drain(source, clock)) == list(range(15, TICKS))
+
+
+def test_seek_skips_parquet_row_groups_before_the_target(tmp_path, clock, monkeypatch):
+    source = ReplaySource(write_log(tmp_path / "log.parquet", row_group_ticks=4), speed=100, chunk_rows=2)
+    requested = []
+    iter_batches = pq.ParquetFile.iter_batches
+
+    def recording_iter_batches(self, *args, row_groups=None, **kwargs):
+        requested.append(row_groups)
+        return iter_batches(self, *args, row_groups=row_groups, **kwargs)
+
+    monkeypatch.setattr(pq.ParquetFile, "iter_batches", recording_iter_batches)
+    source.seek(T0 + timedelta(seconds=130))
+    assert tick_numbers(drain(source, clock)) == list(range(13, TICKS))
+    # Row groups hold 12 rows: the first three end before tick 13 and are never read
+    assert requested == [[3, 4]]
+
+
+def test_ticks_are_released_at_the_playback_speed(tmp_path, clock):
+    source = ReplaySource(write_log(tmp_path / "log.csv"), speed=10, chunk_rows=2, max_ticks_per_poll=3)
+    # The first tick is due at once, the next ones every second at 10x
+    assert tick_numbers(source.poll()) == [0]
+    clock.seconds += 2.5
+    assert tick_numbers(source.poll()) == [1, 2]
+    assert source.poll() == []
+    source.set_speed(20)
+    clock.seconds += 1.0
+    assert tick_numbers(source.poll()) == [3, 4]
+    # A long pause releases the backlog max_ticks_per_poll at a time
+    clock.seconds += 10.0
+    assert tick_numbers(source.poll()) == [5, 6, 7]
+    # resume() restarts the clock from the position instead of catching up
+    source.resume()
+    clock.seconds += 0.5
+    assert tick_numbers(source.poll()) == [8]
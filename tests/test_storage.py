@@ -0,0 +1,163 @@
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from battery_health.acquisition import AcquisitionEngine
+from battery_health.sources import ReplaySource
+from battery_health.storage import TelemetryStore
+from battery_health.telemetry import METRICS
+
+# Ten minutes before an hour boundary, so runs span two hour partitions
+T0 = datetime(2024, 1, 1, 0, 50)
+CELLS = ["a", "b", "c"]
+
+
+def tick_batch(k, cells=len(CELLS)):
+    """A batch whose every metric encodes the tick number k"""
+    batch = {metric: np.arange(cells, dtype=np.float32) + k + i / 10 for i, metric in enumerate(METRICS)}
+    batch["status"] = np.full(cells, k % 4, dtype=np.int8)
+    return batch
+
+
+def record(store, ticks):
+    for k in ticks:
+        store.append(T0 + timedelta(seconds=10 * k), tick_batch(k))
+        store.flush_if_due()
+
+
+def queried_ticks(reader, metric="voltage"):
+    """Return (tick numbers, values) of everything a store or MappedHistory serves"""
+    chunks = list(reader.query(metrics=[metric]))
+    timestamps = np.concatenate([timestamps for timestamps, _ in chunks])
+    values = np.concatenate([values[metric] for _, values in chunks])
+    ticks = (timestamps - np.datetime64(T0, "us")) // np.timedelta64(10, "s")
+    return ticks, values
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TelemetryStore(tmp_path, "bench", 1, CELLS, ["NMC"] * len(CELLS), flush_ticks=7)
+    yield store
+    store.close()
+
+
+def part_files(store):
+    return sorted(path.name for path in store.directory.glob("hour=*/part-*.parquet"))
+
+
+def test_query_round_trips_across_flushes_and_compaction(store):
+    record(store, range(100))
+    store.close()
+    # The closed first hour and the last one are each compacted into one file
+    assert len(part_files(store)) == 2
+    assert not list(store.directory.glob("hour=*/replace-*.json"))
+    for reader in (store, store.mapped):
+        ticks, values = queried_ticks(reader)
+        np.testing.assert_array_equal(ticks, np.arange(100))
+        np.testing.assert_array_equal(values[:, 1], np.arange(100) + 1.0)
+
+
+def test_query_selects_a_time_range(store):
+    record(store, range(100))
+    store.flush()
+    start, end = T0 + timedelta(seconds=255), T0 + timedelta(seconds=700)
+    for reader in (store, store.mapped):
+        timestamps = np.concatenate([timestamps for timestamps, _ in reader.query(start, end, metrics=["current"])])
+        np.testing.assert_array_equal((timestamps - np.datetime64(T0, "us")) // np.timedelta64(10, "s"),
+                                      np.arange(26, 71))
+
+
+def test_overlapping_parts_stay_visible(store):
+    # Containment alone must not hide a file: rewrite ticks 40..59 after 0..99
+    record(store, range(100))
+    store.flush()
+    record(store, range(40, 60))
+    store.flush()
+    ticks, _ = queried_ticks(store)
+    assert len(ticks) == 120
+
+
+def test_interrupted_compaction_hides_sources_once_the_target_exists(store):
+    record(store, range(30))
+    store.flush()
+    hour = next(store.directory.glob("hour=*"))
+    sources = sorted(path.name for path in hour.glob("part-*.parquet"))
+    assert len(sources) > 1
+    target = sources[0].replace(".parquet", ".1.parquet")
+    manifest = hour / f"replace-{target}.json"
+    manifest.write_text(json.dumps({"target": target, "sources": sources}))
+    # Target not written yet: the sources still serve every tick
+    assert len(queried_ticks(store)[0]) == 30
+    # Target written (here holding only the first part), sources not yet removed
+    (hour / target).write_bytes((hour / sources[0]).read_bytes())
+    assert len(queried_ticks(store)[0]) == 7
+    # The next compaction finishes the interrupted one
+    store.close()
+    assert not manifest.exists()
+    assert [path.name for path in hour.glob("part-*.parquet")] == [target]
+
+
+def test_truncate_drops_ticks_from_the_cutoff(store):
+    record(store, range(100))
+    store.flush()
+    store.truncate(T0 + timedelta(seconds=405))
+    for reader in (store, store.mapped):
+        np.testing.assert_array_equal(queried_ticks(reader)[0], np.arange(41))
+    record(store, range(41, 100))
+    store.close()
+    for reader in (store, store.mapped):
+        ticks, values = queried_ticks(reader)
+        np.testing.assert_array_equal(ticks, np.arange(100))
+        np.testing.assert_array_equal(values[:, 0], np.arange(100))
+
+
+def test_mapped_history_remaps_a_segment_written_again_under_its_name(store):
+    record(store, range(14))
+    store.flush()
+    # Both segments are mapped, then the second is dropped and recorded with other values
+    assert len(queried_ticks(store.mapped)[0]) == 14
+    store.truncate(T0 + timedelta(seconds=70))
+    for k in range(7, 14):
+        store.append(T0 + timedelta(seconds=10 * k), tick_batch(k + 100))
+    store.flush()
+    ticks, values = queried_ticks(store.mapped)
+    np.testing.assert_array_equal(ticks, np.arange(14))
+    np.testing.assert_array_equal(values[:, 0], np.r_[np.arange(7), np.arange(107, 114)])
+
+
+def write_log(path, ticks):
+    rows = [
+        {"timestamp": T0 + timedelta(seconds=10 * k), "cell_id": cell, "cell_type": "NMC",
+         "voltage": 3.7, "current": 1.0, "temperature": 25.0 + k / 100}
+        for k in range(ticks) for cell in CELLS
+    ]
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def play(engine):
+    """Sample until the replay publishes no new tick"""
+    version = None
+    while engine.snapshot().version != version:
+        version = engine.snapshot().version
+        engine.sample()
+
+
+def test_backward_replay_seek_records_each_tick_once(tmp_path):
+    log = tmp_path / "log.csv"
+    write_log(log, 140)
+    source = ReplaySource(log, speed=1e9)
+    store = TelemetryStore(tmp_path / "store", "bench", 1, source.cell_ids, source.cell_types, flush_ticks=16)
+    engine = AcquisitionEngine(interval=1.0)
+    engine.configure(source, store=store)
+    play(engine)
+    engine.seek(T0 + timedelta(seconds=400))
+    assert len(engine.history) == 0
+    play(engine)
+    store.close()
+    for reader in (store, store.mapped):
+        np.testing.assert_array_equal(queried_ticks(reader)[0], np.arange(0, 140))
+    timestamps = engine.history.window()[0]
+    assert len(timestamps) == 100 and timestamps[-1] == np.datetime64(T0 + timedelta(seconds=1390), "us")
@@ -0,0 +1,49 @@
+import numpy as np
+
+from battery_health.summary import rollup, summarize
+from battery_health.telemetry import encode_cell_types
+
+NAN = np.nan
+
+
+def batch(health, status, power=None):
+    health = np.array(health, dtype=float)
+    power = np.ones(len(health)) if power is None else np.array(power, dtype=float)
+    return {"health": health, "power": power, "status": np.array(status, dtype=np.int8)}
+
+
+def test_summary_ignores_missing_readings():
+    type_codes = encode_cell_types(["LFP", "NMC", "LFP", "NMC", "LTO"])
+    summary = summarize(batch([80, NAN, 90, 70, NAN], [1, 0, 1, 2, 0], [1, NAN, 2, 3, 4]), type_codes)
+    assert summary.total_cells == 5 and list(summary.status_counts) == [2, 2, 1, 0]
+    assert (summary.mean_health, summary.min_health, summary.max_health) == (80, 70, 90)
+    assert summary.total_power == 10
+    assert list(summary.type_counts) == [2, 2, 1, 0]
+    # LTO only has a missing reading and LiCoO2 no cells: neither has a mean
+    np.testing.assert_array_equal(summary.type_mean_health, [85, 70, NAN, NAN])
+    np.testing.assert_array_equal(summary.type_total_power, [3, 3, 4, 0])
+
+
+def test_summary_of_a_tick_without_health():
+    summary = summarize(batch([NAN, NAN], [0, 0]), encode_cell_types(["LFP", "LFP"]))
+    assert np.isnan(summary.mean_health) and np.isnan(summary.min_health)
+    assert np.isnan(summary.health_percentiles).all()
+
+
+def test_rollup_weights_mean_health_by_cells_and_skips_missing_summaries():
+    codes = encode_cell_types(["LFP"] * 4)
+    summaries = [
+        summarize(batch([90, 90, 90, 90], [0, 0, 0, 0]), codes),
+        summarize(batch([60, 60], [2, 3]), codes[:2]),
+        summarize(batch([NAN, NAN, NAN, NAN], [1, 1, 1, 1]), codes),
+        summarize(batch([NAN], [1]), codes[:1]),
+    ]
+    labels, totals = rollup(summaries, ["bench-1", "bench-1", "bench-1", "bench-2"])
+    assert list(labels) == ["bench-1", "bench-2"]
+    assert list(totals["partitions"]) == [3, 1] and list(totals["cells"]) == [10, 1]
+    assert list(totals["status_0"]) == [4, 0] and list(totals["status_1"]) == [4, 1]
+    # A partition without health adds cells but no weight: (4 * 90 + 2 * 60) / 6
+    np.testing.assert_allclose(totals["mean_health"], [80, NAN])
+    np.testing.assert_array_equal(totals["min_health"], [60, NAN])
+    np.testing.assert_array_equal(totals["max_health"], [90, NAN])
+    np.testing.assert_array_equal(totals["total_power"], [10, 1])
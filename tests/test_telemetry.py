@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from battery_health.telemetry import (
+    CELL_CONFIGS, CELL_TYPES, METRICS, STATUSES, encode_cell_types, generate_batch, generate_cell_data,
+    mix_cell_types
+)
+
+
+def scalar_health_and_status(cell_type, voltage, temperature):
+    """The original per-cell health and status rules"""
+    config = CELL_CONFIGS[cell_type]
+    voltage_health = 100 * (1 - abs(voltage - config["nominal_voltage"]) / config["nominal_voltage"])
+    temp_health = 100 * max(0, 1 - max(0, temperature - 35) / 20)
+    health = round((voltage_health + temp_health) / 2, 1)
+    if voltage < config["min_voltage"] or voltage > config["max_voltage"] or temperature > 45:
+        status = "Critical"
+    elif temperature > 40 or health < 75:
+        status = "Warning"
+    elif health >= 90:
+        status = "Excellent"
+    else:
+        status = "Good"
+    return health, status
+
+
+def test_generate_batch_matches_scalar_rules():
+    cell_types = [CELL_TYPES[i % len(CELL_TYPES)] for i in range(4000)]
+    batch = generate_batch(encode_cell_types(cell_types), np.random.default_rng(1))
+    assert set(batch) == set(METRICS) | {"status"}
+    assert all(len(values) == len(cell_types) for values in batch.values())
+    for i, cell_type in enumerate(cell_types):
+        health, status = scalar_health_and_status(cell_type, batch["voltage"][i], batch["temperature"][i])
+        assert batch["health"][i] == pytest.approx(health, abs=0.051)
+        assert STATUSES[batch["status"][i]] == status
+    nominal = np.array([CELL_CONFIGS[t]["nominal_voltage"] for t in cell_types])
+    assert np.all(np.abs(batch["voltage"] - nominal) <= 0.1 + 1e-9)
+    assert np.all(np.abs(batch["current"]) <= 5)
+    np.testing.assert_allclose(batch["power"], np.round(batch["voltage"] * np.abs(batch["current"]), 2))
+
+
+def test_generate_cell_data_is_the_batch_path_for_one_cell():
+    now = datetime(2024, 1, 1)
+    record = generate_cell_data("NMC", "Cell_1_NMC", now, np.random.default_rng(7))
+    batch = generate_batch(encode_cell_types(["NMC"]), np.random.default_rng(7))
+    for metric in METRICS:
+        assert record[metric] == batch[metric][0]
+    assert record["status"] == STATUSES[batch["status"][0]]
+    assert (record["cell_id"], record["cell_type"], record["timestamp"]) == ("Cell_1_NMC", "NMC", now)
+
+
+def test_mix_cell_types_round_robin_and_ratio():
+    assert mix_cell_types(6, dict.fromkeys(CELL_TYPES, 1)) == list(CELL_TYPES) + list(CELL_TYPES[:2])
+    mixed = mix_cell_types(10_000, {"LFP": 3, "NMC": 1})
+    assert mixed.count("LFP") == 7500 and mixed.count("NMC") == 2500
+    # Spread through the pack rather than in blocks
+    assert mixed[:4].count("NMC") == 1
+    with pytest.raises(ValueError):
+        mix_cell_types(4, {"LFP": 0})